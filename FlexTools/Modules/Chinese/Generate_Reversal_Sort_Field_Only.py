@@ -165,7 +165,7 @@ def GenerateReversalSortFields(project, report, modifyAllowed=False):
         newTonenum, msg = Parser.CalculateTonenum(hz, tn)
         if msg:
             report.Warning("    %s" % msg,
-                           project.BuildGotoURL(entry))
+                           GotoRef(entry))
         if newTonenum is not None:
             report.Info(("    Updating %s > %s" if modifyAllowed else
                          "    %s needs updating > %s") \
@@ -180,7 +180,7 @@ def GenerateReversalSortFields(project, report, modifyAllowed=False):
             if tn != hacked_tn:
                 HackedSortStrings += 1
                 report.Warning("    Hacked %s" % hz,
-                               project.BuildGotoURL(entry))
+                               GotoRef(entry))
                 hz = hacked_hz
                 tn = hacked_tn
 
@@ -189,7 +189,7 @@ def GenerateReversalSortFields(project, report, modifyAllowed=False):
         newSortString, msg = SortDB.CalculateSortString(hz, tn, ss)
         if msg:
             report.Warning("    %s: %s" % (hz, msg),
-                           project.BuildGotoURL(entry))
+                           GotoRef(entry))
 
         if newSortString is not None:
             report.Info(("    Updating %s: (%s + %s) > %s" if modifyAllowed else
@@ -81,7 +81,7 @@ def UpdatePinyinFields(project, report, modifyAllowed=False):
         newPinyin, msg = __CalcNewPinyin(project, tonenum, pinyin)
         if msg:
             report.Warning("    %s: %s" % (headword, msg),
-                           project.BuildGotoURL(entry))
+                           entry.Guid)
             NumWarnings += 1
         if newPinyin != pinyin:
             report.Info(("    Updating '%s': %s > %s" if modifyAllowed else
@@ -106,7 +106,7 @@ def UpdatePinyinFields(project, report, modifyAllowed=False):
         newPinyin, msg = __CalcNewPinyin(project, tonenum, pinyin)
         if msg:
             report.Warning("    %s: %s" % (reversalForm, msg),
-                           project.BuildGotoURL(entry))
+                           GotoRef(entry))
             NumWarnings += 1
         if newPinyin != pinyin:
             report.Info(("    Updating '%s': %s > %s" if modifyAllowed else
@@ -151,7 +151,13 @@ def UpdatePinyinFields(project, report, modifyAllowed=False):
     NumWarnings = 0
     UpdatedSenses = 0
 
-    for entryNumber, entry in enumerate(project.LexiconAllEntries()):
+    # Skip the entries that were done if the last run was stopped.
+    checkpoint = getattr(report, "checkpoint", None)
+    entries = project.LexiconAllEntries()
+    if checkpoint:
+        entries = checkpoint.Resume(entries, "Lexicon")
+
+    for entryNumber, entry in enumerate(entries):
         report.ProgressUpdate(entryNumber)
         for sense in entry.SensesOS:
             __WriteSensePinyin(project, sense, entry)
@@ -173,7 +179,10 @@ def UpdatePinyinFields(project, report, modifyAllowed=False):
             report.ProgressStart(index.AllEntries.Count, "Reversal index")
             report.Info("Updating Pinyin for '%s' reversal index"
                         % project.WSUIName(ChineseWS))
-            for entryNumber, entry in enumerate(project.ReversalEntries(ChineseWS)):
+            entries = project.ReversalEntries(ChineseWS)
+            if checkpoint:
+                entries = checkpoint.Resume(entries, "Reversals")
+            for entryNumber, entry in enumerate(entries):
                 report.ProgressUpdate(entryNumber)
                 __WriteReversalPinyin(project, entry)
                 
@@ -80,7 +80,7 @@ def UpdateReversalSortFields(project, report, modifyAllowed=False):
         newSortString, msg = SortDB.CalculateSortString(hz, tn, ss)
         if msg:
             report.Warning("    %s: %s" % (hz, msg),
-                           project.BuildGotoURL(entry))
+                           GotoRef(entry))
         if newSortString is not None:
             report.Info(("    Updating %s: (%s + %s) > %s" if modifyAllowed else
                          "    %s needs updating: (%s + %s) > %s") \
@@ -76,7 +76,8 @@ def UpdateTonenumberFields(project, report, modifyAllowed=False):
         newTonenum, msg = Parser.CalculateTonenum(hz, tn)
         if msg:
             report.Warning("    %s: %s" % (headword, msg),
-                           project.BuildGotoURL(entry))
+                           entry.Guid,
+                           key="tonenumber-sense")
         if newTonenum is not None:
             report.Info(("    Updating %s: %s > %s" if modifyAllowed else
                          "    %s needs updating: %s > %s") \
@@ -97,7 +98,8 @@ def UpdateTonenumberFields(project, report, modifyAllowed=False):
         newTonenum, msg = Parser.CalculateTonenum(hz, tn)
         if msg:
             report.Warning("    %s" % msg,
-                           project.BuildGotoURL(entry))
+                           GotoRef(entry),
+                           key="tonenumber-reversal")
         if newTonenum is not None:
             report.Info(("    Updating %s > %s" if modifyAllowed else
                          "    %s needs updating > %s") \
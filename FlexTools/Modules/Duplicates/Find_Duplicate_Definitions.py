@@ -30,6 +30,8 @@ TestNumberOfEntries  = -1   # -1 for whole project; else no. of db entries to sc
 docs = {FTM_Name        : "Find Duplicate Definitions",
         FTM_Version     : 1,
         FTM_ModifiesDB  : True,
+        FTM_Reads       : [FTD_Lexicon],
+        FTM_Writes      : [FTD_Lexicon+":FTFlags"],
         FTM_Synopsis    : "Finds entries with duplicate definitions.",
         FTM_Help        : "Merging Duplicates Help.htm",
         FTM_Description :
@@ -86,7 +88,7 @@ def MainFunction(project, report, modifyAllowed):
 
         if list_duplicates(list):
             report.Info("Found duplicate in: " + lexeme + ": " + " ,".join(list_duplicates(list)),
-                        project.BuildGotoURL(e))
+                        e.Guid)
             if AddReportToField:
                 project.LexiconSetFieldText(e, flagsField, "Duplicate definition found: " + " ,".join(list_duplicates(list)))
 
@@ -31,6 +31,8 @@ from types import *
 docs = {FTM_Name       : "Find Duplicate Entries",
         FTM_Version    : 3,
         FTM_ModifiesDB : True,
+        FTM_Reads      : [FTD_Lexicon],
+        FTM_Writes     : [FTD_Lexicon+":FTFlags"],
         FTM_Synopsis   : "Finds potential duplicate entries and tags them ready for merging.",
         FTM_Help       : "Merging Duplicates Help.htm",
         FTM_Description:
@@ -60,16 +62,14 @@ This utility will clean up homograph numbers and duplicate grammatical info deta
 
 def MainFunction(project, report, modifyAllowed):
 
-    def __EntryMessage(entry, message):
-        glosses = ", ".join([project.LexiconGetSenseGloss(s) 
-                            for s in entry.SensesOS])
-        report.Info("   %s(%i) [%s][%s] %s %s" % (entry.HomographForm,
-                                                entry.HomographNumber,
-                                                project.BestStr(MorphType.Name),
+    def __EntryMessage(ref, message):
+        report.Info("   %s(%i) [%s][%s] %s %s" % (homographForm,
+                                                homographNumber,
+                                                morphType,
                                                 POSList,
-                                                glosses,
+                                                ", ".join(glosses),
                                                 message),
-                    project.BuildGotoURL(entry))
+                    ref)
 
     numEntries = project.LexiconNumberOfEntries()
     report.Info("Scanning %s entries for homographs..." % numEntries)
@@ -86,50 +86,61 @@ def MainFunction(project, report, modifyAllowed):
     if AddTagToField and not tagsField:
         report.Warning ("Continuing in read-only mode")
         AddTagToField = False
+
+    # Read the fields for all the entries in one pass (See FTBulkRead.py)
+    fields = ["HomographNumber", "HomographForm", "MorphType",
+              "MorphTypeGuid", "IsAffix", "NumberOfEntryRefs", "POS",
+              "SenseGlosses", "Ref"]
+    if tagsField:
+        fields.append(tagsField)
+
+    phraseTypes = (str(MoMorphTypeTags.kguidMorphPhrase),
+                   str(MoMorphTypeTags.kguidMorphDiscontiguousPhrase))
    
     homographs = defaultdict(list)
 
-    for entryNumber, entry in enumerate(project.LexiconAllEntries()):
-        if (entry.HomographNumber == 0):
-            continue
+    entryNumber = 0
+    for chunk in IterEntryFields(project, fields):
+        for (hvo, homographNumber, homographForm, morphType, morphTypeGuid,
+             isAffix, numberOfEntryRefs, POS, glosses, ref, *tags) \
+                in chunk.Rows():
+            tag = tags[0] if tags else ""
+            report.ProgressUpdate(entryNumber)
+            entryNumber += 1
 
-        report.ProgressUpdate(entryNumber)
-        
-        POSList = ""
-        MorphType = entry.LexemeFormOA.MorphTypeRA
+            if (homographNumber == 0):
+                continue
 
-        # Ignore affixes
-        if MorphType.IsAffixType:
-            continue
+            POSList = ""
 
-        # Ignore variants and complex forms (except phrases)
-        if entry.EntryRefsOS.Count > 0:
-            if ((MorphType.Guid != MoMorphTypeTags.kguidMorphPhrase) and
-                (MorphType.Guid != MoMorphTypeTags.kguidMorphDiscontiguousPhrase)):
-                __EntryMessage(entry, "skipped because it is a variant or complex form")
+            # Ignore affixes
+            if isAffix:
                 continue
 
-        # Handle Grammatical Categories as sets: so senses of (Noun, Verb) will match (Verb, Noun)
-        POS = set([x.ShortName for x in entry.MorphoSyntaxAnalysesOC])
-        POSList = "; ".join(POS)
+            # Ignore variants and complex forms (except phrases)
+            if numberOfEntryRefs > 0:
+                if morphTypeGuid not in phraseTypes:
+                    __EntryMessage(ref, "skipped because it is a variant or complex form")
+                    continue
+
+            # Handle Grammatical Categories as sets: so senses of (Noun, Verb) will match (Verb, Noun)
+            POSList = "; ".join(POS)
 
-        # Skip entries with contents in FTFlags
-        if tagsField:
-            tag = project.LexiconGetFieldText(entry, tagsField)
+            # Skip entries with contents in FTFlags
             if tag:
                 if tag in ALL_MERGE_TAGS:
-                    __EntryMessage(entry, "ready for merge (FTFlags = '%s')" % tag)
+                    __EntryMessage(ref, "ready for merge (FTFlags = '%s')" % tag)
                 else:
-                    __EntryMessage(entry, "skipped because FTFlags contains data ('%s')" % tag)
+                    __EntryMessage(ref, "skipped because FTFlags contains data ('%s')" % tag)
                 continue
 
-        # Keep track of this entry
-        key = "{} [{}][{}]".format(entry.HomographForm,
-                                   project.BestStr(MorphType.Name),
-                                   POSList)
+            # Keep track of this entry
+            key = "{} [{}][{}]".format(homographForm,
+                                       morphType,
+                                       POSList)
 
-        homographs[key].append(entry)
-        __EntryMessage(entry, "")
+            homographs[key].append((hvo, ref))
+            __EntryMessage(ref, "")
 
 
     if AddTagToField:
@@ -144,10 +155,10 @@ def MainFunction(project, report, modifyAllowed):
         if len(data) < 2:
             continue
         report.Info("   {}: {} homographs".format(key, len(data)),
-                    project.BuildGotoURL(data[0]))
+                    data[0][1])
         if AddTagToField:
-            for e in data:
-                project.LexiconAddTagToField(e, tagsField, TAG_Merge) 
+            for hvo, ref in data:
+                project.LexiconAddTagToField(hvo, tagsField, TAG_Merge) 
 
     # Mark entries with only one homograph with "review"
     
@@ -160,11 +171,11 @@ def MainFunction(project, report, modifyAllowed):
     
     for key, data in homographItems:
         if len(data) == 1:
+            hvo, ref = data[0]
             report.Info("   {}".format(key),
-                        project.BuildGotoURL(data[0]))
+                        ref)
             if AddTagToField:
-                e = data[0]
-                project.LexiconAddTagToField(e, tagsField, TAG_MergeReview) 
+                project.LexiconAddTagToField(hvo, tagsField, TAG_MergeReview) 
 
 #----------------------------------------------------------------
 
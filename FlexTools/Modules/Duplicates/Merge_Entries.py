@@ -79,7 +79,7 @@ def MergeEntries(project, report, modifyAllowed):
                                            project.BestStr(MorphType.Name),
                                            POSList,
                                            message),
-                    project.BuildGotoURL(entry))
+                    entry.Guid)
         
     # --------------------------------------------------------------------
     def __WarningMessage(entry, message):
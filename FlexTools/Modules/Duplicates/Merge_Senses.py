@@ -100,7 +100,7 @@ def MergeSenses(project, report, modifyAllowed):
                 report.Info(msg % (entry.HomographForm,
                                    senses[0].ShortName,
                                    formattedNumbers),
-                            project.BuildGotoURL(entry))
+                            entry.Guid)
 
                 if DoMerge:
                     originalNumSenses = entry.SensesOS.Count
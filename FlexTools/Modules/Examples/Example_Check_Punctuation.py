@@ -92,7 +92,7 @@ def Main(project, report, modifyAllowed):
                 exampleSentence = project.LexiconGetExample(example) 
                 if not exampleSentence:
                     report.Warning("Blank example: " + lexeme, 
-                                   project.BuildGotoURL(entry))
+                                   entry.Guid)
                     continue
                 for test in TestSuite:
                     funcOrRegex, result, message = test
@@ -100,7 +100,7 @@ def Main(project, report, modifyAllowed):
                         if (funcOrRegex.search(exampleSentence) != None) \
                           == result:
                            report.Warning(lexeme + ": " + message, 
-                                          project.BuildGotoURL(entry))
+                                          entry.Guid)
                            if AddReportToField:
                                project.LexiconAddTagToField(sense, flagsField, message)
            
@@ -18,6 +18,7 @@ from flextoolslib import *
 docs = {FTM_Name        : "Export All Headwords To File",
         FTM_Version     : 2,
         FTM_ModifiesDB  : False,
+        FTM_Reads       : [FTD_Lexicon],
         FTM_Synopsis    : "Export all headwords to a file.",
         FTM_Description :
 """
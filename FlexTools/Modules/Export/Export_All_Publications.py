@@ -18,6 +18,7 @@ from _Exporters import Export_Publication
 docs = {FTM_Name        : "Export All Publications",
         FTM_Version     : 1,
         FTM_ModifiesDB  : False,
+        FTM_Reads       : [FTD_Lexicon, FTD_Lists],
         FTM_Synopsis    : "Export all headwords from each publication to a file.",
         FTM_Description :
 """
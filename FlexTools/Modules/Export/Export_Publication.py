@@ -19,6 +19,7 @@ from _Exporters import Export_Publication
 docs = {FTM_Name        : "Export Publication",
         FTM_Version     : 1,
         FTM_ModifiesDB  : False,
+        FTM_Reads       : [FTD_Lexicon, FTD_Lists],
         FTM_Synopsis    : "Export headwords from one publication to a file.",
         FTM_Description :
 """
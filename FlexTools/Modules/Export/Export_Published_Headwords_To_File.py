@@ -18,6 +18,7 @@ from flextoolslib import *
 docs = {FTM_Name        : "Export Published Headwords To File",
         FTM_Version     : 2,
         FTM_ModifiesDB  : False,
+        FTM_Reads       : [FTD_Lexicon, FTD_Lists],
         FTM_Synopsis    : "Export published headwords to a file.",
         FTM_Description :
 """
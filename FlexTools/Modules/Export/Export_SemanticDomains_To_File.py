@@ -18,6 +18,7 @@ from flextoolslib import *
 docs = {FTM_Name        : "Export Semantic Domain List To File",
         FTM_Version     : 2,
         FTM_ModifiesDB  : False,
+        FTM_Reads       : [FTD_Lists],
         FTM_Synopsis    : "Export the Semantic Domain list to a file.",
         FTM_Description :
 """
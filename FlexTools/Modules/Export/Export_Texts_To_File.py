@@ -18,6 +18,7 @@ from flextoolslib import *
 docs = {FTM_Name        : "Export Texts To File",
         FTM_Version     : 2,
         FTM_ModifiesDB  : False,
+        FTM_Reads       : [FTD_Texts],
         FTM_Synopsis    : "Export all texts to a file.",
         FTM_Description :
 """
@@ -21,6 +21,7 @@ from collections import defaultdict
 docs = {FTM_Name       : "Incomplete Analyses",
         FTM_Version    : 2,
         FTM_ModifiesDB : False,
+        FTM_Reads      : [FTD_Texts, FTD_Wordforms, FTD_Lexicon],
         FTM_Synopsis   : "Report on analyses that have missing Morphs or Senses.",
         FTM_Help       : None,
         FTM_Description:
@@ -40,7 +41,8 @@ def Main(project, report, modifyAllowed=False):
                     if not mb.MorphRA or not mb.SenseRA:
                         report.Warning("%s: Missing morphs or senses"
                                        % analysis.Analysis.ShortNameTSS,
-                                       project.BuildGotoURL(analysis))
+                                       GotoRef(analysis),
+                                       key="missing-morph")
 
 #----------------------------------------------------------------
 # The name 'FlexToolsModule' must be defined like this:
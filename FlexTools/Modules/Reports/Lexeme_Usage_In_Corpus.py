@@ -35,6 +35,8 @@ DEBUG = False
 docs = {FTM_Name       : "Lexeme Usage in Corpus",
         FTM_Version    : 1,
         FTM_ModifiesDB : True,
+        FTM_Reads      : [FTD_Lexicon, FTD_Texts, FTD_Wordforms],
+        FTM_Writes     : [FTD_Lexicon+":Entry Frequency", FTD_Lexicon+":Sense Frequency"],
         FTM_Synopsis   : "Count usage of lexemes in the text corpus.",
         FTM_Help       : None,
         FTM_Description:
@@ -84,10 +86,22 @@ def MainFunction(project, report, modifyAllowed):
     numLexemes = project.LexiconNumberOfEntries()
     report.ProgressStart(numLexemes)
 
+    # Use the shared run data cache if it is available.
+    runData = getattr(report, "runData", None)
+    if runData:
+        entries = runData.Entries()
+        headwords = runData.Headwords()
+    else:
+        entries = project.LexiconAllEntries()
+        headwords = None
+
     numAttested = 0
-    for entryNumber, entry in enumerate(project.LexiconAllEntries()):
+    for entryNumber, entry in enumerate(entries):
         report.ProgressUpdate(entryNumber)
-        lexeme = project.LexiconGetHeadword(entry)
+        if headwords:
+            lexeme = headwords[entry.Hvo]
+        else:
+            lexeme = project.LexiconGetHeadword(entry)
         entryTotal = 0
         for sense in entry.SensesOS:
             senseCount = project.LexiconSenseAnalysesCount(sense)
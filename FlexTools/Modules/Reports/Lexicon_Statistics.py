@@ -22,6 +22,7 @@ from flextoolslib import *
 docs = {FTM_Name       : "Lexicon Statistics",
         FTM_Version    : 2,
         FTM_ModifiesDB : False,
+        FTM_Reads      : [FTD_Lexicon],
         FTM_Synopsis   : "Give a summary report of the lexicon.",
         FTM_Help       : None,
         FTM_Description:
@@ -63,7 +64,14 @@ def Main(project, report, modifyAllowed):
     numSenses = 0
     numWithExamples = 0
     numWithDefinitions = 0
-    for entryNumber, entry in enumerate(project.LexiconAllEntries()):
+    # Use the shared run data cache if it is available.
+    runData = getattr(report, "runData", None)
+    if runData:
+        entries = runData.Entries()
+    else:
+        entries = project.LexiconAllEntries()
+
+    for entryNumber, entry in enumerate(entries):
         report.ProgressUpdate(entryNumber)
         for sense in entry.SensesOS:
             __recordSenseInfo(project, sense)
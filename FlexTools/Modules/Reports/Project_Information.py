@@ -17,6 +17,7 @@ from flextoolslib import *
 docs = {FTM_Name        : "Project Information",
         FTM_Version     : 1,
         FTM_ModifiesDB  : False,
+        FTM_Reads       : [FTD_Lexicon, FTD_Lists],
         FTM_Synopsis    : "Report detailed information about the project.",
         FTM_Description :
 """
@@ -21,6 +21,7 @@ from flextoolslib import *
 docs = {FTM_Name        : "Text Statistics",
         FTM_Version     : 1,
         FTM_ModifiesDB  : False,
+        FTM_Reads       : [FTD_Texts],
         FTM_Synopsis    : "Give a summary report of all the texts.",
         FTM_Description :
 """
@@ -76,7 +76,7 @@ def ConvertPlurals(project, report, modifyAllowed):
                                            project.BestStr(MorphType.Name),
                                            POSList,
                                            message),
-                    project.BuildGotoURL(entry))
+                    entry.Guid)
         
     # --------------------------------------------------------------------
     def __WarningMessage(entry, message):
@@ -54,7 +54,7 @@ def MainFunction(project, report, modifyAllowed):
         if SpellingStatusStates(w.SpellingStatus) == SpellingStatusStates.undecided:
             form = ITsString(w.Form.BestVernacularAlternative).Text
             if NumberFormRegEx.match(form):
-                report.Info(form, project.BuildGotoURL(w))
+                report.Info(form, GotoRef(w))
                 if modifyAllowed:
                     w.SpellingStatus = int(SpellingStatusStates.correct)
 
@@ -0,0 +1,118 @@
+#
+#   BenchmarkModules
+#
+#   Measures how Modules scale with project size, using synthetic
+#   projects, so FieldWorks isn't needed.
+#   Run as a command-line application:
+#       py BenchmarkModules.py [options] <Module>...
+#
+#   E.g.:
+#       py BenchmarkModules.py --sizes 1000,10000,100000
+#           --output results.json --baseline baseline.json
+#           ..\Modules\Duplicates\Find_Duplicate_Entries.py
+#           ..\Modules\Reports\Lexeme_Usage_In_Corpus.py
+#
+#   The exit code is 1 if any Module fails, scales super-linearly or
+#   has regressed compared to the baseline, otherwise 0.
+#
+
+import argparse
+import gettext
+import sys
+
+
+LOG_FILE = "BenchmarkModules.log"
+
+import logging
+logging.basicConfig(filename=LOG_FILE,
+                    filemode='w',
+                    level=logging.INFO)
+
+logger = logging.getLogger(__name__)
+
+# The FlexTools UI normally installs _()
+gettext.install("flextools")
+
+from flextoolslib.misc.Benchmark import (
+    DEFAULT_SIZES,
+    SUPERLINEAR_EXPONENT,
+    RunBenchmarks,
+    SuperLinear,
+    SaveResults,
+    LoadResults,
+    CompareResults,
+    )
+
+
+#----------------------------------------------------------------
+
+def ParseArguments():
+    parser = argparse.ArgumentParser(
+        description="Benchmark FlexTools Modules against synthetic projects.")
+    parser.add_argument("modules", nargs="+", metavar="Module",
+                        help="path to a Module file")
+    parser.add_argument("--sizes",
+                        default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="comma-separated project sizes (number of entries)")
+    parser.add_argument("--modify", action="store_true",
+                        help="run the Modules with modifications allowed")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed for the synthetic projects")
+    parser.add_argument("--cache", action="store_true",
+                        help="run the Modules with the caching project proxy")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="don't measure peak memory (halves the run time)")
+    parser.add_argument("--threshold", type=float, default=SUPERLINEAR_EXPONENT,
+                        help="scaling exponent that is reported as super-linear")
+    parser.add_argument("--output", help="save the results to this JSON file")
+    parser.add_argument("--baseline", help="compare with the results in this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed growth in time and memory compared to the baseline")
+    return parser.parse_args()
+
+#----------------------------------------------------------------
+
+if __name__ == "__main__":
+
+    args = ParseArguments()
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    results = RunBenchmarks(args.modules, sizes, args.modify, args.seed,
+                            measureMemory=not args.no_memory,
+                            cacheLookups=args.cache)
+
+    problems = 0
+    for path in results["failed"]:
+        print (f"\n{path}\n  FAILED to import (see {LOG_FILE})")
+        problems += 1
+    for name, benchmark in results["modules"].items():
+        print (f"\n{name}")
+        print (f"  {'Entries':>10} {'Seconds':>10} {'Peak MB':>10} {'Messages':>10}")
+        for r in benchmark["results"]:
+            if r["failed"]:
+                print (f"  {r['size']:>10} FAILED (see {LOG_FILE})")
+                problems += 1
+                continue
+            peak = f"{r['peakMemory'] / 1048576:.1f}" if "peakMemory" in r else "-"
+            print (f"  {r['size']:>10} {r['seconds']:>10.3f} {peak:>10} {r['messages']:>10}")
+        exponents = ", ".join(f"{metric} {k}"
+                              for metric, k in benchmark["exponents"].items()
+                              if k is not None)
+        print (f"  Scaling exponents: {exponents or '-'}")
+        for metric, k in SuperLinear(benchmark, args.threshold):
+            print (f"  SUPER-LINEAR: {metric} scales as size^{k}")
+            problems += 1
+
+    if args.output:
+        SaveResults(results, args.output)
+        print (f"\nResults saved to {args.output}")
+
+    if args.baseline:
+        regressions = CompareResults(results, LoadResults(args.baseline),
+                                     args.tolerance)
+        print (f"\nCompared with {args.baseline}: {len(regressions)} regressions")
+        for name, size, metric, old, new in regressions:
+            print (f"  {name} ({size} entries): {metric} {old} -> {new}")
+        problems += len(regressions)
+
+    sys.exit(1 if problems else 0)
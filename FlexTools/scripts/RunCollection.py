@@ -0,0 +1,121 @@
+#
+#   RunCollection
+#
+#   Runs a collection of Modules on one or more projects without the
+#   FlexTools UI, e.g. for nightly checks. Each project is run in its
+#   own process, with several projects at a time.
+#   Run as a command-line application from the FlexTools folder (where
+#   flextools.ini is):
+#       py scripts\RunCollection.py [options] <Collection> <Project>...
+#
+#   E.g.:
+#       py scripts\RunCollection.py --workers 4 --output Reports\Nightly
+#           "Checks" "Test-*" MyProject
+#
+#   Projects can be given as wildcards, or listed in a file, one per
+#   line, with @<file>.
+#
+#   The reports for each project (.jsonl and .html), and a summary of
+#   all the projects (summary.json), are written to the output folder.
+#   (See flextoolslib\misc\RunCollection.py)
+#
+#   The exit code is 0 if there were no errors, 1 if Modules reported
+#   errors, or 2 if a project couldn't be run.
+#
+
+import argparse
+import sys
+
+
+LOG_FILE = "RunCollection.log"
+
+# Logging is configured before importing flextoolslib, which otherwise
+# logs to flextools.log. The worker processes import this file too (as
+# __mp_main__), and set up their own logs.
+import logging
+if __name__ == "__main__":
+    logging.basicConfig(filename=LOG_FILE,
+                        filemode='w',
+                        level=logging.INFO)
+else:
+    logging.basicConfig(handlers=[logging.NullHandler()])
+
+logger = logging.getLogger(__name__)
+
+from flextoolslib.misc.RunCollection import (
+    EXIT_FAILED,
+    STATUS_OK,
+    CollectionNames,
+    ExpandProjects,
+    RunProjects,
+    ExitCode,
+    )
+
+
+#----------------------------------------------------------------
+
+def ParseArguments():
+    parser = argparse.ArgumentParser(
+        description="Run a FlexTools collection on one or more projects.",
+        fromfile_prefix_chars="@")
+    parser.add_argument("collection", help="the name of the collection")
+    parser.add_argument("projects", nargs="+", metavar="Project",
+                        help="a project name, or a wildcard pattern")
+    parser.add_argument("--output", default="Reports",
+                        help="folder for the reports (default: Reports)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of projects to run at a time (default: the number of CPUs)")
+    parser.add_argument("--modify", action="store_true",
+                        help="allow the Modules to make changes")
+    parser.add_argument("--force", action="store_true",
+                        help="run all the Modules, even if they have a saved report")
+    parser.add_argument("--fail-on-warnings", action="store_true",
+                        help="exit with code 1 if any warnings were reported")
+    return parser.parse_args()
+
+
+def ShowProgress(numDone, numProjects, summary):
+    if summary["status"] == STATUS_OK:
+        result = f"{summary['errors']} errors, {summary['warnings']} warnings"
+    else:
+        result = f"{summary['status'].upper()}: {summary['message']}"
+    print (f"[{numDone}/{numProjects}] {summary['project']}: {result}"
+           f" ({summary['seconds']}s)", flush=True)
+
+
+def AllProjectNames():
+    from flexlibs import FLExInitialize, FLExCleanup
+    from flexlibs import AllProjectNames
+
+    FLExInitialize()
+    try:
+        return AllProjectNames()
+    finally:
+        FLExCleanup()
+
+#----------------------------------------------------------------
+
+if __name__ == "__main__":
+
+    args = ParseArguments()
+
+    if args.collection not in CollectionNames():
+        print (f"Collection '{args.collection}' not found. The collections are:")
+        print ("\n".join(f"    {c}" for c in CollectionNames()))
+        sys.exit(EXIT_FAILED)
+
+    projects = ExpandProjects(args.projects, AllProjectNames)
+    if not projects:
+        print ("No projects to run.")
+        sys.exit(EXIT_FAILED)
+
+    print (f"Running collection '{args.collection}' on {len(projects)} projects")
+    summary = RunProjects(args.collection, projects, args.output,
+                          args.workers, args.modify, args.force,
+                          progress=ShowProgress)
+
+    print (f"\nErrors: {summary['errors']}; Warnings: {summary['warnings']}"
+           f" ({summary['seconds']}s)")
+    print (f"Reports saved in {args.output}")
+
+    sys.exit(ExitCode(summary, args.fail_on_warnings))
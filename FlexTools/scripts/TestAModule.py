@@ -3,7 +3,15 @@
 #
 #   Test frame for developing a new Module. 
 #   Run as a command-line application:
-#       py TestAModule.py <Module> <Project>
+#       py TestAModule.py [--profile[=sampling]] <Module> <Project> [<Report file>...]
+#
+#   The report is also written to any report files given (.jsonl, .csv
+#   or .html).
+#
+#   --profile saves a cProfile .prof file, and the collapsed stacks made
+#   from it, for the module's run in the current directory. 
+#   --profile=sampling uses a low-overhead sampling profiler instead, 
+#   and saves the sampled collapsed stacks. (See FTProfiler.py)
 #
 
 import sys
@@ -20,24 +28,35 @@ logger = logging.getLogger(__name__)
 
 
 from flextoolslib import RunModule
+from flextoolslib.code import FTProfiler
     
 
 #----------------------------------------------------------------
 def usage():
-    print ("USAGE: TestAModule <Module> <Project>")
+    print ("USAGE: TestAModule [--profile[=sampling]] <Module> <Project> [<Report file>...]")
 
 #----------------------------------------------------------------
 
 if __name__ == "__main__":
 
-    if len(sys.argv) != 3:
+    args = sys.argv[1:]
+    ProfileMode = None
+    if args and (args[0] == "--profile" or args[0].startswith("--profile=")):
+        ProfileMode = FTProfiler.ProfileMode(args.pop(0).partition("=")[2]
+                                             or FTProfiler.PROFILE_CPROFILE)
+        if not ProfileMode:
+            usage()
+            sys.exit(1)
+
+    if len(args) < 2:
         usage()
         sys.exit(1)
         
-    ModuleToTest = sys.argv[1]
-    ProjectName  = sys.argv[2]
+    ModuleToTest = args[0]
+    ProjectName  = args[1]
+    ReportFiles  = args[2:]
 
-    if RunModule(ModuleToTest, ProjectName):
+    if RunModule(ModuleToTest, ProjectName, ReportFiles, ProfileMode):
         print ("Success!")
     else:
         print ("Failed!")
@@ -21,12 +21,21 @@ MaxFWVersion = "9.3.8"
 # Define exported classes, etc. at the top level of the package
 #----------------------------------------------------------------------------
 
+# Without Python.NET (e.g. on a build server) only the parts of the 
+# library that Modules use are available, so that Modules can be run 
+# against a stand-in project. (See misc/FakeProject.py)
+try:
+    import clr
+except ImportError:
+    clr = None
+
 # The main application
-from .code.FLExTools import (
-    main, 
-    refreshStatusbar,
-    lockUI,
-    )
+if clr:
+    from .code.FLExTools import (
+        main, 
+        refreshStatusbar,
+        lockUI,
+        )
 
 # The Modules class and documentation constants
 from .code.FTModuleClass import (
@@ -37,6 +46,13 @@ from .code.FTModuleClass import (
     FTM_Synopsis,
     FTM_Help,
     FTM_Description,
+    FTM_Reads,
+    FTM_Writes,
+    FTD_Lexicon,
+    FTD_Reversals,
+    FTD_Texts,
+    FTD_Wordforms,
+    FTD_Lists,
     )
 
 # Give access to the FlexTools configuration values, especially 
@@ -45,13 +61,36 @@ from .code.FTConfig import (
     FTConfig
     )
 
-from .code.FTDialogs import (
-    FTDialogChoose,
-    FTDialogRadio,
-    FTDialogText,
+# References to objects for report messages (see FTReport.py)
+from .code.FTReport import (
+    GotoRef,
     )
-        
-# Expose RunModule for testing purposes (see TestAModule.py)
-from .misc.RunModule import (
-    RunModule, 
+
+# Reading fields for the whole lexicon in columns (see FTBulkRead.py)
+from .code.FTBulkRead import (
+    FTColumns,
+    FTBR_FieldError,
+    ReadEntryFields,
+    IterEntryFields,
+    ReadSenseFields,
+    IterSenseFields,
+    ReadReversalFields,
+    IterReversalFields,
     )
+
+# Reporting from worker processes (see FTReportProxy.py)
+from .code.FTReportProxy import (
+    FTReportQueue,
+    )
+
+if clr:
+    from .code.FTDialogs import (
+        FTDialogChoose,
+        FTDialogRadio,
+        FTDialogText,
+        )
+        
+    # Expose RunModule for testing purposes (see TestAModule.py)
+    from .misc.RunModule import (
+        RunModule, 
+        )
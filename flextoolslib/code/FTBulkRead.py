@@ -0,0 +1,315 @@
+#
+#   Project: FlexTools
+#   Module:  FTBulkRead
+#
+#   Reads fields for all the entries, senses or reversal entries in one
+#   pass, and returns them in columns, so that Modules can work on
+#   plain Python data:
+#    - Each field is still read with the FLExProject methods, one call
+#      per object, so the first pass costs the same as a Module's own
+#      loop. Sorting, grouping and later passes then don't go back to
+#      the project.
+#    - The writing systems and custom field types are looked up once
+#      for each column, not once per object.
+#    - FTColumns.hvos is an array of the object Hvos, and each field
+#      is a parallel column (a list, or an array for integer fields).
+#    - The Iter*Fields() functions yield FTColumns of at most chunkSize
+#      objects, so the memory used doesn't grow with the lexicon.
+#
+#   A field is given as:
+#    - The name of a standard field (see ENTRY_FIELDS, SENSE_FIELDS and
+#      REVERSAL_FIELDS).
+#    - A custom field ID (e.g. from LexiconGetEntryCustomFieldNamed()).
+#      String fields give text; integer and list fields give the value
+#      from GetCustomFieldValue().
+#    - A tuple of (name or field ID, languageTagOrHandle), for a
+#      non-default writing system.
+#   The column key is the field as given. The "Ref" field gives a
+#   reference to the object for report messages (see GotoRef()), and
+#   "SenseGlosses" gives a tuple of the glosses of an entry's senses.
+#
+#   Usage in a Module:
+#       fields = ("LexemeForm", "Headword", ("Gloss", "fr"))
+#       columns = ReadSenseFields(project, fields)
+#       for hvo, lexeme, headword, gloss in columns.Rows():
+#           ...
+#       glosses = columns.ByHvo(("Gloss", "fr"))
+#
+#       for chunk in IterEntryFields(project, ("Headword", flagsField)):
+#           for hvo, headword, flags in chunk.Rows():
+#               ...
+#
+
+from array import array
+
+from .FTReport import GotoRef
+
+import logging
+logger = logging.getLogger(__name__)
+
+# ------------------------------------------------------------------
+
+DEFAULT_CHUNK_SIZE = 5000
+
+class FTBR_FieldError(Exception):
+    """
+    Exception raised for an unknown field, writing system or reversal
+    index.
+
+    Attributes:
+        message -- explanation of the error
+    """
+
+    def __init__(self, message):
+        self.message = message
+
+# ------------------------------------------------------------------
+
+class FTColumns(object):
+    """
+    The values of some fields for a sequence of objects. hvos and each
+    column are in the same order.
+    """
+    def __init__(self, fields, integerFields=()):
+        self.fields = tuple(fields)
+        self.hvos = array("l")
+        self.columns = {f : array("l") if f in integerFields else []
+                        for f in self.fields}
+
+    def __len__(self):
+        return len(self.hvos)
+
+    def __getitem__(self, field):
+        return self.columns[field]
+
+    def ByHvo(self, field):
+        """
+        Returns a dictionary of Hvo : value for one field.
+        """
+        return dict(zip(self.hvos, self.columns[field]))
+
+    def Rows(self):
+        """
+        Iterates over tuples of (hvo, value, value, ...), with the
+        values in the order of the fields.
+        """
+        return zip(self.hvos, *(self.columns[f] for f in self.fields))
+
+    def Extend(self, other):
+        """
+        Append the rows of another FTColumns with the same fields.
+        """
+        self.hvos.extend(other.hvos)
+        for f in self.fields:
+            self.columns[f].extend(other.columns[f])
+
+# ------------------------------------------------------------------
+# Standard fields:
+#   name : (function(project, wsHandle) returning a getter for one
+#           object, is integer)
+
+def __WSHandle(project, languageTagOrHandle):
+    # Resolve the writing system once for the column. None is passed
+    # to FLExProject for its default.
+    if isinstance(languageTagOrHandle, str):
+        handle = project.WSHandle(languageTagOrHandle)
+        if not handle:
+            raise FTBR_FieldError(f"Unknown writing system: {languageTagOrHandle}")
+        return handle
+    return languageTagOrHandle
+
+def __POSNames(entry):
+    return tuple(sorted(set(msa.ShortName
+                            for msa in entry.MorphoSyntaxAnalysesOC)))
+
+def __MorphType(entry):
+    if entry.LexemeFormOA:
+        return entry.LexemeFormOA.MorphTypeRA
+    return None
+
+ENTRY_FIELDS = {
+    "Ref"            : (lambda p, ws: GotoRef, False),
+    "Headword"       : (lambda p, ws: p.LexiconGetHeadword, False),
+    "HomographForm"  : (lambda p, ws: lambda e: e.HomographForm, False),
+    "LexemeForm"     : (lambda p, ws: lambda e: p.LexiconGetLexemeForm(e, ws), False),
+    "CitationForm"   : (lambda p, ws: lambda e: p.LexiconGetCitationForm(e, ws), False),
+    "HomographNumber": (lambda p, ws: lambda e: e.HomographNumber, True),
+    "MorphType"      : (lambda p, ws: lambda e: p.BestStr(__MorphType(e).Name)
+                                       if __MorphType(e) else "",
+                        False),
+    "MorphTypeGuid"  : (lambda p, ws: lambda e: str(__MorphType(e).Guid)
+                                       if __MorphType(e) else "",
+                        False),
+    "IsAffix"        : (lambda p, ws: lambda e: int(bool(__MorphType(e)
+                                                  and __MorphType(e).IsAffixType)),
+                        True),
+    "POS"            : (lambda p, ws: __POSNames, False),
+    "NumberOfSenses" : (lambda p, ws: lambda e: e.SensesOS.Count, True),
+    "NumberOfEntryRefs": (lambda p, ws: lambda e: e.EntryRefsOS.Count, True),
+    "SenseGlosses"   : (lambda p, ws: lambda e: tuple(p.LexiconGetSenseGloss(s, ws)
+                                                      for s in e.SensesOS),
+                        False),
+    }
+
+# Sense fields are read for all the senses, including subsenses, in
+# lexicon order. The entry fields above can also be given for senses,
+# and give the value for the sense's entry.
+SENSE_FIELDS = {
+    "Ref"            : (lambda p, ws: GotoRef, False),
+    "EntryHvo"       : (lambda p, ws: lambda s: s.Entry.Hvo, True),
+    "Gloss"          : (lambda p, ws: lambda s: p.LexiconGetSenseGloss(s, ws), False),
+    "Definition"     : (lambda p, ws: lambda s: p.LexiconGetSenseDefinition(s, ws), False),
+    "SensePOS"       : (lambda p, ws: p.LexiconGetSensePOS, False),
+    "SenseNumber"    : (lambda p, ws: p.LexiconGetSenseNumber, False),
+    }
+
+REVERSAL_FIELDS = {
+    "Ref"            : (lambda p, ws: GotoRef, False),
+    "Form"           : (lambda p, ws: lambda r: p.ReversalGetForm(r, ws), False),
+    "NumberOfSenses" : (lambda p, ws: lambda r: r.SensesRS.Count, True),
+    }
+
+# ------------------------------------------------------------------
+
+def __Getters(project, fields, standardFields, indexWS=None):
+    # Returns a list of (field, getter, onEntry) and the set of
+    # integer fields.
+    getters = []
+    integerFields = set()
+    for field in fields:
+        if isinstance(field, tuple):
+            name, languageTagOrHandle = field
+        else:
+            name, languageTagOrHandle = field, None
+
+        if isinstance(name, int):
+            # Custom field
+            ws = __WSHandle(project, languageTagOrHandle)
+            if project.LexiconFieldIsAnyStringType(name):
+                getter = (lambda flid, ws: lambda o:
+                            project.LexiconGetFieldText(o, flid, ws))(name, ws)
+            else:
+                getter = (lambda flid, ws: lambda o:
+                            project.GetCustomFieldValue(o, flid, ws))(name, ws)
+            getters.append((field, getter, False))
+            continue
+
+        onEntry = False
+        try:
+            builder, isInteger = standardFields[name]
+        except KeyError:
+            if standardFields is SENSE_FIELDS and name in ENTRY_FIELDS:
+                builder, isInteger = ENTRY_FIELDS[name]
+                onEntry = True
+            else:
+                raise FTBR_FieldError(f"Unknown field: {name}")
+        if standardFields is REVERSAL_FIELDS and languageTagOrHandle is None:
+            languageTagOrHandle = indexWS
+        ws = __WSHandle(project, languageTagOrHandle)
+        getters.append((field, builder(project, ws), onEntry))
+        if isInteger:
+            integerFields.add(field)
+    return getters, integerFields
+
+
+def __IterColumns(objects, fields, getters, integerFields, chunkSize, entryOf=None):
+    columns = FTColumns(fields, integerFields)
+    # Bind the appends for the inner loop.
+    appenders = [(columns.columns[field].append, getter, onEntry)
+                 for field, getter, onEntry in getters]
+    appendHvo = columns.hvos.append
+    for obj in objects:
+        appendHvo(obj.Hvo)
+        entry = entryOf(obj) if entryOf else None
+        for append, getter, onEntry in appenders:
+            append(getter(entry if onEntry else obj))
+        if chunkSize and len(columns) >= chunkSize:
+            yield columns
+            columns = FTColumns(fields, integerFields)
+            appenders = [(columns.columns[field].append, getter, onEntry)
+                         for field, getter, onEntry in getters]
+            appendHvo = columns.hvos.append
+    if len(columns) or not chunkSize:
+        yield columns
+
+
+def __Read(chunks):
+    columns = None
+    for chunk in chunks:
+        if columns is None:
+            columns = chunk
+        else:
+            columns.Extend(chunk)
+    return columns
+
+# ------------------------------------------------------------------
+
+def IterEntryFields(project, fields, chunkSize=DEFAULT_CHUNK_SIZE):
+    """
+    Read the fields for all the entries in the lexicon, and yield them
+    in FTColumns of up to chunkSize entries.
+    """
+    getters, integerFields = __Getters(project, fields, ENTRY_FIELDS)
+    return __IterColumns(project.LexiconAllEntries(), fields,
+                         getters, integerFields, chunkSize)
+
+
+def ReadEntryFields(project, fields):
+    """
+    Read the fields for all the entries in the lexicon, and return them
+    in an FTColumns.
+    """
+    return __Read(IterEntryFields(project, fields, chunkSize=None))
+
+
+def IterSenseFields(project, fields, chunkSize=DEFAULT_CHUNK_SIZE):
+    """
+    Read the fields for all the senses (including subsenses) in the
+    lexicon, and yield them in FTColumns of up to chunkSize senses.
+    Entry fields can also be given.
+    """
+    getters, integerFields = __Getters(project, fields, SENSE_FIELDS)
+    def __senses():
+        for entry in project.LexiconAllEntries():
+            for sense in entry.AllSenses:
+                yield sense
+    if any(onEntry for field, getter, onEntry in getters):
+        entryOf = lambda s: s.Entry
+    else:
+        entryOf = None
+    return __IterColumns(__senses(), fields, getters, integerFields,
+                         chunkSize, entryOf)
+
+
+def ReadSenseFields(project, fields):
+    """
+    Read the fields for all the senses (including subsenses) in the
+    lexicon, and return them in an FTColumns.
+    """
+    return __Read(IterSenseFields(project, fields, chunkSize=None))
+
+
+def IterReversalFields(project, languageTag, fields,
+                       chunkSize=DEFAULT_CHUNK_SIZE):
+    """
+    Read the fields for all the entries in the reversal index for
+    languageTag, and yield them in FTColumns of up to chunkSize
+    entries. The default writing system for "Form" is languageTag.
+    Raises FTBR_FieldError if there is no reversal index for languageTag.
+    """
+    getters, integerFields = __Getters(project, fields, REVERSAL_FIELDS,
+                                       indexWS=languageTag)
+    entries = project.ReversalEntries(languageTag)
+    if entries is None:
+        raise FTBR_FieldError(f"No reversal index for {languageTag}")
+    return __IterColumns(entries, fields,
+                         getters, integerFields, chunkSize)
+
+
+def ReadReversalFields(project, languageTag, fields):
+    """
+    Read the fields for all the entries in the reversal index for
+    languageTag, and return them in an FTColumns.
+    """
+    return __Read(IterReversalFields(project, languageTag, fields,
+                                     chunkSize=None))
@@ -0,0 +1,279 @@
+#
+#   Project: FlexTools
+#   Module:  FTChangeSet
+#
+#   Write-behind changes for FlexTools Modules:
+#    - RunModules() gives each Module an FTChangeSet as report.changes.
+#      It has the same setter methods as FLExProject, which queue the
+#      change instead of writing it.
+#    - Repeated writes to the same field are merged: the last value
+#      is written. Tags added with LexiconAddTagToField() are combined
+#      into one write of the field.
+#    - The changes are applied in one pass when the Module finishes,
+#      or when the Module calls Checkpoint(). Values that are already
+#      the same in the project aren't written. The number of changes
+#      applied is reported. (LexiconClearField() is always written,
+#      since it clears all the writing systems, or an integer field.)
+#    - In a dry run (modifyAllowed is False) the changes are reported
+#      with their old and new values, instead of being applied.
+#    - If the Module fails or is stopped, the changes since the last
+#      checkpoint are discarded.
+#
+#   Note that reads from the project don't see queued changes.
+#
+#   Usage in a Module:
+#       changes = getattr(report, "changes", None)
+#       for sense in ...:
+#           if changes:
+#               changes.LexiconSetSenseGloss(sense, newGloss)
+#           elif modifyAllowed:
+#               project.LexiconSetSenseGloss(sense, newGloss)
+#
+
+import logging
+logger = logging.getLogger(__name__)
+
+# ------------------------------------------------------------------
+
+# Key for preview messages, so that only the first report.keyCap are
+# kept. (See FTReport.py)
+PREVIEW_KEY = "change-preview"
+
+def _Hvo(obj):
+    return getattr(obj, "Hvo", obj)
+
+def _AddTag(text, tag):
+    # The same as FLExProject.LexiconAddTagToField()
+    if text:
+        if tag in text:
+            return text
+        return "; ".join((text, tag))
+    return tag
+
+# Queued changes:
+#   key : (kind, obj, fieldID, value, languageTagOrHandle)
+# Simple fields:
+#   kind : (setter, getter, label)
+SIMPLE_FIELDS = {
+    "LexemeForm"  : ("LexiconSetLexemeForm", "LexiconGetLexemeForm",
+                     "Lexeme form"),
+    "Gloss"       : ("LexiconSetSenseGloss", "LexiconGetSenseGloss",
+                     "Gloss"),
+    "Example"     : ("LexiconSetExample", "LexiconGetExample",
+                     "Example"),
+    "ReversalForm": ("ReversalSetForm", "ReversalGetForm",
+                     "Reversal form"),
+    }
+
+# Custom field kinds
+FIELD_TEXT    = "FieldText"
+FIELD_INTEGER = "FieldInteger"
+FIELD_CLEAR   = "FieldClear"
+FIELD_TAGS    = "FieldTags"
+
+# ------------------------------------------------------------------
+
+class FTChangeSet(object):
+
+    def __init__(self, project, reporter=None, modifyAllowed=False):
+        self.project = project
+        self.reporter = reporter
+        self.modifyAllowed = modifyAllowed
+        self.__changes = {}
+        self.__fieldKeys = {}           # (hvo, fieldID) : set of keys
+        self.__fieldNames = None
+        # Totals for the Module
+        self.queued = 0                 # Calls to the setters
+        self.applied = 0                # Values written
+        self.unchanged = 0              # Values already the same
+        self.previewed = 0              # Changes reported in a dry run
+        # Called after the changes are applied (see FTCheckpoint.py)
+        self.onApply = None
+
+    def __len__(self):
+        return len(self.__changes)
+
+    # --- Queuing ---
+
+    def __Queue(self, key, change):
+        self.queued += 1
+        self.__changes[key] = change
+
+    def __QueueField(self, key, change, replaces):
+        # Custom field changes. A change replaces any pending changes
+        # to the same field of the kinds given in replaces.
+        hvo, fieldID = key[1], key[2]
+        keys = self.__fieldKeys.setdefault((hvo, fieldID), set())
+        for other in [k for k in keys if k[0] in replaces and k != key]:
+            del self.__changes[other]
+            keys.discard(other)
+        keys.add(key)
+        self.__Queue(key, change)
+
+    def __Simple(self, kind, obj, value, languageTagOrHandle):
+        self.__Queue((kind, _Hvo(obj), languageTagOrHandle),
+                     (kind, obj, None, value, languageTagOrHandle))
+
+    def LexiconSetLexemeForm(self, entry, form, languageTagOrHandle=None):
+        self.__Simple("LexemeForm", entry, form, languageTagOrHandle)
+
+    def LexiconSetSenseGloss(self, sense, gloss, languageTagOrHandle=None):
+        self.__Simple("Gloss", sense, gloss, languageTagOrHandle)
+
+    def LexiconSetExample(self, example, newString, languageTagOrHandle=None):
+        self.__Simple("Example", example, newString, languageTagOrHandle)
+
+    def ReversalSetForm(self, entry, form, languageTagOrHandle=None):
+        self.__Simple("ReversalForm", entry, form, languageTagOrHandle)
+
+    def LexiconSetFieldText(self, senseOrEntryOrHvo, fieldID, text,
+                            languageTagOrHandle=None):
+        key = (FIELD_TEXT, _Hvo(senseOrEntryOrHvo), fieldID, languageTagOrHandle)
+        replaces = (FIELD_TAGS,) if languageTagOrHandle is None else ()
+        self.__QueueField(key,
+                          (FIELD_TEXT, senseOrEntryOrHvo, fieldID,
+                           text, languageTagOrHandle),
+                          replaces)
+
+    def LexiconSetFieldInteger(self, senseOrEntryOrHvo, fieldID, integer):
+        key = (FIELD_INTEGER, _Hvo(senseOrEntryOrHvo), fieldID)
+        self.__QueueField(key,
+                          (FIELD_INTEGER, senseOrEntryOrHvo, fieldID,
+                           integer, None),
+                          ())
+
+    def LexiconClearField(self, senseOrEntryOrHvo, fieldID):
+        key = (FIELD_CLEAR, _Hvo(senseOrEntryOrHvo), fieldID)
+        self.__QueueField(key,
+                          (FIELD_CLEAR, senseOrEntryOrHvo, fieldID,
+                           "", None),
+                          (FIELD_TEXT, FIELD_TAGS))
+
+    def LexiconAddTagToField(self, senseOrEntryOrHvo, fieldID, tag):
+        hvo = _Hvo(senseOrEntryOrHvo)
+        # Add to a pending value for the field, or to its pending tags.
+        textKey = (FIELD_TEXT, hvo, fieldID, None)
+        if textKey in self.__changes:
+            kind, obj, fieldID, text, ws = self.__changes[textKey]
+            self.__Queue(textKey, (kind, obj, fieldID, _AddTag(text, tag), ws))
+            return
+        key = (FIELD_TAGS, hvo, fieldID)
+        try:
+            tags = self.__changes[key][3]
+        except KeyError:
+            tags = []
+        if tag not in tags:
+            tags = tags + [tag]
+        self.__QueueField(key,
+                          (FIELD_TAGS, senseOrEntryOrHvo, fieldID, tags, None),
+                          ())
+
+    # --- Applying ---
+
+    def __OldAndNew(self, change):
+        # Returns the current and new values of a change.
+        kind, obj, fieldID, value, ws = change
+        project = self.project
+        if kind in SIMPLE_FIELDS:
+            getter = getattr(project, SIMPLE_FIELDS[kind][1])
+            return getter(obj, ws), value
+        if kind == FIELD_INTEGER:
+            return project.GetCustomFieldValue(obj, fieldID), value
+        if kind == FIELD_CLEAR:
+            # Always written: the old value isn't read, since the field
+            # can be an integer, or have several writing systems.
+            return None, value
+        old = project.LexiconGetFieldText(obj, fieldID, ws)
+        if kind == FIELD_TAGS:
+            new = old
+            for tag in value:
+                new = _AddTag(new, tag)
+            return old, new
+        return old, value
+
+    def __Write(self, change, new):
+        kind, obj, fieldID, value, ws = change
+        project = self.project
+        if kind in SIMPLE_FIELDS:
+            getattr(project, SIMPLE_FIELDS[kind][0])(obj, new, ws)
+        elif kind == FIELD_INTEGER:
+            project.LexiconSetFieldInteger(obj, fieldID, new)
+        elif kind == FIELD_CLEAR:
+            project.LexiconClearField(obj, fieldID)
+        else:
+            project.LexiconSetFieldText(obj, fieldID, new, ws)
+
+    def __Label(self, change):
+        kind, obj, fieldID, value, ws = change
+        if kind in SIMPLE_FIELDS:
+            label = SIMPLE_FIELDS[kind][2]
+        else:
+            if self.__fieldNames is None:
+                self.__fieldNames = dict(
+                    list(self.project.LexiconGetEntryCustomFields())
+                    + list(self.project.LexiconGetSenseCustomFields()))
+            label = self.__fieldNames.get(fieldID, str(fieldID))
+        if ws is not None:
+            label += f" ({ws})"
+        return label
+
+    def __Take(self):
+        changes = list(self.__changes.values())
+        self.__changes = {}
+        self.__fieldKeys = {}
+        return changes
+
+    def Apply(self):
+        """
+        Write the queued changes to the project, and return the number
+        of values that were changed.
+        """
+        applied = 0
+        for change in self.__Take():
+            old, new = self.__OldAndNew(change)
+            if old == new:
+                self.unchanged += 1
+                continue
+            self.__Write(change, new)
+            applied += 1
+        self.applied += applied
+        if self.onApply:
+            self.onApply()
+        return applied
+
+    def Preview(self):
+        """
+        Report the queued changes without writing them, and return the
+        number of values that would be changed.
+        """
+        previewed = 0
+        for change in self.__Take():
+            old, new = self.__OldAndNew(change)
+            if old == new:
+                self.unchanged += 1
+                continue
+            previewed += 1
+            if self.reporter:
+                if change[0] == FIELD_CLEAR:
+                    message = f"{self.__Label(change)}: cleared"
+                else:
+                    message = f"{self.__Label(change)}: '{old}' → '{new}'"
+                self.reporter.Info(message,
+                                   getattr(change[1], "Guid", None),
+                                   key=PREVIEW_KEY)
+        self.previewed += previewed
+        return previewed
+
+    def Checkpoint(self):
+        """
+        Apply the queued changes, or preview them in a dry run.
+        """
+        if self.modifyAllowed:
+            return self.Apply()
+        return self.Preview()
+
+    def Discard(self):
+        """
+        Discard the queued changes, and return how many there were.
+        """
+        return len(self.__Take())
@@ -0,0 +1,176 @@
+#
+#   Project: FlexTools
+#   Module:  FTCheckpoint
+#
+#   Checkpoint and resume for long-running Modules that modify the
+#   project:
+#    - RunModules() gives each Module that is allowed to make changes
+#      an FTCheckpoint as report.checkpoint.
+#    - The Module passes the objects it processes through Resume(),
+#      which records each one as completed (by Guid) when the Module
+#      moves on to the next one.
+#    - If the Module fails or is stopped, RunModules() saves the
+#      completed items in a sidecar file (in FTConfig.CheckpointPath),
+#      after the project has been closed and the changes saved.
+#    - The next run of the Module on the same project resumes from the
+#      sidecar file: Resume() skips the completed items. The sidecar
+#      file is deleted when the Module finishes normally.
+#    - Items with queued changes (see FTChangeSet.py) are only
+#      completed when the changes are applied.
+#    - summary is a dictionary that the Module can use for totals,
+#      etc. It is saved with the checkpoint. (Values must be JSON
+#      serializable.)
+#
+#   If the Module's version changes, the sidecar file is ignored.
+#   Delete the sidecar file to start again from the beginning.
+#
+#   Usage in a Module:
+#       entries = project.LexiconAllEntries()
+#       checkpoint = getattr(report, "checkpoint", None)
+#       if checkpoint:
+#           entries = checkpoint.Resume(entries, "Lexicon")
+#           counts = checkpoint.summary.setdefault("counts", {})
+#       for entry in entries:
+#           ...
+#
+
+import json
+import os
+import re
+from datetime import datetime
+
+import logging
+logger = logging.getLogger(__name__)
+
+# ------------------------------------------------------------------
+
+FORMAT_VERSION = 1
+
+def CheckpointFile(folder, projectName, moduleName):
+    """
+    Returns the path of the sidecar file for a Module and project.
+    """
+    name = re.sub(r'[^\w.-]+', "_", f"{projectName}-{moduleName}")
+    return os.path.join(folder, f"{name}.checkpoint.json")
+
+# ------------------------------------------------------------------
+
+class FTCheckpoint(object):
+
+    def __init__(self, path, projectName, moduleName, moduleVersion):
+        self.path = path
+        self.projectName = projectName
+        self.moduleName = moduleName
+        self.moduleVersion = str(moduleVersion)
+        self.summary = {}
+        self.lastKey = None             # The last completed item
+        self.resumed = False
+        self.skipped = 0                # Items skipped by Resume()
+        self.__completed = {}           # phase : set of keys
+        self.__pending = {}             # phase : list of keys
+        self.__lastPending = None
+        self.__Load()
+
+    def __Load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Checkpoint: can't read {self.path}: {e}")
+            return
+        if (data.get("format") != FORMAT_VERSION
+            or data.get("project") != self.projectName
+            or data.get("module") != self.moduleName
+            or data.get("version") != self.moduleVersion):
+            logger.warning(f"Checkpoint: ignoring {self.path} (different project or Module version)")
+            return
+        self.__completed = {phase : set(keys)
+                            for phase, keys in data["completed"].items()}
+        self.summary = data.get("summary", {})
+        self.lastKey = data.get("lastKey")
+        self.resumed = True
+        logger.info(f"Checkpoint: resuming {self.moduleName} with {self.NumCompleted()} items completed")
+
+    def NumCompleted(self):
+        return sum(len(keys) for keys in self.__completed.values())
+
+    def HasProgress(self):
+        return bool(self.__completed or self.summary)
+
+    # --- Used by Modules ---
+
+    def Resume(self, items, phase="", key=None):
+        """
+        Iterate over items, skipping the ones that were completed in an
+        earlier run. Each item is recorded as completed when the next
+        one is requested.
+        Items are identified by key(item), which must return a string.
+        The default key is the item's Guid. phase distinguishes separate
+        loops in the same Module.
+        """
+        if key is None:
+            key = lambda item: str(item.Guid)
+        completed = self.__completed.get(phase, ())
+        pending = self.__pending.setdefault(phase, [])
+        for item in items:
+            itemKey = key(item)
+            if itemKey in completed:
+                self.skipped += 1
+                continue
+            yield item
+            pending.append(itemKey)
+            self.__lastPending = itemKey
+
+    # --- Used by RunModules() ---
+
+    def Commit(self):
+        """
+        Record the pending items as completed.
+        """
+        for phase, keys in self.__pending.items():
+            if keys:
+                self.__completed.setdefault(phase, set()).update(keys)
+        self.__pending = {}
+        if self.__lastPending:
+            self.lastKey = self.__lastPending
+            self.__lastPending = None
+
+    def Discard(self):
+        """
+        Forget the pending items, since their changes weren't applied.
+        """
+        self.__pending = {}
+        self.__lastPending = None
+
+    def Save(self):
+        data = {"format"    : FORMAT_VERSION,
+                "project"   : self.projectName,
+                "module"    : self.moduleName,
+                "version"   : self.moduleVersion,
+                "saved"     : datetime.now().isoformat(timespec="seconds"),
+                "lastKey"   : self.lastKey,
+                "summary"   : self.summary,
+                "completed" : {phase : sorted(keys)
+                               for phase, keys in self.__completed.items()}}
+        tempPath = self.path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(tempPath, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tempPath, self.path)
+        except (OSError, TypeError) as e:
+            logger.error(f"Checkpoint: failed to save {self.path}: {e}")
+            return False
+        logger.info(f"Checkpoint: saved {self.path} with {self.NumCompleted()} items completed")
+        return True
+
+    def Remove(self):
+        try:
+            os.remove(self.path)
+            logger.info(f"Checkpoint: removed {self.path}")
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.error(f"Checkpoint: failed to remove {self.path}: {e}")
@@ -68,14 +68,36 @@ class FTC_BadNameError(Error):
         self.message = message
 
 # ---------------------------------------------------------------------
+# Per-module options that can be given in a module's section of the
+# collection ini file. E.g.:
+#       [Duplicates\Merge_Entries.py]
+#       TimeBudget = 1800
+#       Profile = sampling
+#       CacheResults = no
+#       Isolate = yes
+
+MODULE_OPTION_TimeBudget   = "TimeBudget"   # Maximum run time in seconds
+MODULE_OPTION_Profile      = "Profile"      # cprofile or sampling (See FTProfiler.py)
+MODULE_OPTION_CacheResults = "CacheResults" # yes or no (See FTResultCache.py)
+MODULE_OPTION_Isolate      = "Isolate"      # yes or no (See FTSandbox.py)
+
 class Collection(list):
     """
-    A wrapper class for the collections list of modules, with an extra
-    property, "disableRunAll".
+    A wrapper class for the collections list of modules, with extra
+    properties:
+        "disableRunAll"
+        "moduleOptions": a dictionary of module name : dictionary of 
+            per-module options.
     """
     def __init__(self, *args):
         list.__init__(self, *args)
         self.disableRunAll = False
+        self.moduleOptions = {}
+
+    def GetOption(self, moduleName, option, default=None):
+        # (ConfigParser stores the option names in lower case.)
+        options = self.moduleOptions.get(moduleName, {})
+        return options.get(option.lower(), default)
 
 # ---------------------------------------------------------------------
 class CollectionsManager(object):
@@ -112,6 +134,11 @@ class CollectionsManager(object):
                 modules = cp.sections()
                 converted = [self.mm.PathToName(p) for p in modules]
                 collection = Collection(converted)
+                for path, name in zip(modules, converted):
+                    options = {k : v for k, v in cp.items(path)
+                                     if k not in cp.defaults()}
+                    if options:
+                        collection.moduleOptions[name] = options
                 if cp.has_option(DEFAULTSECT, self.DISABLERUNALL):
                     collection.disableRunAll = cp.getboolean(DEFAULTSECT, 
                                                              self.DISABLERUNALL)
@@ -213,7 +240,8 @@ class CollectionsManager(object):
         # Create an empty section for each module. ConfigParser preserves 
         # the order.
         cp = ConfigParser(interpolation=None)
-        paths = {self.mm.NameToPath(m) : {} for m in collection}
+        paths = {self.mm.NameToPath(m) : collection.moduleOptions.get(m, {})
+                 for m in collection}
         cp.read_dict(paths)
 
         if collection.disableRunAll:
@@ -13,11 +13,31 @@
 #       CollectionsPath
 #       CollectionTabs
 #       CurrentProject
+#       RunHistoryPath
+#       ReportHistoryPath - Folder for comparing reports between runs.
+#                           (See FTReportDiff.py)
+#       ProfilePath       - Folder for profiles of module runs.
+#                           (See FTProfiler.py)
+#       CheckpointPath    - Folder for the checkpoints of modules that
+#                           were stopped. (See FTCheckpoint.py)
+#       ResultCachePath   - Folder for the saved reports of read-only
+#                           modules. (See FTResultCache.py)
 #   These flags modify some behaviours. See UIMain.py for explanations.
 #       WarnOnModify
 #       DisableDoubleClick
 #       SimplifiedRunOps
 #       StopOnError
+#       ConcurrentModules - Run independent read-only modules at the 
+#                           same time. (See FTScheduler.py)
+#       TraceMemory       - Record peak memory use of each module.
+#                           (See FTRunStats.py)
+#       CacheLookups      - Cache FLExProject lookups during a run.
+#                           (See FTProjectCache.py)
+#       CacheResults      - Replay the saved report of read-only modules
+#                           if the project hasn't changed.
+#                           (See FTResultCache.py)
+#       IsolateModules    - Run each module in a child process.
+#                           (See FTSandbox.py)
 #
 #   Craig Farrow
 #   Copyright 2012-2025
@@ -55,6 +75,11 @@ logger.info(f"Current working directory: {BASE_PATH}")
 CONFIG_PATH      = join(BASE_PATH, INI_FILENAME)
 MODULES_PATH     = join(BASE_PATH, "Modules")
 COLLECTIONS_PATH = join(BASE_PATH, "Collections")
+RUN_HISTORY_PATH = join(BASE_PATH, "flextools-history.jsonl")
+REPORT_HISTORY_PATH = join(BASE_PATH, "Report history")
+PROFILE_PATH     = BASE_PATH        # With flextools.log
+CHECKPOINT_PATH  = join(BASE_PATH, "Checkpoints")
+RESULT_CACHE_PATH = join(BASE_PATH, "Result cache")
 
 #----------------------------------------------------------- 
 # Load the configuration
@@ -70,3 +95,30 @@ if not FTConfig.ModulesPath:
 if not FTConfig.CollectionsPath:
     FTConfig.CollectionsPath = COLLECTIONS_PATH
 
+if not FTConfig.RunHistoryPath:
+    FTConfig.RunHistoryPath = RUN_HISTORY_PATH
+
+if not FTConfig.ReportHistoryPath:
+    FTConfig.ReportHistoryPath = REPORT_HISTORY_PATH
+
+if not FTConfig.ProfilePath:
+    FTConfig.ProfilePath = PROFILE_PATH
+
+if not FTConfig.CheckpointPath:
+    FTConfig.CheckpointPath = CHECKPOINT_PATH
+
+if not FTConfig.ResultCachePath:
+    FTConfig.ResultCachePath = RESULT_CACHE_PATH
+
+#----------------------------------------------------------- 
+
+def NoSave():
+    """
+    Stop FTConfig saving flextools.ini when this process exits. Worker
+    processes (see RunCollection.py and FTSandbox.py) call this, since
+    they read the same file as FlexTools and each other, and must not
+    write it. Their settings are passed to them instead.
+    """
+    # (ConfigStore saves in __del__, and its __setattr__ sets a config
+    # value, so replace the method directly.)
+    object.__setattr__(FTConfig, "save", lambda: None)
@@ -0,0 +1,161 @@
+#
+#   Project: FlexTools
+#   Module:  FTMessageStore
+#
+#   A list-like store for the FTReporter's (type, message, reference)
+#   tuples, which keeps memory use flat for Modules that report a lot
+#   of messages:
+#    - The most recent messages are kept in memory (up to windowSize).
+#    - When the window is full, the oldest half of it is written to an
+#      append-only temporary file as length-prefixed records.
+#    - Messages can be accessed by index (including negative indexes)
+#      and iterated over, as with a list. Only an 8-byte file offset
+#      per spilled message is kept in memory.
+#
+#   Message texts and references are stored as strings. A reference
+#   that isn't a string (or None) is stored as its repr() when it is
+#   spilled to disk.
+#
+
+import struct
+import tempfile
+import threading
+from array import array
+
+# ------------------------------------------------------------------
+
+# Record header: message type, message length, reference length.
+# A length of -1 means None.
+_HEADER = struct.Struct("<Bii")
+
+def _Encode(s):
+    if s is None:
+        return -1, b""
+    if not isinstance(s, str):
+        s = repr(s)
+    data = s.encode("utf-8")
+    return len(data), data
+
+def _Decode(length, data):
+    if length < 0:
+        return None
+    return data.decode("utf-8")
+
+# ------------------------------------------------------------------
+
+class FTMessageStore(object):
+
+    DEFAULT_WINDOW = 10000
+
+    def __init__(self, windowSize=DEFAULT_WINDOW):
+        self.windowSize = max(2, windowSize)
+        self.__lock = threading.RLock()
+        self.__file = None
+        self.__offsets = array("q")     # File offsets of spilled messages
+        self.__window = []              # The most recent messages
+
+    def __del__(self):
+        self.Close()
+
+    def Close(self):
+        """
+        Discard all the messages and release the spill file.
+        """
+        with self.__lock:
+            if self.__file:
+                self.__file.close()
+                self.__file = None
+            self.__offsets = array("q")
+            self.__window = []
+
+    # --- Spilling to disk ---
+
+    def __Spill(self):
+        # Write the oldest half of the window to the end of the file.
+        if not self.__file:
+            self.__file = tempfile.TemporaryFile(prefix="flextools-report-")
+        numToSpill = len(self.__window) // 2
+        self.__file.seek(0, 2)
+        offset = self.__file.tell()
+        chunks = []
+        for msgType, msg, ref in self.__window[:numToSpill]:
+            msgLen, msgData = _Encode(msg)
+            refLen, refData = _Encode(ref)
+            self.__offsets.append(offset)
+            record = _HEADER.pack(msgType, msgLen, refLen) + msgData + refData
+            chunks.append(record)
+            offset += len(record)
+        self.__file.write(b"".join(chunks))
+        del self.__window[:numToSpill]
+
+    def __ReadSpilled(self, start, stop):
+        # Read the spilled messages [start, stop) with a single read.
+        self.__file.seek(self.__offsets[start])
+        if stop < len(self.__offsets):
+            data = self.__file.read(self.__offsets[stop] - self.__offsets[start])
+        else:
+            data = self.__file.read()
+        messages = []
+        pos = 0
+        for i in range(start, stop):
+            msgType, msgLen, refLen = _HEADER.unpack_from(data, pos)
+            pos += _HEADER.size
+            msg = _Decode(msgLen, data[pos:pos + max(msgLen, 0)])
+            pos += max(msgLen, 0)
+            ref = _Decode(refLen, data[pos:pos + max(refLen, 0)])
+            pos += max(refLen, 0)
+            messages.append((msgType, msg, ref))
+        return messages
+
+    # --- List interface ---
+
+    def append(self, message):
+        with self.__lock:
+            self.__window.append(message)
+            if len(self.__window) > self.windowSize:
+                self.__Spill()
+
+    def __len__(self):
+        # __Spill() adds the offsets before it trims the window, so the
+        # two lengths are only consistent under the lock.
+        with self.__lock:
+            return len(self.__offsets) + len(self.__window)
+
+    def __getitem__(self, index):
+        with self.__lock:
+            numSpilled = len(self.__offsets)
+            count = numSpilled + len(self.__window)
+
+            if isinstance(index, slice):
+                start, stop, step = index.indices(count)
+                if step != 1:
+                    return [self[i] for i in range(start, stop, step)]
+                stop = max(start, stop)
+                result = []
+                if start < numSpilled:
+                    result = self.__ReadSpilled(start, min(stop, numSpilled))
+                result.extend(self.__window[max(start - numSpilled, 0):
+                                            max(stop - numSpilled, 0)])
+                return result
+
+            if index < 0:
+                index += count
+            if not 0 <= index < count:
+                raise IndexError("message index out of range")
+            if index >= numSpilled:
+                return self.__window[index - numSpilled]
+            return self.__ReadSpilled(index, index + 1)[0]
+
+    def __iter__(self):
+        # Read the messages in blocks rather than seeking for each one.
+        index = 0
+        while index < len(self):
+            block = self[index:index + self.windowSize]
+            yield from block
+            index += len(block)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __repr__(self):
+        return f"<FTMessageStore: {len(self)} messages, {len(self.__offsets)} on disk>"
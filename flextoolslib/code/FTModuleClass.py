@@ -18,6 +18,18 @@ FTM_Synopsis    = 'moduleSynopsis'
 FTM_Help        = 'moduleHelp'
 FTM_Description = 'moduleDescription'
 
+# Optional documentation keys
+FTM_Reads       = 'moduleReads'
+FTM_Writes      = 'moduleWrites'
+
+# Data areas for FTM_Reads and FTM_Writes. A custom field can be given
+# more precisely by appending its name, e.g. FTD_Lexicon+":FTFlags"
+FTD_Lexicon     = 'lexicon'
+FTD_Reversals   = 'reversals'
+FTD_Texts       = 'texts'
+FTD_Wordforms   = 'wordforms'
+FTD_Lists       = 'lists'
+
 # Private - don't define these in the module
 FTM_Path        = 'modulePath'
 FTM_HasConfig   = 'moduleHasConfiguration'  # Note: configuration not implemented yet.
@@ -54,6 +66,30 @@ class FlexToolsModuleClass (object):
                        - reference is an optional hyperlink to a lexical
                          entry in FLEx.
                          It is built with project.BuildGotoURL(entry)
+                         For entries and senses, the object's Guid 
+                         (entry.Guid) can be given instead, and the link 
+                         is only built if the user needs it. For other
+                         objects (e.g. reversal entries), use GotoRef(obj).
+                       - Messages that may be repeated many times can be
+                         given a key, e.g.
+                            report.Warning(msg, reference, key="missing-morph")
+                         Only the first report.keyCap messages with the
+                         same key are shown individually, then a count 
+                         and examples are shown at the end of the run.
+                   Modules that use multiprocessing can report from
+                   the worker processes with an FTReportQueue.
+                   (See FTReportProxy.py)
+                   report.runData is a FTRunData.FTRunData instance
+                   with cached lexicon data that is shared by all the
+                   modules in a run (None if not available.)
+                   report.changes is a FTChangeSet.FTChangeSet, which
+                   queues changes to the project and writes them when
+                   the module finishes, or previews them in a dry run.
+                   (None if not available.)
+                   report.checkpoint is a FTCheckpoint.FTCheckpoint,
+                   which lets a module that was stopped resume from
+                   where it got to. (None if modifications aren't 
+                   allowed.)
            - _modififyAllowed_ is True if the user has permitted any kind
              of modification to the project. If this is False then the module
              should ensure that no data is modified.
@@ -75,6 +111,15 @@ class FlexToolsModuleClass (object):
                              purpose clearly.
                              If relevant, include specific information about
                              how the project is modified.
+      Optionally:
+        FTM_Reads          : A list of the data areas that the module reads.
+        FTM_Writes         : A list of the data areas that the module
+                             writes when modifications are allowed.
+                             Data areas are the FTD_ constants, optionally
+                             narrowed to a custom field, e.g. "lexicon:FTFlags".
+                             Read-only modules that declare FTM_Reads can
+                             be run concurrently with other independent
+                             modules. (See FTScheduler.py)
     Exceptions:
         KeyError - raised if there are missing documentation keys.
     """
@@ -15,12 +15,28 @@
 
 import os
 import sys
+import threading
+import types
 import importlib.util
 import traceback
+from concurrent.futures import ThreadPoolExecutor, Future
 
 import System
 
 from . import FTReport
+from . import FTCollections
+from .FTRunData import FTRunData
+from . import FTScheduler
+from . import FTRunStats
+from . import FTReportSinks
+from . import FTReportDiff
+from . import FTProfiler
+from .FTProjectCache import FTProjectCache, FTCachingProject
+from .FTChangeSet import FTChangeSet
+from . import FTCheckpoint
+from . import FTResultCache
+from . import FTSandbox
+from .. import version as libraryVersion
 from flexlibs import (
     FLExProject, 
     FP_ProjectError, 
@@ -32,7 +48,7 @@ from flexlibs import (
 from .FTModuleClass import *
 
 # Loads .pth files from Modules\
-from .FTConfig import FTConfig
+from .FTConfig import FTConfig, CONFIG_PATH
 MODULES_PATH = FTConfig.ModulesPath
 
 import site
@@ -79,7 +95,7 @@ class ModuleManager (object):
                                      writeEnabled = modifyAllowed)
         except:
             logger.error("Project failed to open: %s" % projectName)
-            del self.project
+            self.project = None
             raise
         logger.info("Project opened: %s" % projectName)
 
@@ -88,10 +104,9 @@ class ModuleManager (object):
         if self.project:
             # Save any changes and release the LCM Cache.
             self.project.CloseProject()
-            del self.project
+            self.project = None
 
     def __buildExceptionMessages(self, e, msg):
-        __copyMessage = _("Use Ctrl-C to copy this report to the clipboard to see more information.")
         eName = details = ""
         # Test for .NET Exception first, since they are also Python Exceptions.
         if isinstance(e, System.Exception): #.NET
@@ -103,9 +118,508 @@ class ModuleManager (object):
             eStack = traceback.format_exc()
             details = "{}: {}\n{}".format(eName, eMsg, eStack)
 
+        return self.__formatExceptionMessages(msg, eName, details)
+
+    def __formatExceptionMessages(self, msg, eName, details):
+        __copyMessage = _("Use Ctrl-C to copy this report to the clipboard to see more information.")
         return " ".join((msg.format(eName), __copyMessage)),\
                details
 
+    def __ModifyAllowed(self, docs, modifyAllowed):
+        # In simplified mode, we always allow mods if the module does.
+        if FTConfig.simplifiedRunOps:
+            return docs[FTM_ModifiesDB]
+        return modifyAllowed
+
+    def __DataAccess(self, moduleName, modifyAllowed):
+        docs = self.GetDocs(moduleName)
+        if not docs:
+            # Only an error message will be reported
+            return ([], [])
+        if self.__Isolated(moduleName):
+            # The project is closed while it runs, so it runs alone.
+            return (FTScheduler.ALL_DATA, FTScheduler.ALL_DATA)
+        return FTScheduler.DataAccess(docs,
+                                      self.__ModifyAllowed(docs, modifyAllowed))
+
+    def __TimeBudget(self, moduleName):
+        options = self.__moduleOptions.get(moduleName, {})
+        budget = options.get(FTCollections.MODULE_OPTION_TimeBudget.lower())
+        if budget:
+            try:
+                return float(budget)
+            except ValueError:
+                logger.warning(f"{moduleName}: invalid time budget {budget!r}")
+        return None
+
+    def __ProfileMode(self, moduleName):
+        # Profiling for the whole run, or for this module from the
+        # collection.
+        if self.__profileMode:
+            return self.__profileMode
+        options = self.__moduleOptions.get(moduleName, {})
+        return FTProfiler.ProfileMode(
+                    options.get(FTCollections.MODULE_OPTION_Profile.lower()))
+
+    def __Isolated(self, moduleName):
+        # Run the module in a child process? (See FTSandbox.py)
+        options = self.__moduleOptions.get(moduleName, {})
+        isolated = FTSandbox.IsolateOption(
+                    options.get(FTCollections.MODULE_OPTION_Isolate.lower()))
+        if isolated is None:
+            isolated = bool(FTConfig.isolateModules)
+        return isolated
+
+    def __ResultCacheKey(self, moduleName, docs, modifyAllowed):
+        # Returns the key for caching the module's report, or None if
+        # the report shouldn't be cached. (See FTResultCache.py)
+        if modifyAllowed or docs[FTM_ModifiesDB]:
+            return None
+        if self.__forceRun or self.__projectChanged or not self.__dateModified:
+            return None
+        options = self.__moduleOptions.get(moduleName, {})
+        enabled = FTResultCache.CacheOption(
+                    options.get(FTCollections.MODULE_OPTION_CacheResults.lower()))
+        if enabled is None:
+            enabled = bool(FTConfig.cacheResults)
+        if not enabled or self.__ProfileMode(moduleName):
+            return None
+        moduleHash = FTResultCache.FileHash(docs[FTM_Path])
+        if not moduleHash:
+            return None
+        # The module's library is only hashed once per run.
+        folder = os.path.dirname(docs[FTM_Path])
+        with self.__runLock:
+            if folder not in self.__libraryHashes:
+                self.__libraryHashes[folder] = FTResultCache.LibraryHash(folder)
+            libraryHash = self.__libraryHashes[folder]
+        if not libraryHash:
+            return None
+        return FTResultCache.ResultKey(self.__projectName,
+                                       self.__dateModified,
+                                       moduleHash,
+                                       docs[FTM_Version],
+                                       libraryHash,
+                                       FTConfig.UILanguage,
+                                       libraryVersion)
+
+    def __ReplayReport(self, created, messages, reporter):
+        reporter.Info(_("The project hasn't changed since this module was run on {}. Showing the saved report.").format(created))
+        reportFunctions = {reporter.INFO    : reporter.Info,
+                           reporter.WARNING : reporter.Warning,
+                           reporter.ERROR   : reporter.Error}
+        try:
+            for msgType, msg, ref in messages:
+                if msgType == reporter.BLANK:
+                    reporter.Blank()
+                else:
+                    reportFunctions[msgType](msg, ref)
+        except FTReport.FTR_CancelledError as e:
+            # Note: Error() doesn't check for cancellation.
+            reporter.Error(_("Module stopped:") + " " + e.message)
+
+    def __OpenCheckpoint(self, moduleName, docs, reporter):
+        path = FTCheckpoint.CheckpointFile(FTConfig.CheckpointPath,
+                                           self.__projectName,
+                                           moduleName)
+        checkpoint = FTCheckpoint.FTCheckpoint(path,
+                                               self.__projectName,
+                                               moduleName,
+                                               docs[FTM_Version])
+        if checkpoint.resumed:
+            reporter.Info(_("Resuming from the last run: {} items already done. (Delete this file to start again.)").format(
+                          checkpoint.NumCompleted()),
+                          reporter.FileURL(path))
+        return checkpoint
+
+    def __SaveCheckpoints(self):
+        # Called after the project has been closed, so the changes for
+        # the completed items have been saved.
+        for checkpoint, finished in self.__checkpoints:
+            if finished:
+                checkpoint.Remove()
+            elif checkpoint.HasProgress():
+                checkpoint.Save()
+        self.__checkpoints = []
+
+    def __ReportChanges(self, changes, discarded, reporter):
+        # Note: Error() doesn't check for cancellation.
+        if discarded:
+            logger.warning(f"{discarded} queued changes discarded")
+            reporter.Error(_("{} queued changes were not applied.").format(discarded))
+        elif reporter.cancelToken.IsCancelled:
+            pass
+        elif changes.modifyAllowed:
+            if changes.queued:
+                reporter.Info(_("Changes applied: {} ({} already up to date)").format(
+                              changes.applied, changes.unchanged))
+        elif changes.previewed:
+            reporter.Info(_("Changes not applied (dry run): {}").format(
+                          changes.previewed))
+
+    def __OpenRunProject(self, reporter):
+        # Open the project for the modules that run in FlexTools. It is
+        # opened before the first of them, and again after modules 
+        # have run in the sandbox (see __RunSandboxed()). Returns False
+        # if it couldn't be opened.
+        projectName = self.__projectName
+        if not self.__projectOpened:
+            reporter.Info(_("Opening project '{}'...").format(projectName))
+        try:
+            self.__openProject(projectName, self.__modifyAllowed)
+        except FP_FileLockedError as e:
+            logger.error(e.message)
+            reporter.Error(_("Error opening project:") +\
+                _("This project is in use by another program. To allow shared access to this project, turn on the sharing option in the Sharing tab of the FieldWorks Project Properties dialog."))
+            return False
+        except FP_MigrationRequired as e:
+            logger.error(e.message)
+            reporter.Error(_("Error opening project:") +\
+                           _("This project needs to be opened in FieldWorks in order for it to be migrated to the latest format."))
+            return False
+        except FP_ProjectError as e:
+            logger.error(e.message)
+            reporter.Error(_("Error opening project:") + e.message,
+                           e.message)
+            return False
+        except Exception as e:
+            msg, details = self.__buildExceptionMessages(e, _("OpenProject failed with exception {}!"))
+            logger.error(msg)
+            logger.error(details)
+            reporter.Error(msg, details)
+            return False
+
+        # Data cache shared by the modules (until the next sandboxed
+        # module)
+        reporter.runData = FTRunData(self.project)
+        if self.__projectOpened:
+            return True
+        self.__projectOpened = True
+        # For the result cache key (See FTResultCache.py)
+        if not self.__dateModified:
+            try:
+                self.__dateModified = str(self.project.GetDateLastModified())
+            except Exception as e:
+                logger.warning(f"GetDateLastModified failed: {e}")
+        # For building links from Guid references after the run
+        if not reporter.urlBuilder:
+            try:
+                reporter.urlBuilder = FTReport.GotoURLBuilder(self.project)
+            except Exception as e:
+                logger.warning(f"GotoURLBuilder failed: {e}")
+        return True
+
+    def __RunSandboxed(self, moduleName, docs, displayName, reporter,
+                       modifyAllowed, stats, cacheKey):
+        # Run the module in a child process, which opens the project 
+        # itself. (See FTSandbox.py)
+        # The project is closed if it is open, and opened again by 
+        # __RunModules() before the next module that runs in FlexTools.
+        reporter.runData = None
+        self.__closeProject()
+        if self.__projectCache:
+            self.__projectCache.Clear()
+
+        if modifyAllowed:
+            # The child process saves the checkpoint.
+            checkpoint = self.__OpenCheckpoint(moduleName, docs, reporter)
+            checkpointPath = checkpoint.path
+        else:
+            checkpointPath = None
+
+        sandbox = FTSandbox.FTSandbox(CONFIG_PATH,
+                    {"modulePath"     : docs[FTM_Path],
+                     "moduleName"     : moduleName,
+                     "displayName"    : displayName,
+                     "moduleVersion"  : str(docs[FTM_Version]),
+                     "projectName"    : self.__projectName,
+                     "modifyAllowed"  : modifyAllowed,
+                     "checkpointPath" : checkpointPath,
+                     "profileMode"    : self.__ProfileMode(moduleName),
+                     "profilePath"    : FTConfig.ProfilePath,
+                     "cacheLookups"   : bool(FTConfig.cacheLookups),
+                     "uiLanguage"     : FTConfig.UILanguage,
+                     "modulesPath"    : FTConfig.ModulesPath,
+                     })
+
+        with stats:
+            reporter.cancelToken.SetTimeBudget(self.__TimeBudget(moduleName))
+            start = len(reporter.messages)
+            try:
+                result = sandbox.Run(reporter)
+            finally:
+                reporter.cancelToken.SetTimeBudget(None)
+
+            # Note: Error() doesn't check for cancellation.
+            if result.stopped:
+                logger.warning(f"{moduleName}: {result.stopped}")
+                reporter.Error(_("Module stopped:") + " " + result.stopped)
+            if result.killed:
+                reporter.Error(_("The module didn't stop, so its process was ended. Its changes weren't saved."))
+            elif not result.completed:
+                logger.error(f"{moduleName}: process exit code {result.exitCode}")
+                reporter.Error(_("The module's process ended unexpectedly (exit code {}). Its changes weren't saved.").format(
+                               result.exitCode),
+                               reporter.FileURL(sandbox.logPath))
+            elif result.exception:
+                eName, details, isRuntimeError = result.exception
+                if isRuntimeError:
+                    msg = _("Module failed with a programming error!")
+                else:
+                    msg = _("Module failed with exception {}!")
+                msg, details = self.__formatExceptionMessages(msg, eName, details)
+                logger.error(msg)
+                logger.error(details)
+                reporter.Error(msg, details)
+            elif result.finished and cacheKey \
+                 and not reporter.cancelToken.IsCancelled:
+                self.__resultCache.Save(self.__projectName,
+                                        moduleName,
+                                        cacheKey,
+                                        reporter.messages[start:len(reporter.messages)])
+
+        # The module's CPU time is the child's. (None if it didn't
+        # report back.)
+        stats.cpuTime = result.cpuTime
+        # If the project hasn't been opened in FlexTools
+        if not reporter.urlBuilder:
+            reporter.urlBuilder = FTReport.TemplateURLBuilder(result.urlTemplate)
+        if not self.__dateModified:
+            self.__dateModified = result.dateModified
+
+        if result.changes:
+            self.__ReportChanges(types.SimpleNamespace(**result.changes),
+                                 result.discarded,
+                                 reporter)
+        for path in result.profiles:
+            reporter.Info(_("Profile saved to {}").format(path),
+                          reporter.FileURL(path))
+
+        logger.info(f"Module statistics: {stats.AsDict()}")
+        return stats
+
+    def __RunModule(self, moduleName, reporter, modifyAllowed,
+                    concurrent=False):
+        # Returns the FTModuleStats for the run, or None if the module
+        # couldn't be run.
+        # concurrent is True for modules in a concurrent stage, which
+        # don't record their peak memory. (See FTRunStats.py)
+        docs = self.GetDocs(moduleName)
+        if not docs:
+            reporter.Error(_("Module '{}' is missing or failed to import.").format(moduleName))
+            return None
+
+        reporter.Blank()
+
+        # Issue #20 - only display the base name of the module 
+        # in the main UI.
+        try:
+            displayName = moduleName.split(".", 1)[1]
+        except IndexError:
+            # It is a top-level module with no '<library>.' prefix.
+            displayName = moduleName
+
+        reporter.Info(_("Running '{}' (version {})...").format(
+                       displayName,
+                       str(docs[FTM_Version])))
+
+        modifyAllowed = self.__ModifyAllowed(docs, modifyAllowed)
+
+        stats = FTRunStats.FTModuleStats(displayName,
+                                         docs[FTM_Version],
+                                         reporter,
+                                         traceMemory=bool(FTConfig.traceMemory)
+                                                     and not concurrent)
+
+        # Replay the saved report if the project hasn't changed.
+        cacheKey = self.__ResultCacheKey(moduleName, docs, modifyAllowed)
+        if cacheKey:
+            cached = self.__resultCache.Load(self.__projectName,
+                                             moduleName,
+                                             cacheKey)
+            if cached:
+                logger.info(f"{moduleName}: replaying the cached report")
+                with stats:
+                    self.__ReplayReport(*cached, reporter)
+                return stats
+        if modifyAllowed:
+            # Cached reports may be out of date after this module.
+            with self.__runLock:
+                self.__projectChanged = True
+
+        if self.__Isolated(moduleName):
+            return self.__RunSandboxed(moduleName, docs, displayName,
+                                       reporter, modifyAllowed, stats,
+                                       cacheKey)
+        return self.__RunInProcess(moduleName, docs, displayName,
+                                   reporter, modifyAllowed, stats,
+                                   cacheKey)
+
+    def __RunInProcess(self, moduleName, docs, displayName, reporter,
+                       modifyAllowed, stats, cacheKey):
+        # Run the module in FlexTools, on the open project.
+        profileMode = self.__ProfileMode(moduleName)
+        if profileMode:
+            profiler = FTProfiler.FTProfiler(FTConfig.ProfilePath,
+                                             displayName,
+                                             profileMode)
+        else:
+            profiler = None
+
+        # Modules that can make changes don't use the object-level
+        # cache, since they can change objects directly.
+        if self.__projectCache:
+            project = FTCachingProject(self.project,
+                                       self.__projectCache,
+                                       cacheObjects=not modifyAllowed)
+        else:
+            project = self.project
+
+        # Write-behind changes (See FTChangeSet.py)
+        changes = FTChangeSet(project, reporter, modifyAllowed)
+        reporter.changes = changes
+
+        # Resuming modules that were stopped (See FTCheckpoint.py)
+        if modifyAllowed:
+            checkpoint = self.__OpenCheckpoint(moduleName, docs, reporter)
+            changes.onApply = checkpoint.Commit
+        else:
+            checkpoint = None
+        reporter.checkpoint = checkpoint
+        finished = False
+
+        with stats:
+            reporter.cancelToken.SetTimeBudget(self.__TimeBudget(moduleName))
+            try:
+                if profiler:
+                    profiler.Start()
+                start = len(reporter.messages)
+                try:
+                    self.__modules[moduleName].Run(project,
+                                                   reporter,
+                                                   modifyAllowed=modifyAllowed)
+                finally:
+                    if profiler:
+                        profiler.Stop()
+                changes.Checkpoint()
+                finished = True
+                if cacheKey and not reporter.cancelToken.IsCancelled:
+                    with self.__runLock:
+                        self.__resultCache.Save(self.__projectName,
+                                                moduleName,
+                                                cacheKey,
+                                                reporter.messages[start:len(reporter.messages)])
+            except FTReport.FTR_CancelledError as e:
+                # Note: Error() doesn't check for cancellation.
+                logger.warning(f"{moduleName}: {e.message}")
+                reporter.Error(_("Module stopped:") + " " + e.message)
+            except FP_RuntimeError as e:
+                msg, details = self.__buildExceptionMessages(e, _("Module failed with a programming error!"))
+                logger.error(msg)
+                logger.error(details)
+                reporter.Error(msg, details)
+            except Exception as e:
+                msg, details = self.__buildExceptionMessages(e, _("Module failed with exception {}!"))
+                logger.error(msg)
+                logger.error(details)
+                reporter.Error(msg, details)
+            finally:
+                reporter.cancelToken.SetTimeBudget(None)
+                reporter.changes = None
+                reporter.checkpoint = None
+                discarded = changes.Discard()
+                if checkpoint:
+                    # Items with discarded changes aren't completed.
+                    if discarded:
+                        checkpoint.Discard()
+                    else:
+                        checkpoint.Commit()
+                    with self.__runLock:
+                        self.__checkpoints.append((checkpoint, finished))
+                if modifyAllowed and self.__projectCache:
+                    self.__projectCache.Clear()
+
+        if changes.applied and reporter.runData:
+            reporter.runData.Reset()
+        self.__ReportChanges(changes, discarded, reporter)
+
+        if profiler:
+            # (The paths are also logged, in case the run was stopped.)
+            for path in profiler.Save():
+                reporter.Info(_("Profile saved to {}").format(path),
+                              reporter.FileURL(path))
+
+        logger.info(f"Module statistics: {stats.AsDict()}")
+        return stats
+
+    def __RunStage(self, stage, reporter, modifyAllowed):
+        # Run a stage of independent modules (see FTScheduler). Each
+        # module reports to its own buffer, and the buffers are merged 
+        # into the main report in collection order when they have all
+        # finished.
+        # The modules that can run on worker threads only read the
+        # shared project. At most one module in the stage can't (see
+        # FTScheduler.BuildStages): it is run on this thread while the
+        # workers are running, which is safe because it doesn't
+        # conflict with them. The run state that __RunModule() changes
+        # is guarded by __runLock.
+        # Returns a list of the FTModuleStats in collection order.
+        logger.info(f"Running concurrently: {stage}")
+        buffers = []
+        for moduleName in stage:
+            buffer = FTReport.FTReporter()
+            buffer.runData = reporter.runData
+            buffer.cancelToken = FTReport.FTCancelToken(reporter.cancelToken)
+            buffers.append(buffer)
+
+        workers = min(len(stage), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = []
+            onThisThread = []
+            for i, (moduleName, buffer) in enumerate(zip(stage, buffers)):
+                access = self.__DataAccess(moduleName, modifyAllowed)
+                if FTScheduler.CanRunConcurrently(access):
+                    results.append(executor.submit(self.__RunModule,
+                                                   moduleName,
+                                                   buffer,
+                                                   modifyAllowed,
+                                                   True))
+                else:
+                    results.append(None)
+                    onThisThread.append((i, moduleName, buffer))
+            for i, moduleName, buffer in onThisThread:
+                results[i] = self.__RunModule(moduleName, buffer,
+                                              modifyAllowed, True)
+            results = [r.result() if isinstance(r, Future) else r
+                       for r in results]
+
+        for moduleName, buffer in zip(stage, buffers):
+            start = len(reporter.messages)
+            reporter.Merge(buffer)
+            self.__moduleRanges.append((moduleName, start, len(reporter.messages)))
+
+        return results
+
+    def __SaveReportHistory(self, projectName, reporter):
+        # Save the warnings and errors from each module for comparing
+        # with the next run. (See FTReportDiff.py)
+        def __records():
+            # Read the messages in blocks, since they may be on disk.
+            blockSize = reporter.messages.windowSize
+            for moduleName, start, stop in self.__moduleRanges:
+                for blockStart in range(start, stop, blockSize):
+                    blockStop = min(stop, blockStart + blockSize)
+                    for msgType, msg, ref in reporter.messages[blockStart:blockStop]:
+                        if msgType in (reporter.WARNING, reporter.ERROR):
+                            if not (ref is None or isinstance(ref, str)):
+                                ref = repr(ref)
+                            yield moduleName, msgType, msg, ref
+
+        FTReportDiff.SaveRun(FTConfig.ReportHistoryPath,
+                             projectName,
+                             [m for m, start, stop in self.__moduleRanges],
+                             __records())
+
     # --- Public methods ---
 
     def LoadAll(self):
@@ -114,6 +628,7 @@ class ModuleManager (object):
         # An empty list means there were no errors.
         
         self.project = None
+        self.__projectCache = None
         self.__modules = {}
         self.__errors = []
 
@@ -216,85 +731,150 @@ class ModuleManager (object):
         except KeyError:
             return None
 
-    def RunModules(self, projectName, moduleList, reporter, modifyAllowed = False):
-        if not projectName:
-            return False
+    def RunModules(self, projectName, moduleList, reporter, modifyAllowed = False,
+                   moduleOptions = None, reportFiles = None, profileMode = None,
+                   forceRun = False):
+        # moduleOptions is an optional dictionary of module name : 
+        # per-module options from the collection. (See FTCollections.py)
+        # reportFiles is an optional list of file paths to write the
+        # report to during the run. The file type is given by the 
+        # extension. (See FTReportSinks.py)
+        # profileMode profiles all the modules in the run. (See 
+        # FTProfiler.py)
+        # forceRun runs all the modules, even if they have a cached
+        # report. (See FTResultCache.py)
+        sinks = []
+        for path in reportFiles or []:
+            try:
+                sink = FTReportSinks.OpenSink(path)
+            except FTReportSinks.FTR_SinkError as e:
+                logger.error(e.message)
+                reporter.Error(e.message)
+                continue
+            reporter.AddSink(sink)
+            sinks.append(sink)
 
-        reporter.Info(_("Opening project '{}'...").format(projectName))
         try:
-            self.__openProject(projectName, modifyAllowed)
-        except FP_FileLockedError as e:
-            logger.error(e.message)
-            reporter.Error(_("Error opening project:") +\
-                _("This project is in use by another program. To allow shared access to this project, turn on the sharing option in the Sharing tab of the FieldWorks Project Properties dialog."))
-            return False
-        except FP_MigrationRequired as e:
-            logger.error(e.message)
-            reporter.Error(_("Error opening project:") +\
-                           _("This project needs to be opened in FieldWorks in order for it to be migrated to the latest format."))
-            return False
-        except FP_ProjectError as e:
-            logger.error(e.message)
-            reporter.Error(_("Error opening project:") + e.message,
-                           e.message)
-            return False
-        except Exception as e:
-            msg, details = self.__buildExceptionMessages(e, _("OpenProject failed with exception {}!"))
-            logger.error(msg)
-            logger.error(details)
-            reporter.Error(msg, details)
+            return self.__RunModules(projectName, moduleList, reporter,
+                                     modifyAllowed, moduleOptions, profileMode,
+                                     forceRun)
+        finally:
+            for sink in sinks:
+                reporter.RemoveSink(sink)
+                sink.Close()
+
+    def __RunModules(self, projectName, moduleList, reporter, modifyAllowed,
+                     moduleOptions, profileMode, forceRun):
+        if not projectName:
             return False
 
-        for moduleName in moduleList:
-            docs = self.GetDocs(moduleName)
-            if not docs:
-                reporter.Error(_("Module '{}' is missing or failed to import.").format(moduleName))
-                continue
-
-            reporter.Blank()
+        self.__moduleOptions = moduleOptions or {}
+        self.__profileMode = profileMode
+        self.__projectName = projectName
+        self.__modifyAllowed = modifyAllowed
+        self.__checkpoints = []     # (FTCheckpoint, finished)
+        # For the run state that modules in a concurrent stage change.
+        # (See __RunStage())
+        self.__runLock = threading.Lock()
+        self.__forceRun = forceRun
+        self.__projectChanged = False
+        self.__resultCache = FTResultCache.FTResultCache(FTConfig.ResultCachePath)
+        self.__libraryHashes = {}   # folder : hash
+        # The project is opened before the first module that runs in
+        # FlexTools. (See __OpenRunProject())
+        self.project = None
+        self.__projectOpened = False
+        self.__dateModified = None
+        reporter.urlBuilder = None
+        # Cache of FLExProject lookups (See FTProjectCache.py)
+        if FTConfig.cacheLookups:
+            self.__projectCache = FTProjectCache()
+        else:
+            self.__projectCache = None
+
+        # For the modules' peak memory (See FTRunStats.py)
+        stopTracing = FTConfig.traceMemory and FTRunStats.StartMemoryTracing()
 
-            # Issue #20 - only display the base name of the module 
-            # in the main UI.
-            try:
-                displayName = moduleName.split(".", 1)[1]
-            except IndexError:
-                # It is a top-level module with no '<library>.' prefix.
-                displayName = moduleName
-
-            reporter.Info(_("Running '{}' (version {})...").format(
-                           displayName,
-                           str(docs[FTM_Version])))
-            
-            # In simplified mode, we always allow mods if the module does.
-            if FTConfig.simplifiedRunOps:
-                modifyAllowed = docs[FTM_ModifiesDB]
+        try:
+            # Modules that declare their data access can be run 
+            # concurrently if ConcurrentModules is enabled.
+            if FTConfig.concurrentModules:
+                # Sandboxed modules close the project, so they run alone.
+                stages = FTScheduler.BuildStages(
+                            [(m, self.__DataAccess(m, modifyAllowed))
+                             for m in moduleList],
+                            isolated={m for m in moduleList
+                                      if self.__Isolated(m)})
+            else:
+                stages = [[m] for m in moduleList]
+
+            runStats = []
+            self.__moduleRanges = []    # (moduleName, start, stop) in reporter.messages
+            stopped = False
+            opened = True
+            for stage in stages:
+                # Before the first module that runs in FlexTools, and
+                # after modules that ran in the sandbox
+                if not self.project \
+                   and not (len(stage) == 1 and self.__Isolated(stage[0])):
+                    opened = self.__OpenRunProject(reporter)
+                    if not opened:
+                        break
 
-            try:
-                self.__modules[moduleName].Run(self.project,
-                                               reporter,
-                                               modifyAllowed=modifyAllowed)
-            except FP_RuntimeError as e:
-                msg, details = self.__buildExceptionMessages(e, _("Module failed with a programming error!"))
-                logger.error(msg)
-                logger.error(details)
-                reporter.Error(msg, details)
-            except Exception as e:
-                msg, details = self.__buildExceptionMessages(e, _("Module failed with exception {}!"))
-                logger.error(msg)
-                logger.error(details)
-                reporter.Error(msg, details)
-                
-            if FTConfig.stopOnError:
-                if reporter.messageCounts[reporter.ERROR]:
+                try:
+                    if len(stage) == 1:
+                        start = len(reporter.messages)
+                        results = [self.__RunModule(stage[0], reporter, modifyAllowed)]
+                        self.__moduleRanges.append((stage[0], start, len(reporter.messages)))
+                    else:
+                        results = self.__RunStage(stage, reporter, modifyAllowed)
+                    runStats.extend(r for r in results if r)
+                except FTReport.FTR_CancelledError:
+                    # Stopped between modules
+                    pass
+
+                if reporter.cancelToken.IsCancelled:
+                    reporter.cancelToken.Reset()
+                    reporter.Info(_("Processing stopped by the user."))
+                    stopped = True
                     break
 
-        numErrors   = reporter.messageCounts[reporter.ERROR]
-        numWarnings = reporter.messageCounts[reporter.WARNING]
-        reporter.Info(_("Processing completed. Errors: {}; Warnings: {}").format(
-                        numErrors, numWarnings))
-        self.__closeProject()
-
-        return True
+                if FTConfig.stopOnError:
+                    if reporter.messageCounts[reporter.ERROR]:
+                        break
+
+            # A partial run would show unfinished work as resolved.
+            if not stopped and opened:
+                self.__SaveReportHistory(projectName, reporter)
+
+            reporter.ReportKeySummary()
+
+            if runStats:
+                reporter.Blank()
+                reporter.Info(_("Module statistics:"))
+                for line in FTRunStats.SummaryLines(runStats):
+                    reporter.Info(line)
+                FTRunStats.AppendToHistory(FTConfig.RunHistoryPath,
+                                           projectName,
+                                           modifyAllowed,
+                                           runStats)
+
+            numErrors   = reporter.messageCounts[reporter.ERROR]
+            numWarnings = reporter.messageCounts[reporter.WARNING]
+            reporter.Info(_("Processing completed. Errors: {}; Warnings: {}").format(
+                            numErrors, numWarnings))
+        finally:
+            # Always release the project, even if the run was stopped.
+            if self.__projectCache:
+                logger.info(f"Project cache: {self.__projectCache.Statistics()}")
+                self.__projectCache = None
+            reporter.runData = None
+            self.__closeProject()
+            self.__SaveCheckpoints()
+            if stopTracing:
+                FTRunStats.StopMemoryTracing()
+
+        return opened
 
 
 # ------------------------------------------------------------------
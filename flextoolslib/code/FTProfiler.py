@@ -0,0 +1,263 @@
+#
+#   Project: FlexTools
+#   Module:  FTProfiler
+#
+#   Profiling of Module runs, without changing the Module:
+#    - "cprofile" mode: cProfile records every call. The results are
+#      saved as a .prof file, which can be viewed with pstats,
+#      snakeviz, etc. This slows the Module down, often by 2x or more.
+#      A .collapsed file (see below) is also made from the profile's 
+#      caller/callee times, with counts in microseconds. (cProfile 
+#      only records the time for each caller, not for whole stacks, so
+#      the time of a function that is called from several places is 
+#      shared between them in proportion.)
+#    - "sampling" mode: a background thread samples the Module's call
+#      stack every few milliseconds. The overhead is low, so it is
+#      suitable for long runs, but there are no call counts. The
+#      sampled stacks are saved in collapsed-stack format (one
+#      "frame;frame;frame count" line per stack), for flamegraph.pl,
+#      speedscope, etc.
+#   If cProfile isn't available (e.g. another Module is being profiled
+#   with it), the Module is sampled instead.
+#
+#   The files are saved in FTConfig.ProfilePath (the folder with
+#   flextools.log, by default).
+#
+#   Usage:
+#       profiler = FTProfiler(folder, "Module name", mode)
+#       profiler.Start()
+#       ...             # On the same thread
+#       profiler.Stop()
+#       for path in profiler.Save():
+#           report.Info(path, report.FileURL(path))
+#
+
+import cProfile
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+import logging
+logger = logging.getLogger(__name__)
+
+# ------------------------------------------------------------------
+
+PROFILE_CPROFILE = "cprofile"
+PROFILE_SAMPLING = "sampling"
+
+def ProfileMode(value):
+    """
+    Convert a profiling option (e.g. from a collection .ini file) to a
+    profiling mode, or None for no profiling. "yes", "true", "on" and
+    "1" select cProfile.
+    """
+    if not value:
+        return None
+    value = str(value).strip().lower()
+    if value in (PROFILE_CPROFILE, PROFILE_SAMPLING):
+        return value
+    if value in ("yes", "true", "on", "1"):
+        return PROFILE_CPROFILE
+    if value not in ("no", "false", "off", "0"):
+        logger.warning(f"Unknown profiling mode {value!r}")
+    return None
+
+# ------------------------------------------------------------------
+
+def _WriteCollapsed(path, stacks):
+    # One "frame;frame;frame count" line per stack.
+    with open(path, "w", encoding="utf-8") as f:
+        for stack, count in stacks.most_common():
+            f.write(f"{stack} {count}\n")
+
+class FTStackSampler(object):
+    """
+    Samples the call stack of one thread at regular intervals, and
+    counts the collapsed stacks.
+    """
+    def __init__(self, threadId, rootFrame=None, interval=0.005):
+        self.threadId = threadId
+        self.rootFrame = rootFrame      # Stacks are recorded up to here
+        self.interval = interval
+        self.stacks = Counter()
+        self.numSamples = 0
+        self.__stopEvent = threading.Event()
+        self.__thread = None
+        self.__labels = {}              # code object : label
+
+    def __Label(self, code):
+        try:
+            return self.__labels[code]
+        except KeyError:
+            # ';' separates frames in the collapsed format.
+            label = "{} ({}:{})".format(code.co_name,
+                                        os.path.basename(code.co_filename),
+                                        code.co_firstlineno).replace(";", ":")
+            self.__labels[code] = label
+            return label
+
+    def __Sample(self):
+        frame = sys._current_frames().get(self.threadId)
+        labels = []
+        while frame is not None and frame is not self.rootFrame:
+            labels.append(self.__Label(frame.f_code))
+            frame = frame.f_back
+        if labels:
+            labels.reverse()
+            self.stacks[";".join(labels)] += 1
+            self.numSamples += 1
+
+    def __Run(self):
+        while not self.__stopEvent.wait(self.interval):
+            self.__Sample()
+
+    def Start(self):
+        self.__stopEvent.clear()
+        self.__thread = threading.Thread(target=self.__Run,
+                                         name="FTStackSampler",
+                                         daemon=True)
+        self.__thread.start()
+
+    def Stop(self):
+        if self.__thread:
+            self.__stopEvent.set()
+            self.__thread.join()
+            self.__thread = None
+
+    def Write(self, path):
+        _WriteCollapsed(path, self.stacks)
+
+# ------------------------------------------------------------------
+
+def __FrameLabel(func):
+    # The same format as FTStackSampler's labels.
+    fileName, lineNumber, name = func
+    if fileName == "~":                 # Built-in function
+        label = name
+    else:
+        label = f"{name} ({os.path.basename(fileName)}:{lineNumber})"
+    return label.replace(";", ":")
+
+def CollapsedStacks(profile, minFraction=0.0001):
+    """
+    Returns a Counter of collapsed stack : microseconds for a
+    cProfile.Profile. Each function's time is divided between its
+    callers in proportion to the time recorded for each caller. Stacks
+    with less than minFraction of the total time are left out.
+    """
+    stats = pstats.Stats(profile).stats
+    # {caller : [(callee, cumulative time for this caller)]}
+    callees = {}
+    for func, (cc, nc, tt, ct, callers) in stats.items():
+        for caller, callerStats in callers.items():
+            callees.setdefault(caller, []).append((func, callerStats[3]))
+    # The roots are the functions called from outside the profile (i.e.
+    # by frames that were already running when it started), with the 
+    # time that isn't accounted for by their recorded callers.
+    roots = []
+    for func, (cc, nc, tt, ct, callers) in stats.items():
+        seconds = ct - sum(callerStats[3] for caller, callerStats in callers.items()
+                           if caller in stats and caller != func)
+        if seconds > 0:
+            roots.append((func, seconds))
+    total = sum(seconds for func, seconds in roots)
+    minTime = total * minFraction
+
+    stacks = Counter()
+    def __Walk(func, seconds, path, labels):
+        cc, nc, tt, ct, callers = stats[func]
+        if not ct:
+            return
+        labels = labels + [__FrameLabel(func)]
+        selfTime = seconds * tt / ct
+        if selfTime >= minTime:
+            stacks[";".join(labels)] += round(selfTime * 1000000)
+        for callee, calleeTime in callees.get(func, []):
+            if callee in path:          # Recursion is counted above
+                continue
+            share = seconds * calleeTime / ct
+            if share >= minTime:
+                __Walk(callee, share, path | {callee}, labels)
+
+    for func, seconds in roots:
+        if seconds >= minTime:
+            __Walk(func, seconds, {func}, [])
+    return +stacks                      # Drop zero counts
+
+# ------------------------------------------------------------------
+
+class FTProfiler(object):
+    """
+    Profiles the code that runs on the calling thread between Start()
+    and Stop().
+    """
+    def __init__(self, folder, name, mode=PROFILE_CPROFILE, interval=0.005):
+        self.folder = folder
+        self.name = name
+        self.mode = mode
+        self.interval = interval
+        self.seconds = 0
+        self.__profile = None
+        self.__sampler = None
+        self.__startTime = None
+
+    def Start(self):
+        if self.mode == PROFILE_CPROFILE:
+            self.__profile = cProfile.Profile()
+            try:
+                self.__profile.enable()
+            except ValueError as e:
+                # Only one cProfile can be active at a time in some
+                # Python versions (e.g. when Modules run concurrently).
+                logger.warning(f"{self.name}: cProfile not available ({e}); sampling instead")
+                self.__profile = None
+        if not self.__profile:
+            # The caller's frame is the root of the sampled stacks.
+            self.__sampler = FTStackSampler(threading.get_ident(),
+                                            sys._getframe(1),
+                                            self.interval)
+            self.__sampler.Start()
+        self.__startTime = time.perf_counter()
+
+    def Stop(self):
+        if self.__startTime is None:
+            return
+        self.seconds = time.perf_counter() - self.__startTime
+        self.__startTime = None
+        if self.__profile:
+            self.__profile.disable()
+        if self.__sampler:
+            self.__sampler.Stop()
+
+    def __BasePath(self):
+        name = re.sub(r'[^\w.-]+', "_", self.name)
+        timestamp = time.strftime("%Y%m%d-%H%M%S")
+        return os.path.join(self.folder, f"profile-{name}-{timestamp}")
+
+    def Save(self):
+        """
+        Save the profile files, and return a list of their paths.
+        """
+        paths = []
+        basePath = self.__BasePath()
+        try:
+            os.makedirs(self.folder, exist_ok=True)
+            if self.__profile:
+                self.__profile.dump_stats(basePath + ".prof")
+                paths.append(basePath + ".prof")
+                stacks = CollapsedStacks(self.__profile)
+                if stacks:
+                    _WriteCollapsed(basePath + ".collapsed", stacks)
+                    paths.append(basePath + ".collapsed")
+            if self.__sampler and self.__sampler.numSamples:
+                self.__sampler.Write(basePath + ".collapsed")
+                paths.append(basePath + ".collapsed")
+        except OSError as e:
+            logger.error(f"Failed to save the profile to {basePath}: {e}")
+        logger.info(f"{self.name}: profiled {self.seconds:.2f}s, "
+                    f"{self.__sampler.numSamples if self.__sampler else 0} samples: {paths}")
+        return paths
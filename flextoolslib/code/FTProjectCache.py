@@ -0,0 +1,238 @@
+#
+#   Project: FlexTools
+#   Module:  FTProjectCache
+#
+#   A caching proxy for FLExProject, so that Modules that make the same
+#   lookups over and over are faster without any code changes:
+#    - RunModules() creates one FTProjectCache per run, and passes each
+#      Module an FTCachingProject that uses it. Everything that isn't
+#      cached is passed through to the FLExProject.
+#    - Project-level lookups are always cached: writing system handles
+#      and names, and custom field IDs and types. Only lookups that
+#      return scalar values (numbers, strings and tuples of them) are
+#      cached, so callers can't change each other's values, and no LCM
+#      objects are kept alive. Lists (of writing systems, parts of
+#      speech, custom fields, etc.) are always read from the project.
+#    - Object-level lookups (headwords, lexeme forms, glosses, custom
+#      field text, reversal forms, etc.) are cached by Hvo, but only for
+#      Modules that aren't making changes. Modules can change objects
+#      directly through LCM, which the proxy can't see.
+#    - The FLExProject setters invalidate the cached values that they
+#      change (for all the Modules in the run). After a Module that was
+#      allowed to make changes, all the cached values are discarded,
+#      since it could have added parts of speech, custom fields, etc.
+#    - The proxy passes isinstance() checks for the project's class,
+#      and attributes that are set on it are set on the project.
+#
+#   Each object-level cache is cleared when it reaches maxSize values,
+#   to bound the memory used.
+#
+#   The proxy is off by default. Set FTConfig.CacheLookups to True to
+#   turn it on.
+#
+
+import threading
+
+import logging
+logger = logging.getLogger(__name__)
+
+# ------------------------------------------------------------------
+
+# Project-level lookups
+PROJECT_LOOKUPS = {
+    "ProjectName",
+    "WSHandle",
+    "WSUIName",
+    "GetDefaultVernacularWS",
+    "GetDefaultAnalysisWS",
+    "GetFieldID",
+    "LexiconGetEntryCustomFieldNamed",
+    "LexiconGetSenseCustomFieldNamed",
+    "LexiconFieldIsStringType",
+    "LexiconFieldIsMultiType",
+    "LexiconFieldIsAnyStringType",
+    }
+
+# Object-level lookups, where the first argument is an object (or Hvo):
+# method name : the data it reads
+OBJECT_LOOKUPS = {
+    "LexiconGetHeadword"        : "form",
+    "LexiconGetLexemeForm"      : "form",
+    "LexiconGetCitationForm"    : "form",
+    "LexiconGetSenseGloss"      : "gloss",
+    "LexiconGetSenseDefinition" : "definition",
+    "LexiconGetSensePOS"        : "pos",
+    "LexiconGetSenseNumber"     : "senses",
+    "LexiconGetExample"         : "example",
+    "LexiconGetFieldText"       : "field",
+    "ReversalGetForm"           : "reversal",
+    }
+
+# Setters: method name : the data it changes
+SETTERS = {
+    "LexiconSetLexemeForm"      : "form",
+    "LexiconSetSenseGloss"      : "gloss",
+    "LexiconSetExample"         : "example",
+    "LexiconSetFieldText"       : "field",
+    "LexiconClearField"         : "field",
+    "LexiconAddTagToField"      : "field",
+    "LexiconSetFieldInteger"    : "field",
+    "ReversalSetForm"           : "reversal",
+    }
+
+# Lookups that depend on other objects, which are cleared completely
+# when their data changes. (Changing a lexeme form can change the
+# homograph numbers of other entries.)
+CLEAR_ALL = {"LexiconGetHeadword"}
+
+_MISSING = object()
+
+# ------------------------------------------------------------------
+
+class FTProjectCache(object):
+    """
+    The cached values for one run, shared by all the Modules'
+    FTCachingProjects.
+    """
+    DEFAULT_MAX_SIZE = 200000
+
+    def __init__(self, maxSize=DEFAULT_MAX_SIZE):
+        self.maxSize = maxSize
+        self.__lock = threading.Lock()
+        self.projectValues = {}         # (method, args, kwargs) : value
+        self.objectValues = {m : {} for m in OBJECT_LOOKUPS}
+                                        # method : {hvo : {(args, kwargs) : value}}
+        self.hits = 0
+        self.misses = 0
+
+    def Invalidate(self, data, hvo):
+        # Discard the values of data for one object.
+        with self.__lock:
+            for method, methodData in OBJECT_LOOKUPS.items():
+                if methodData == data:
+                    if method in CLEAR_ALL:
+                        self.objectValues[method] = {}
+                    else:
+                        self.objectValues[method].pop(hvo, None)
+
+    def Clear(self):
+        """
+        Discard all the cached values.
+        """
+        with self.__lock:
+            self.projectValues = {}
+            self.objectValues = {m : {} for m in OBJECT_LOOKUPS}
+
+    def Count(self, hit):
+        # (Modules in a concurrent stage share the cache.)
+        with self.__lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def Statistics(self):
+        total = self.hits + self.misses
+        return {"hits"    : self.hits,
+                "misses"  : self.misses,
+                "hitRate" : round(self.hits / total, 3) if total else None}
+
+# ------------------------------------------------------------------
+
+class FTCachingProject(object):
+    """
+    A proxy for an FLExProject that caches lookups in an FTProjectCache.
+    cacheObjects should be False for Modules that can make changes.
+    """
+
+    def __init__(self, project, cache, cacheObjects=True):
+        # (__setattr__ passes attributes on to the project.)
+        object.__setattr__(self, "_FTCachingProject__project", project)
+        object.__setattr__(self, "_FTCachingProject__cache", cache)
+        object.__setattr__(self, "_FTCachingProject__cacheObjects", cacheObjects)
+
+    @property
+    def uncachedProject(self):
+        return self.__project
+
+    @property
+    def __class__(self):
+        # So that isinstance(project, FLExProject) works in Modules.
+        return type(self.__project)
+
+    def __setattr__(self, name, value):
+        # Modules can set attributes on the project. (A cached wrapper
+        # for the name is discarded.)
+        self.__dict__.pop(name, None)
+        setattr(self.__project, name, value)
+
+    def __getattr__(self, name):
+        # Called for everything except the attributes above and the
+        # wrappers that have been created already.
+        attr = getattr(self.__project, name)
+        if name in PROJECT_LOOKUPS:
+            wrapper = self.__ProjectLookup(name, attr)
+        elif name in OBJECT_LOOKUPS:
+            if not self.__cacheObjects:
+                return attr
+            wrapper = self.__ObjectLookup(name, attr)
+        elif name in SETTERS:
+            wrapper = self.__Setter(SETTERS[name], attr)
+        else:
+            return attr
+        # Save the wrapper so that __getattr__ isn't called again.
+        self.__dict__[name] = wrapper
+        return wrapper
+
+    def __ProjectLookup(self, name, method):
+        cache = self.__cache
+        def __Lookup(*args, **kwargs):
+            key = (name, args, tuple(sorted(kwargs.items())))
+            try:
+                value = cache.projectValues[key]
+                cache.Count(True)
+                return value
+            except KeyError:
+                pass
+            except TypeError:
+                # Unhashable arguments
+                return method(*args, **kwargs)
+            cache.Count(False)
+            value = cache.projectValues[key] = method(*args, **kwargs)
+            return value
+        return __Lookup
+
+    def __ObjectLookup(self, name, method):
+        cache = self.__cache
+        def __Lookup(obj, *args, **kwargs):
+            hvo = getattr(obj, "Hvo", obj)
+            key = (args, tuple(sorted(kwargs.items())))
+            try:
+                hash((hvo, key))
+            except TypeError:
+                # Unhashable arguments
+                return method(obj, *args, **kwargs)
+            values = cache.objectValues[name]
+            objectCache = values.get(hvo)
+            if objectCache is None:
+                if len(values) >= cache.maxSize:
+                    values.clear()
+                objectCache = values[hvo] = {}
+            else:
+                value = objectCache.get(key, _MISSING)
+                if value is not _MISSING:
+                    cache.Count(True)
+                    return value
+            cache.Count(False)
+            value = objectCache[key] = method(obj, *args, **kwargs)
+            return value
+        return __Lookup
+
+    def __Setter(self, data, method):
+        cache = self.__cache
+        def __Set(obj, *args, **kwargs):
+            try:
+                return method(obj, *args, **kwargs)
+            finally:
+                cache.Invalidate(data, getattr(obj, "Hvo", obj))
+        return __Set
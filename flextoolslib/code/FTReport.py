@@ -10,6 +10,36 @@
 #        - Warning: a warning message, with optional FLEx reference
 #        - Error: an error message, with optional FLEx reference
 #    - The UI displays this report information to the user.
+#    - A UI can register a batch handler, which is passed lists of
+#      messages at most batchRate times per second, instead of one 
+#      message at a time. Flush() delivers any remaining messages.
+#    - The messages are kept in a FTMessageStore, which holds the most
+#      recent messages in memory and writes older ones to a temporary
+#      file. It can be accessed as a list.
+#    - Report sinks (see FTReportSinks.py) can be added to write the
+#      messages to a file as they are reported.
+#    - Messages can be given a key, which identifies repeated messages
+#      of the same kind (e.g. key="missing-morph"). Only the first keyCap
+#      messages with a key are stored; after that only the count and
+#      a sample of keySamples messages are kept. ReportKeySummary() 
+#      adds a summary of the suppressed messages at the end of the run.
+#    - A message's reference can be an object's Guid instead of a 
+#      FieldWorks link (project.BuildGotoURL(obj)), which is much 
+#      cheaper to report. It is stored as "guid:<guid>", and ResolveRef()
+#      builds the link (to the Lexicon Edit tool) only when it is needed.
+#      GotoRef(obj) gives the same kind of reference for objects that 
+#      are shown in other tools (reversal entries, wordforms, texts).
+#    - Progress updates are throttled: they are passed to the progress
+#      handler at most every progressInterval seconds, or when the value
+#      has moved on by progressStep percent. The first and final values
+#      are always passed on.
+#    - The progress rate (items per second) is tracked with an 
+#      exponential moving average, and is available with an estimated
+#      time remaining as progressRate and progressETA (seconds).
+#    - Running Modules can be stopped through the cancellation token
+#      (cancelToken). The Module's next call to ProgressUpdate(), Info()
+#      or Warning() then raises FTR_CancelledError, which is handled by
+#      RunModules().
 #
 #   Craig Farrow
 #   2008 - 2024
@@ -17,6 +47,160 @@
 
 import os
 import pathlib
+import time
+import threading
+
+from .FTMessageStore import FTMessageStore
+
+# ------------------------------------------------------------------
+
+# These are derived from BaseException so that they aren't caught by
+# general 'except Exception' handlers in the Modules.
+
+class FTR_CancelledError(BaseException):
+    """
+    Exception raised in a Module when the run has been stopped.
+
+    Attributes:
+        message -- explanation of why the run was stopped
+    """
+
+    def __init__(self, message):
+        self.message = message
+
+class FTR_TimeBudgetError(FTR_CancelledError):
+    """
+    Exception raised in a Module when it has run longer than its
+    time budget.
+    """
+    pass
+
+# ------------------------------------------------------------------
+
+class FTCancelToken(object):
+    """
+    A cancellation flag and optional deadline that is checked by the
+    FTReporter whenever a Module reports progress or messages.
+    A token can be linked to a parent token, in which case cancelling
+    the parent also cancels this token.
+    """
+    def __init__(self, parent=None):
+        self.__parent = parent
+        self.Reset()
+
+    def Reset(self):
+        self.__cancelled = False
+        self.__deadline = None
+        self.__budget = None
+
+    def Cancel(self):
+        self.__cancelled = True
+
+    @property
+    def IsCancelled(self):
+        return self.__cancelled or \
+               bool(self.__parent and self.__parent.IsCancelled)
+
+    def SetTimeBudget(self, seconds):
+        """
+        Start a time budget of the given number of seconds.
+        None removes the time budget.
+        """
+        if seconds:
+            self.__budget = seconds
+            self.__deadline = time.monotonic() + seconds
+        else:
+            self.__budget = self.__deadline = None
+
+    def Check(self):
+        if self.__cancelled:
+            raise FTR_CancelledError(_("Stopped by the user."))
+        if self.__deadline and time.monotonic() > self.__deadline:
+            self.__deadline = None
+            raise FTR_TimeBudgetError(
+                _("Stopped after exceeding the time budget of {} seconds.").format(
+                  self.__budget))
+        if self.__parent:
+            self.__parent.Check()
+
+# ------------------------------------------------------------------
+
+GUID_REF_PREFIX = "guid:"
+
+# The FieldWorks tool for each class of object, as used by 
+# FLExProject.BuildGotoURL(). Other objects are shown in Lexicon Edit.
+DEFAULT_TOOL = "lexiconEdit"
+GOTO_TOOLS = {
+    "ReversalIndexEntry" : "reversalToolEditComplete",
+    "WfiWordform"        : "Analyses",
+    "WfiAnalysis"        : "Analyses",
+    "WfiGloss"           : "Analyses",
+    "Text"               : "interlinearEdit",
+    }
+
+def GotoURLTemplate(project):
+    """
+    Returns a template (a string) for the FieldWorks links to objects
+    in the project, for TemplateURLBuilder(). Returns None if the link
+    format isn't recognised.
+    """
+    # Make a template from the link to an object with a known Guid.
+    # (The LangProject is shown in Lexicon Edit.)
+    guid = str(project.lp.Guid)
+    url = str(project.BuildGotoURL(project.lp))
+    if guid not in url:
+        return None
+    template = url.replace("{", "{{").replace("}", "}}").replace(guid, "{guid}")
+    toolParam = "tool=" + DEFAULT_TOOL
+    if template.count(toolParam) == 1:
+        template = template.replace(toolParam, "tool={tool}")
+    return template
+
+def TemplateURLBuilder(template):
+    """
+    Returns a function that builds a FieldWorks link from a Guid string
+    and a tool name (default: Lexicon Edit), using a template from
+    GotoURLTemplate(). It returns None for a tool it can't link to.
+    Returns None if template is None.
+    """
+    if template is None:
+        return None
+    hasTool = "tool={tool}" in template
+
+    def __Build(guid, tool=DEFAULT_TOOL):
+        if hasTool:
+            return template.format(guid=guid, tool=tool)
+        if tool == DEFAULT_TOOL:
+            return template.format(guid=guid)
+        return None
+
+    return __Build
+
+def GotoURLBuilder(project):
+    """
+    Returns a function that builds a FieldWorks link from a Guid string
+    and a tool name (default: Lexicon Edit). The function doesn't use
+    the project, so it can still be used after the project has been
+    closed. It returns None for a tool it can't link to.
+    Returns None if the link format isn't recognised.
+    """
+    return TemplateURLBuilder(GotoURLTemplate(project))
+
+def IsGuidRef(ref):
+    # System.Guid (from Python.NET) or uuid.UUID
+    return type(ref).__name__ in ("Guid", "UUID")
+
+def GotoRef(obj):
+    """
+    Returns a reference to an LCM object for report.Info(), Warning()
+    and Error(). Like obj.Guid, the FieldWorks link is only built when 
+    it is needed, but it goes to the tool for the object's class (e.g.
+    reversal entries are shown in the Reversal Indexes tool.)
+    """
+    tool = GOTO_TOOLS.get(obj.ClassName)
+    if tool:
+        return f"{GUID_REF_PREFIX}{tool}:{obj.Guid}"
+    return GUID_REF_PREFIX + str(obj.Guid)
 
 # ------------------------------------------------------------------
 
@@ -28,7 +212,32 @@ class FTReporter(object):
 
     def __init__(self):
         self.__handler = None
+        self.__batchHandler = None
+        self.__batch = []
+        self.__batchLock = threading.Lock()
+        self.__nextBatchTime = 0
+        self.batchRate = 10             # Batches per second
         self.__progressHandler = None
+        self.progressInterval = 0.1     # Seconds between progress updates
+        self.progressStep = 1           # or percent of progressMax
+        self.progressMax = 0
+        self.__lastProgress = None
+        self.__nextProgressTime = 0
+        self.progressSmoothing = 0.3    # EMA weight of the latest rate
+        self.__sinks = []
+        self.keyCap = 100               # Messages stored per key
+        self.keySamples = 5             # Samples kept after the cap
+        # Run-scoped data cache (FTRunData), set by RunModules()
+        self.runData = None
+        # The running Module's write-behind changes (FTChangeSet), set
+        # by RunModules()
+        self.changes = None
+        # The running Module's checkpoint (FTCheckpoint), set by
+        # RunModules()
+        self.checkpoint = None
+        # Builds links from Guid references (see GotoURLBuilder)
+        self.urlBuilder = None
+        self.cancelToken = FTCancelToken()
         self.Reset()
 
     def RegisterProgressHandler(self, handler):
@@ -40,18 +249,146 @@ class FTReporter(object):
         if handler:
             self.__handler = handler
 
+    def RegisterBatchHandler(self, handler, batchRate=None):
+        """
+        Register a handler that is passed a list of messages at most 
+        batchRate times per second. This handler may be called on any
+        thread.
+        """
+        if handler:
+            self.__batchHandler = handler
+        if batchRate:
+            self.batchRate = batchRate
+
+    def AddSink(self, sink):
+        """
+        Add a report sink (FTReportSinks.FTReportSink), which is passed
+        every message as it is reported. The caller is responsible for
+        closing the sink.
+        """
+        self.__sinks = self.__sinks + [sink]
+
+    def RemoveSink(self, sink):
+        self.__sinks = [s for s in self.__sinks if s is not sink]
+
     def Reset(self):
         self.messageCounts = [0,0,0,0]
-        self.messages = []
+        self.messages = FTMessageStore()
+        self.__keyed = {}               # key : message group
+        self.progressRate = None        # Items per second
+        self.progressETA = None         # Seconds remaining
+        self.__rateTime = self.__rateValue = self.__phaseStart = None
+        self.__progressItems = 0        # Totals for completed phases
+        self.__progressTime = 0.0
+        with self.__batchLock:
+            self.__batch = []
+        self.cancelToken.Reset()
+
+    def __DeliverBatch(self, force):
+        # Hand the pending messages to the batch handler if it is 
+        # time, or if force is True.
+        now = time.monotonic()
+        with self.__batchLock:
+            if not self.__batch:
+                return
+            if not force and now < self.__nextBatchTime:
+                return
+            batch, self.__batch = self.__batch, []
+            self.__nextBatchTime = now + 1.0 / self.batchRate
+        self.__batchHandler(batch)
+
+    def Flush(self, force=True):
+        """
+        Deliver any messages that are waiting for the batch handler.
+        If force is False, they are only delivered if a batch is due.
+        """
+        if self.__batchHandler:
+            self.__DeliverBatch(force)
+
+    def __CountKey(self, msgType, msg, ref, key):
+        # Returns True if the message should be stored.
+        try:
+            group = self.__keyed[key]
+        except KeyError:
+            group = self.__keyed[key] = {"type"    : msgType,
+                                         "count"   : 0,
+                                         "shown"   : 0,
+                                         "samples" : []}
+        group["count"] += 1
+        if group["shown"] < self.keyCap:
+            group["shown"] += 1
+            return True
+        self.messageCounts[msgType] += 1
+        if len(group["samples"]) < self.keySamples:
+            group["samples"].append((msg, ref))
+        return False
+
+    def __Report(self, msgType, msg, ref, key=None):
+        if key is not None and not self.__CountKey(msgType, msg, ref, key):
+            return
 
-    def __Report(self, msgType, msg, ref):
         if not isinstance(msg, (str, type(None))):
             msg = repr(msg)
-            
-        self.messages.append((msgType, msg, ref))
+        if ref is not None and IsGuidRef(ref):
+            ref = GUID_REF_PREFIX + str(ref)
+
+        message = (msgType, msg, ref)
+        self.messages.append(message)
         self.messageCounts[msgType] += 1
         if self.__handler:
-            self.__handler(self.messages[-1])
+            self.__handler(message)
+        if self.__sinks:
+            exported = (msgType, msg, self.ResolveRef(ref))
+            for sink in self.__sinks:
+                sink.Write(exported)
+        if self.__batchHandler:
+            with self.__batchLock:
+                self.__batch.append(message)
+            self.__DeliverBatch(False)
+
+    def Merge(self, other):
+        """
+        Append all the messages from another FTReporter to this one.
+        Used for collecting the reports from modules that were run 
+        concurrently.
+        """
+        for msgType, msg, ref in other.messages:
+            self.__Report(msgType, msg, ref)
+        # The other reporter's stored messages have been counted above,
+        # so only add the counts of the suppressed ones.
+        for key, otherGroup in other.__keyed.items():
+            group = self.__keyed.setdefault(key, {"type"    : otherGroup["type"],
+                                                  "count"   : 0,
+                                                  "shown"   : 0,
+                                                  "samples" : []})
+            suppressed = otherGroup["count"] - otherGroup["shown"]
+            group["count"] += otherGroup["count"]
+            group["shown"] += otherGroup["shown"]
+            self.messageCounts[group["type"]] += suppressed
+            spaces = self.keySamples - len(group["samples"])
+            group["samples"].extend(otherGroup["samples"][:max(spaces, 0)])
+
+    def ReportKeySummary(self):
+        """
+        Report a summary of the keyed messages that weren't all stored,
+        with the sample messages that were kept.
+        """
+        groups = [(key, g) for key, g in self.__keyed.items()
+                  if g["count"] > g["shown"]]
+        if not groups:
+            return
+        # The summary lines aren't counted: the messages have been already.
+        counts = list(self.messageCounts)
+        self.__Report(self.BLANK, None, None)
+        self.__Report(self.INFO, _("Repeated messages:"), None)
+        for key, group in groups:
+            self.__Report(group["type"],
+                          _("{}: {} messages ({} not shown individually). Examples:").format(
+                            key, group["count"], group["count"] - group["shown"]),
+                          None)
+            for msg, ref in group["samples"]:
+                self.__Report(group["type"], "    " + str(msg), ref)
+        self.messageCounts = counts
 
     # --- Public methods for FTModules to use
 
@@ -60,33 +397,111 @@ class FTReporter(object):
     def Blank(self):
         self.__Report(self.BLANK, None, None)
         
-    def Info(self, msg, ref=None):
-        self.__Report(self.INFO, msg, ref)
+    # key is optional: see ReportKeySummary().
+
+    def Info(self, msg, ref=None, key=None):
+        self.cancelToken.Check()
+        self.__Report(self.INFO, msg, ref, key)
 
-    def Warning(self, msg, ref=None):
-        self.__Report(self.WARNING, msg, ref)
+    def Warning(self, msg, ref=None, key=None):
+        self.cancelToken.Check()
+        self.__Report(self.WARNING, msg, ref, key)
 
-    def Error(self, msg, ref=None):
-        self.__Report(self.ERROR, msg, ref)
+    def Error(self, msg, ref=None, key=None):
+        self.__Report(self.ERROR, msg, ref, key)
 
     # > Progress Bar
 
-    def ProgressUpdate(self, value):
+    def __Progress(self, value):
         if self.__progressHandler:
             self.__progressHandler(value+1, 
                                    self.progressMax, 
                                    self.progressMessage)
 
+    def ProgressUpdate(self, value):
+        self.cancelToken.Check()
+        # This is called for every item in a Module's main loop, so 
+        # only pass on the update if enough time has passed, the value
+        # has moved on enough, or it is the final value.
+        now = time.monotonic()
+        if now < self.__nextProgressTime and \
+           value + 1 < self.progressMax and \
+           (value - self.__lastProgress) * 100 < self.progressStep * self.progressMax:
+            return
+        self.__lastProgress = value
+        self.__nextProgressTime = now + self.progressInterval
+        if self.__rateTime is not None:
+            self.__UpdateRate(value, now)
+        # Deliver messages that have been waiting while the module
+        # is busy.
+        if self.__batch:
+            self.__DeliverBatch(False)
+        self.__Progress(value)
+
+    def __UpdateRate(self, value, now):
+        # Exponential moving average of the items per second.
+        elapsed = now - self.__rateTime
+        if elapsed <= 0 or value <= self.__rateValue:
+            return
+        rate = (value - self.__rateValue) / elapsed
+        if self.progressRate is None:
+            self.progressRate = rate
+        else:
+            self.progressRate += self.progressSmoothing * (rate - self.progressRate)
+        self.progressETA = max(self.progressMax - value - 1, 0) / self.progressRate
+        self.__rateTime = now
+        self.__rateValue = value
+
+    def __EndPhase(self):
+        # Add the items and time since ProgressStart() to the totals.
+        if self.__phaseStart is not None and self.__rateValue is not None:
+            self.__progressItems += self.__rateValue + 1
+            self.__progressTime += self.__rateTime - self.__phaseStart
+        self.__rateTime = self.__rateValue = self.__phaseStart = None
+        self.progressRate = self.progressETA = None
+
+    def ProgressTotals(self):
+        """
+        Returns (items, seconds): the number of progress items and the
+        time taken for them, for all the ProgressStart() phases since
+        the last Reset(). Used for the throughput in the run summary.
+        """
+        items, seconds = self.__progressItems, self.__progressTime
+        if self.__phaseStart is not None:
+            items += self.__rateValue + 1
+            seconds += self.__rateTime - self.__phaseStart
+        return items, seconds
+
     def ProgressStart(self, max, msg=None):
+        self.__EndPhase()
         self.progressMax = max
         self.progressMessage = msg
+        self.__nextProgressTime = 0     # Always show the start
+        self.__phaseStart = self.__rateTime = time.monotonic()
+        self.__rateValue = -1
         self.ProgressUpdate(-1)
            
     def ProgressStop(self):
+        # No cancellation check, since this is also used for clean-up.
+        self.__EndPhase()
         self.progressMax = 0            # Stop signal
         self.progressMessage = ""
-        self.ProgressUpdate(-1)
+        self.__Progress(-1)
            
+    # > References
+
+    def ResolveRef(self, ref):
+        """
+        Returns the FieldWorks link for a Guid reference, or the 
+        reference unchanged if it isn't one (or there is no urlBuilder).
+        """
+        if self.urlBuilder and isinstance(ref, str) and \
+           ref.startswith(GUID_REF_PREFIX):
+            # "guid:<guid>" or "guid:<tool>:<guid>" (see GotoRef())
+            tool, sep, guid = ref[len(GUID_REF_PREFIX):].rpartition(":")
+            return self.urlBuilder(guid, tool or DEFAULT_TOOL) or ref
+        return ref
+
     # > URL for linking to a file.
     
     def FileURL(self, fname):
@@ -99,5 +514,5 @@ if __name__ == '__main__':
     f.Warning("Cows crossing")
     f.Error("Bad bad news!")
     print(f.messageCounts)
-    print(f.messages)
+    print(list(f.messages))
     
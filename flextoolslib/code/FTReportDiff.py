@@ -0,0 +1,151 @@
+#
+#   Project: FlexTools
+#   Module:  FTReportDiff
+#
+#   Compares the report of a run with the report of the previous run
+#   on the same project:
+#    - At the end of each run, RunModules() saves the Modules' warning
+#      and error messages to the report history folder
+#      (FTConfig.ReportHistoryPath), in a sub-folder for each project.
+#      Each Module has its own latest and previous files, so running a
+#      different collection on the project doesn't replace them. The
+#      names of the Modules in the latest run are saved in run.json.
+#    - Each message has a stable key: a hash of the Module name, message
+#      type, message text and reference.
+#    - Compare() splits the messages into new (only in the latest run),
+#      resolved (only in the previous run) and unchanged. Only the
+#      Modules that were run in the latest run are compared, each with
+#      its own previous run.
+#
+#   Information messages aren't saved, since they often contain counts
+#   and timings that change from run to run.
+#
+
+import hashlib
+import json
+import os
+import re
+
+import logging
+logger = logging.getLogger(__name__)
+
+# ------------------------------------------------------------------
+
+LATEST   = "latest"
+PREVIOUS = "previous"
+RUN_FILE = "run.json"
+
+def __SafeName(name):
+    return re.sub(r'[<>:"/\\|?*]', "_", name)
+
+def __ProjectFolder(folder, projectName):
+    # The project name can be a path to a .fwdata file.
+    name = os.path.splitext(os.path.basename(projectName))[0]
+    return os.path.join(folder, __SafeName(name))
+
+def __ReportPath(projectFolder, moduleName, which):
+    return os.path.join(projectFolder, f"{__SafeName(moduleName)}.{which}.jsonl")
+
+def MessageKey(moduleName, msgType, msg, ref):
+    """
+    Returns a stable key (a hex string) for a message.
+    """
+    data = "\x1f".join((moduleName, str(msgType), msg or "", ref or ""))
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=8).hexdigest()
+
+# ------------------------------------------------------------------
+
+def SaveRun(folder, projectName, moduleNames, records):
+    """
+    Save the messages from a run. For each Module that was run, its
+    previous file is replaced with its latest one.
+      - moduleNames is the list of the Modules that were run.
+      - records is an iterable of (moduleName, msgType, msg, ref) tuples
+        for the warnings and errors.
+    """
+    if not folder:
+        return
+    projectFolder = __ProjectFolder(folder, projectName)
+    files = {}
+    try:
+        os.makedirs(projectFolder, exist_ok=True)
+        for moduleName in moduleNames:
+            if moduleName in files:
+                continue
+            latest = __ReportPath(projectFolder, moduleName, LATEST)
+            if os.path.exists(latest):
+                os.replace(latest,
+                           __ReportPath(projectFolder, moduleName, PREVIOUS))
+            files[moduleName] = open(latest, "w", encoding="utf-8")
+        for moduleName, msgType, msg, ref in records:
+            files[moduleName].write(json.dumps([moduleName, msgType, msg, ref],
+                                               ensure_ascii=False) + "\n")
+        with open(os.path.join(projectFolder, RUN_FILE), "w", encoding="utf-8") as f:
+            json.dump({"modules" : list(moduleNames)}, f)
+    except OSError as e:
+        logger.error(f"Failed to save the report history to {projectFolder}: {e}")
+    finally:
+        for f in files.values():
+            f.close()
+
+def __LoadRecords(path):
+    # Returns {key : record}, or None if there is no file.
+    if not os.path.exists(path):
+        return None
+    records = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            record = tuple(json.loads(line))
+            records.setdefault(MessageKey(*record), record)
+    return records
+
+def __LatestModules(projectFolder):
+    # The names of the Modules in the latest run, or [] if there isn't one.
+    try:
+        with open(os.path.join(projectFolder, RUN_FILE), encoding="utf-8") as f:
+            return json.load(f)["modules"]
+    except FileNotFoundError:
+        return []
+
+def HasPreviousRun(folder, projectName):
+    if not folder:
+        return False
+    projectFolder = __ProjectFolder(folder, projectName)
+    try:
+        moduleNames = __LatestModules(projectFolder)
+    except (OSError, ValueError, KeyError):
+        return False
+    return any(os.path.exists(__ReportPath(projectFolder, m, PREVIOUS))
+               for m in moduleNames)
+
+def Compare(folder, projectName):
+    """
+    Compare the latest run on the project with the previous run of each
+    of its Modules.
+    Returns a tuple of lists of (moduleName, msgType, msg, ref) records:
+        (new, resolved, unchanged)
+    or None if none of the Modules has been run before.
+    """
+    projectFolder = __ProjectFolder(folder, projectName)
+    new = []
+    resolved = []
+    unchanged = []
+    compared = False
+    try:
+        for moduleName in dict.fromkeys(__LatestModules(projectFolder)):
+            latestRecords = __LoadRecords(__ReportPath(projectFolder, moduleName, LATEST)) or {}
+            previousRecords = __LoadRecords(__ReportPath(projectFolder, moduleName, PREVIOUS))
+            if previousRecords is None:
+                # Everything is new
+                previousRecords = {}
+            else:
+                compared = True
+            new.extend(r for key, r in latestRecords.items() if key not in previousRecords)
+            unchanged.extend(r for key, r in latestRecords.items() if key in previousRecords)
+            resolved.extend(r for key, r in previousRecords.items() if key not in latestRecords)
+    except (OSError, ValueError, KeyError) as e:
+        logger.error(f"Failed to read the report history: {e}")
+        return None
+    if not compared:
+        return None
+    return new, resolved, unchanged
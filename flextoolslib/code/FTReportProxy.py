@@ -0,0 +1,187 @@
+#
+#   Project: FlexTools
+#   Module:  FTReportProxy
+#
+#   Reporting from worker processes for Modules that use the
+#   multiprocessing library:
+#    - The FTReporter can't be passed to another process, so the Module
+#      creates an FTReportQueue for it, and passes a proxy (from
+#      Proxy()) to each worker.
+#    - The proxy has the same reporting methods as the FTReporter
+#      (Blank, Info, Warning, Error and ProgressUpdate). It sends the
+#      messages over a multiprocessing.Queue.
+#    - On the Module's main thread, Drain() or DrainUntil() passes the
+#      queued messages on to the real reporter. Each worker's messages
+#      stay in the order they were sent.
+#    - Each worker reports its own progress (the number of items it
+#      has done), and the sum for all the workers is passed to the
+#      reporter's ProgressUpdate(). The Module calls ProgressStart()
+#      on the real reporter with the total number of items.
+#    - If the run is stopped, the workers' next report raises
+#      FTR_CancelledError.
+#
+#   References must be strings; a Guid reference is converted to its
+#   string form, and any other object to its repr().
+#
+#   Usage in a Module:
+#       def Worker(items, proxy):
+#           for i, item in enumerate(items):
+#               proxy.ProgressUpdate(i)
+#               if problem:
+#                   proxy.Warning(msg, item.guid)
+#
+#       reportQueue = FTReportQueue(report)
+#       processes = [multiprocessing.Process(target=Worker,
+#                                            args=(chunk, reportQueue.Proxy(n)))
+#                    for n, chunk in enumerate(chunks)]
+#       for p in processes: p.start()
+#       reportQueue.DrainUntil(lambda: not any(p.is_alive() for p in processes))
+#
+#   With a multiprocessing.Pool, pass the proxies to the workers through
+#   the initializer, or use a Manager queue: FTReportQueue(report,
+#   messageQueue=multiprocessing.Manager().Queue()).
+#
+
+import multiprocessing
+import queue
+
+from .FTReport import FTReporter, FTR_CancelledError, GUID_REF_PREFIX, IsGuidRef
+
+# ------------------------------------------------------------------
+
+# Queue item kinds
+_MESSAGE  = "m"
+_PROGRESS = "p"
+
+def PortableMessage(msg, ref):
+    """
+    Returns (msg, ref) as strings (or None) that can be sent to another
+    process. A Guid reference is converted to a Guid reference string.
+    """
+    if not (ref is None or isinstance(ref, str)):
+        ref = GUID_REF_PREFIX + str(ref) if IsGuidRef(ref) else repr(ref)
+    if not (msg is None or isinstance(msg, str)):
+        msg = repr(msg)
+    return msg, ref
+
+# ------------------------------------------------------------------
+
+class FTReporterProxy(object):
+    """
+    A reporter for a worker process. Create them with
+    FTReportQueue.Proxy().
+    """
+    def __init__(self, workerId, reportQueue, cancelEvent):
+        self.workerId = workerId
+        self.__queue = reportQueue
+        self.__cancelEvent = cancelEvent
+
+    def __Check(self):
+        if self.__cancelEvent.is_set():
+            # Not translated: _() isn't installed in worker processes,
+            # and the user sees the message from the main process.
+            raise FTR_CancelledError("Stopped by the user.")
+
+    def __Send(self, msgType, msg, ref, key):
+        msg, ref = PortableMessage(msg, ref)
+        self.__queue.put((_MESSAGE, self.workerId,
+                          msgType, msg, ref, key))
+
+    def Blank(self):
+        self.__Send(FTReporter.BLANK, None, None, None)
+
+    def Info(self, msg, ref=None, key=None):
+        self.__Check()
+        self.__Send(FTReporter.INFO, msg, ref, key)
+
+    def Warning(self, msg, ref=None, key=None):
+        self.__Check()
+        self.__Send(FTReporter.WARNING, msg, ref, key)
+
+    def Error(self, msg, ref=None, key=None):
+        self.__Send(FTReporter.ERROR, msg, ref, key)
+
+    def ProgressUpdate(self, value):
+        # value is the index of the item that this worker is processing.
+        self.__Check()
+        self.__queue.put((_PROGRESS, self.workerId, value))
+
+# ------------------------------------------------------------------
+
+class FTReportQueue(object):
+    """
+    Collects the messages from FTReporterProxy objects in worker
+    processes, and passes them on to the reporter.
+    """
+    def __init__(self, reporter, messageQueue=None):
+        self.reporter = reporter
+        self.__queue = messageQueue or multiprocessing.Queue()
+        self.__cancelEvent = multiprocessing.Event()
+        self.__progress = {}            # workerId : items done
+
+    def Proxy(self, workerId):
+        """
+        Returns a reporter proxy to pass to a worker process. workerId
+        identifies the worker for progress reporting.
+        """
+        return FTReporterProxy(workerId, self.__queue, self.__cancelEvent)
+
+    def __Dispatch(self, item):
+        if item[0] == _MESSAGE:
+            kind, workerId, msgType, msg, ref, key = item
+            if msgType == FTReporter.BLANK:
+                self.reporter.Blank()
+            elif msgType == FTReporter.INFO:
+                self.reporter.Info(msg, ref, key)
+            elif msgType == FTReporter.WARNING:
+                self.reporter.Warning(msg, ref, key)
+            else:
+                self.reporter.Error(msg, ref, key)
+        elif item[0] == _PROGRESS:
+            kind, workerId, value = item
+            self.__progress[workerId] = value + 1
+            self.reporter.ProgressUpdate(sum(self.__progress.values()) - 1)
+
+    def Drain(self, timeout=0):
+        """
+        Pass all the queued messages on to the reporter. Waits up to
+        timeout seconds for the first one. Returns the number of queue
+        items that were handled.
+        Must be called on the Module's main thread.
+        """
+        if self.reporter.cancelToken.IsCancelled:
+            # Stop the workers, and raise FTR_CancelledError here.
+            self.__cancelEvent.set()
+            self.reporter.cancelToken.Check()
+
+        count = 0
+        try:
+            item = self.__queue.get(timeout=timeout) if timeout else \
+                   self.__queue.get_nowait()
+            while True:
+                self.__Dispatch(item)
+                count += 1
+                item = self.__queue.get_nowait()
+        except queue.Empty:
+            pass
+        return count
+
+    def DrainUntil(self, isFinished, interval=0.05):
+        """
+        Keep passing messages on to the reporter until isFinished()
+        returns True (e.g. when all the worker processes have ended,
+        or AsyncResult.ready), then pass on any remaining messages.
+        """
+        try:
+            while not isFinished():
+                self.Drain(timeout=interval)
+            self.Drain()
+        except FTR_CancelledError:
+            self.__cancelEvent.set()
+            raise
+
+    def Cancel(self):
+        """
+        Make the workers' next report raise FTR_CancelledError.
+        """
+        self.__cancelEvent.set()
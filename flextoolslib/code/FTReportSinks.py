@@ -0,0 +1,223 @@
+#
+#   Project: FlexTools
+#   Module:  FTReportSinks
+#
+#   Report sinks write the FTReporter's messages to a file as they are
+#   reported, so that large reports can be saved without holding them
+#   in memory a second time, and other tools can read the file while
+#   the run is in progress:
+#    - JSONLSink: one JSON object per line.
+#    - CSVSink: a CSV file with a header row.
+#    - HTMLSink: a self-contained HTML page.
+#
+#   Each sink buffers up to maxBuffered messages, and writes them to
+#   the file when the buffer is full or flushInterval seconds have
+#   passed since the last write. Close() writes any remaining messages.
+#
+#   Usage:
+#       sink = OpenSink("report.csv")     # Type chosen by the extension
+#       reporter.AddSink(sink)
+#       ...
+#       reporter.RemoveSink(sink)
+#       sink.Close()
+#
+
+import csv
+import html
+import io
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from .. import version
+
+# ------------------------------------------------------------------
+
+TYPE_NAMES = ("info", "warning", "error", "blank")
+
+class FTR_SinkError(Exception):
+    """
+    Exception raised when a report sink can't be created.
+
+    Attributes:
+        message -- explanation of the error
+    """
+
+    def __init__(self, message):
+        self.message = message
+
+# ------------------------------------------------------------------
+
+class FTReportSink(object):
+    """
+    Base class for report sinks. Subclasses implement _Format() to
+    convert a message to a string, and can override _Header() and
+    _Footer().
+    """
+    encoding = "utf-8"
+    newline = None
+
+    def __init__(self, path, maxBuffered=200, flushInterval=1.0):
+        self.path = path
+        self.maxBuffered = maxBuffered
+        self.flushInterval = flushInterval
+        self.__lock = threading.Lock()
+        self.__buffer = []
+        self.__nextFlush = time.monotonic() + flushInterval
+        try:
+            self.__file = open(path, "w", encoding=self.encoding,
+                               newline=self.newline)
+        except OSError as e:
+            raise FTR_SinkError(_("Couldn't create the report file {}: {}")
+                                .format(path, e.strerror))
+        self.__file.write(self._Header())
+        self.__file.flush()
+
+    def _Header(self):
+        return ""
+
+    def _Footer(self):
+        return ""
+
+    def _Format(self, msgType, msg, ref):
+        raise NotImplementedError
+
+    def Write(self, message):
+        """
+        Add a (type, message, reference) tuple to the sink.
+        """
+        msgType, msg, ref = message
+        if ref is not None and not isinstance(ref, str):
+            ref = repr(ref)
+        text = self._Format(msgType, msg or "", ref or "")
+        with self.__lock:
+            if not self.__file:
+                return
+            self.__buffer.append(text)
+            if len(self.__buffer) >= self.maxBuffered or \
+               time.monotonic() >= self.__nextFlush:
+                self.__Flush()
+
+    def WriteMany(self, messages):
+        """
+        Add all the messages from an iterable, such as FTReporter.messages.
+        """
+        for message in messages:
+            self.Write(message)
+
+    def __Flush(self):
+        if self.__buffer:
+            self.__file.write("".join(self.__buffer))
+            self.__buffer = []
+        self.__file.flush()
+        self.__nextFlush = time.monotonic() + self.flushInterval
+
+    def Flush(self):
+        """
+        Write any buffered messages to the file.
+        """
+        with self.__lock:
+            if self.__file:
+                self.__Flush()
+
+    def Close(self):
+        with self.__lock:
+            if self.__file:
+                self.__Flush()
+                self.__file.write(self._Footer())
+                self.__file.close()
+                self.__file = None
+
+# ------------------------------------------------------------------
+
+class JSONLSink(FTReportSink):
+    """
+    Writes one JSON object per line: {"type":, "message":, "ref":}
+    """
+
+    def _Format(self, msgType, msg, ref):
+        return json.dumps({"type"    : TYPE_NAMES[msgType],
+                           "message" : msg,
+                           "ref"     : ref},
+                          ensure_ascii=False) + "\n"
+
+
+class CSVSink(FTReportSink):
+    """
+    Writes a CSV file with the columns Type, Message, Reference.
+    A byte-order mark is included so that Excel detects UTF-8.
+    """
+    encoding = "utf-8-sig"
+    newline = ""
+
+    def _Header(self):
+        return self.__Row("Type", "Message", "Reference")
+
+    def _Format(self, msgType, msg, ref):
+        return self.__Row(TYPE_NAMES[msgType], msg, ref)
+
+    def __Row(self, *fields):
+        s = io.StringIO()
+        csv.writer(s).writerow(fields)
+        return s.getvalue()
+
+
+class HTMLSink(FTReportSink):
+    """
+    Writes a self-contained HTML page with one table row per message.
+    FieldWorks and file references are written as links.
+    """
+    STYLE = """
+        body { font-family: Segoe UI, sans-serif; font-size: 10pt; }
+        table { border-collapse: collapse; width: 100%; }
+        td { border-bottom: 1px solid #ddd; padding: 2px 6px; }
+        tr.warning td.type { color: #b07000; }
+        tr.error td.type { color: #c00000; }
+        td.ref { color: #666; }
+    """
+
+    def _Header(self):
+        title = html.escape(_("FLExTools report"))
+        created = datetime.now().isoformat(sep=" ", timespec="seconds")
+        return (f"<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n"
+                f"<title>{title}</title>\n<style>{self.STYLE}</style>\n"
+                f"</head>\n<body>\n<h3>{title}</h3>\n"
+                f"<p>flextoolslib {version}, {created}</p>\n<table>\n")
+
+    def _Footer(self):
+        return "</table>\n</body>\n</html>\n"
+
+    def _Format(self, msgType, msg, ref):
+        typeName = TYPE_NAMES[msgType]
+        if ref.startswith(("silfw:", "file:")):
+            ref = f"<a href=\"{html.escape(ref)}\">{html.escape(ref)}</a>"
+        else:
+            ref = html.escape(ref)
+        return (f"<tr class=\"{typeName}\">"
+                f"<td class=\"type\">{'' if typeName == 'blank' else typeName}</td>"
+                f"<td>{html.escape(msg)}</td>"
+                f"<td class=\"ref\">{ref}</td></tr>\n")
+
+# ------------------------------------------------------------------
+
+SINK_TYPES = {
+    ".jsonl" : JSONLSink,
+    ".csv"   : CSVSink,
+    ".html"  : HTMLSink,
+    ".htm"   : HTMLSink,
+    }
+
+def OpenSink(path, **kwargs):
+    """
+    Create a report sink for the file path, choosing the type of sink
+    from the file extension. Raises FTR_SinkError if the extension isn't
+    supported or the file can't be created.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    try:
+        sinkClass = SINK_TYPES[ext]
+    except KeyError:
+        raise FTR_SinkError(_("Unsupported report file type: {}").format(path))
+    return sinkClass(path, **kwargs)
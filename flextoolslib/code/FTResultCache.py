@@ -0,0 +1,148 @@
+#
+#   Project: FlexTools
+#   Module:  FTResultCache
+#
+#   Caches the reports of read-only Modules, so that re-running them on
+#   a project that hasn't changed replays the last report instead:
+#    - The cache key is a hash of the project name, the project's
+#      last-modified date (lp.DateModified), the Module file's contents
+#      and version, the contents of its library (see LibraryHash()),
+#      the UI language and the flextoolslib version.
+#    - Each report is saved in FTConfig.ResultCachePath, one file per
+#      project and Module. Only reports from Modules that finished
+#      without an exception are saved.
+#    - Caching is enabled for all read-only Modules (FTM_ModifiesDB is
+#      False) with FTConfig.CacheResults, or for individual Modules
+#      with the CacheResults option in the collection. (Set it to "no"
+#      for Modules that write files, such as exports, since the files
+#      aren't written when the report is replayed.)
+#    - RunModules() doesn't use the cache if forceRun is True, or after
+#      a Module in the same run was allowed to make changes.
+#
+#   Messages that were suppressed by their key (see FTReport.py) aren't
+#   included in the replayed report.
+#
+
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+
+import logging
+logger = logging.getLogger(__name__)
+
+# ------------------------------------------------------------------
+
+FORMAT_VERSION = 1
+
+def CacheOption(value):
+    """
+    Convert a CacheResults option (e.g. from a collection .ini file) to
+    True or False, or None if it isn't given.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("yes", "true", "on", "1")
+
+def FileHash(path):
+    """
+    Returns a hash (a hex string) of the contents of a file, or None if
+    it can't be read.
+    """
+    try:
+        with open(path, "rb") as f:
+            return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+    except OSError as e:
+        logger.warning(f"Result cache: can't read {path}: {e}")
+        return None
+
+def LibraryHash(folder):
+    """
+    Returns a hash (a hex string) of the code and data that the Modules
+    in a folder can use: the Python files in the folder, and all the
+    files in its Lib sub-folder. Returns None if a file can't be read.
+    """
+    try:
+        paths = [os.path.join(folder, f) for f in os.listdir(folder)
+                 if f.endswith(".py")]
+    except OSError as e:
+        logger.warning(f"Result cache: can't read {folder}: {e}")
+        return None
+    for root, dirs, files in os.walk(os.path.join(folder, "Lib")):
+        dirs[:] = [d for d in dirs if d != "__pycache__"]
+        paths.extend(os.path.join(root, f) for f in files)
+
+    data = hashlib.blake2b(digest_size=16)
+    for path in sorted(paths):
+        fileHash = FileHash(path)
+        if not fileHash:
+            return None
+        data.update(f"{os.path.relpath(path, folder)}\x1f{fileHash}\x1e".encode("utf-8"))
+    return data.hexdigest()
+
+def ResultKey(projectName, dateModified, moduleHash, moduleVersion,
+              libraryHash, uiLanguage, libraryVersion):
+    """
+    Returns the cache key (a hex string) for a Module's report.
+    """
+    data = "\x1f".join(str(v) for v in (projectName, dateModified,
+                                        moduleHash, moduleVersion,
+                                        libraryHash, uiLanguage,
+                                        libraryVersion))
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=16).hexdigest()
+
+# ------------------------------------------------------------------
+
+class FTResultCache(object):
+
+    def __init__(self, folder):
+        self.folder = folder
+
+    def __Path(self, projectName, moduleName):
+        # The project name can be a path to a .fwdata file.
+        projectName = os.path.splitext(os.path.basename(projectName))[0]
+        name = re.sub(r'[^\w.-]+', "_", f"{projectName}-{moduleName}")
+        return os.path.join(self.folder, f"{name}.json")
+
+    def Load(self, projectName, moduleName, key):
+        """
+        Returns (created, messages) for the cached report, or None if
+        there isn't one with this key. messages is a list of
+        (msgType, msg, ref).
+        """
+        path = self.__Path(projectName, moduleName)
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Result cache: can't read {path}: {e}")
+            return None
+        if data.get("format") != FORMAT_VERSION or data.get("key") != key:
+            return None
+        return data["created"], [tuple(m) for m in data["messages"]]
+
+    def Save(self, projectName, moduleName, key, messages):
+        path = self.__Path(projectName, moduleName)
+        data = {"format"   : FORMAT_VERSION,
+                "key"      : key,
+                "created"  : datetime.now().isoformat(timespec="seconds"),
+                "messages" : [(msgType, msg,
+                               ref if ref is None or isinstance(ref, str)
+                                   else repr(ref))
+                              for msgType, msg, ref in messages]}
+        tempPath = path + ".tmp"
+        try:
+            os.makedirs(self.folder, exist_ok=True)
+            with open(tempPath, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tempPath, path)
+        except OSError as e:
+            logger.error(f"Result cache: failed to save {path}: {e}")
+            return False
+        logger.info(f"Result cache: saved {len(messages)} messages for {moduleName}")
+        return True
@@ -0,0 +1,131 @@
+#
+#   Project: FlexTools
+#   Module:  FTRunData
+#
+#   A run-scoped cache of common lexicon data for FlexTools Modules:
+#    - ModuleManager.RunModules() creates one instance per run and makes
+#      it available to the Modules as report.runData.
+#    - Each projection is built on first use and then shared by all the
+#      Modules in the run, so a collection of report Modules only pays
+#      for one traversal of the lexicon.
+#    - The cache is discarded when the project is closed. Modules that
+#      modify the data they read from here should call Reset().
+#    - It is safe to use from Modules that are run concurrently.
+#
+#   Usage in a Module:
+#       runData = getattr(report, "runData", None)
+#       if runData:
+#           headwords = runData.Headwords()
+#           for entry in runData.Entries():
+#               hw = headwords[entry.Hvo]
+#
+
+from collections import defaultdict
+import threading
+
+import logging
+logger = logging.getLogger(__name__)
+
+# ------------------------------------------------------------------
+
+class FTRunData(object):
+
+    def __init__(self, project):
+        self.project = project
+        self.__lock = threading.RLock()
+        self.Reset()
+
+    def Reset(self):
+        """
+        Discard all the cached data. It will be rebuilt on demand.
+        """
+        self.__cache = {}
+
+    def __Cached(self, key, builder):
+        with self.__lock:
+            try:
+                return self.__cache[key]
+            except KeyError:
+                logger.debug(f"FTRunData: building {key}")
+                value = self.__cache[key] = builder()
+                return value
+
+    # --- Lexicon projections ---
+
+    def Entries(self):
+        """
+        Returns a list of all the entries in the lexicon (ILexEntry).
+        """
+        return self.__Cached("Entries",
+                             lambda: list(self.project.LexiconAllEntries()))
+
+    def Senses(self):
+        """
+        Returns a list of (entry, sense) tuples for all the senses
+        (including subsenses) in the lexicon.
+        """
+        def __build():
+            return [(e, s) for e in self.Entries() for s in e.AllSenses]
+
+        return self.__Cached("Senses", __build)
+
+    def Headwords(self):
+        """
+        Returns a dictionary of entry Hvo : headword.
+        """
+        def __build():
+            return {e.Hvo : self.project.LexiconGetHeadword(e)
+                    for e in self.Entries()}
+
+        return self.__Cached("Headwords", __build)
+
+    def LexemeForms(self, languageTagOrHandle=None):
+        """
+        Returns a dictionary of entry Hvo : lexeme form in the default
+        vernacular writing system, or the one given by
+        languageTagOrHandle.
+        """
+        def __build():
+            return {e.Hvo : self.project.LexiconGetLexemeForm(
+                                            e, languageTagOrHandle)
+                    for e in self.Entries()}
+
+        return self.__Cached(("LexemeForms", languageTagOrHandle), __build)
+
+    def SenseGlosses(self, languageTagOrHandle=None):
+        """
+        Returns a dictionary of sense Hvo : gloss in the default analysis
+        writing system, or the one given by languageTagOrHandle.
+        """
+        def __build():
+            return {s.Hvo : self.project.LexiconGetSenseGloss(
+                                            s, languageTagOrHandle)
+                    for e, s in self.Senses()}
+
+        return self.__Cached(("SenseGlosses", languageTagOrHandle), __build)
+
+    def POSNames(self):
+        """
+        Returns a dictionary of entry Hvo : a sorted tuple of the
+        grammatical category names of the entry's MSAs.
+        """
+        def __build():
+            return {e.Hvo : tuple(sorted(set(msa.ShortName
+                                    for msa in e.MorphoSyntaxAnalysesOC)))
+                    for e in self.Entries()}
+
+        return self.__Cached("POSNames", __build)
+
+    def HomographKeys(self):
+        """
+        Returns a dictionary of homograph form : list of entries,
+        for all the entries that have a homograph number.
+        """
+        def __build():
+            homographs = defaultdict(list)
+            for e in self.Entries():
+                if e.HomographNumber:
+                    homographs[e.HomographForm].append(e)
+            return dict(homographs)
+
+        return self.__Cached("HomographKeys", __build)
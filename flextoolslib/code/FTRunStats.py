@@ -0,0 +1,169 @@
+#
+#   Project: FlexTools
+#   Module:  FTRunStats
+#
+#   Per-module run statistics:
+#    - ModuleManager.RunModules() measures each Module run with an
+#      FTModuleStats instance: wall time, CPU time, number of report
+#      messages and (if FTConfig.traceMemory is True) the peak memory
+#      allocated by Python code, as measured by tracemalloc.
+#      The CPU time of a sandboxed Module is that of its child process
+#      (see FTSandbox.py), and isn't known if the child was killed.
+#      The throughput (progress items per second) is recorded for 
+#      Modules that report progress.
+#    - A summary is added to the end of the report, and one JSON record
+#      per Module run is appended to the run history file
+#      (FTConfig.RunHistoryPath), which can be used to track how the
+#      Modules perform over time.
+#
+#   Note: tracemalloc slows down Python code that allocates a lot of
+#   objects, so it is off by default. RunModules() starts it once for
+#   the whole run (see StartMemoryTracing()), and each FTModuleStats
+#   resets the peak. The peak memory isn't recorded for Modules that run
+#   concurrently, since it would include the other Modules' memory.
+#
+
+import json
+import time
+import tracemalloc
+from datetime import datetime
+
+from .. import version
+
+import logging
+logger = logging.getLogger(__name__)
+
+# ------------------------------------------------------------------
+
+class FTModuleStats(object):
+
+    def __init__(self, moduleName, moduleVersion, reporter,
+                 traceMemory=False):
+        self.moduleName = moduleName
+        self.moduleVersion = str(moduleVersion)
+        self.reporter = reporter
+        self.traceMemory = traceMemory
+
+        self.wallTime = 0.0
+        self.cpuTime = 0.0              # None if it isn't known
+        self.peakMemory = None
+        self.messages = 0
+        self.errors = 0
+        self.warnings = 0
+        self.throughput = None          # Progress items per second
+
+    def __enter__(self):
+        self.Start()
+        return self
+
+    def __exit__(self, excType, excValue, tb):
+        self.Stop()
+        return False
+
+    def Start(self):
+        self.__counts = list(self.reporter.messageCounts)
+        self.__progress = self.reporter.ProgressTotals()
+        self.__tracing = self.traceMemory and tracemalloc.is_tracing()
+        if self.__tracing:
+            tracemalloc.reset_peak()
+        self.__cpuStart = time.thread_time()
+        self.__wallStart = time.perf_counter()
+
+    def Stop(self):
+        self.wallTime = time.perf_counter() - self.__wallStart
+        self.cpuTime = time.thread_time() - self.__cpuStart
+        if self.__tracing:
+            current, self.peakMemory = tracemalloc.get_traced_memory()
+
+        counts = [now - before for now, before in
+                    zip(self.reporter.messageCounts, self.__counts)]
+        self.messages = sum(counts)
+        self.errors = counts[self.reporter.ERROR]
+        self.warnings = counts[self.reporter.WARNING]
+
+        items, seconds = [now - before for now, before in
+                          zip(self.reporter.ProgressTotals(), self.__progress)]
+        if items > 0 and seconds > 0:
+            self.throughput = items / seconds
+
+    def AsDict(self):
+        return {"module"      : self.moduleName,
+                "version"     : self.moduleVersion,
+                "wallTime"    : round(self.wallTime, 3),
+                "cpuTime"     : None if self.cpuTime is None
+                                else round(self.cpuTime, 3),
+                "peakMemory"  : self.peakMemory,
+                "messages"    : self.messages,
+                "errors"      : self.errors,
+                "warnings"    : self.warnings,
+                "throughput"  : None if self.throughput is None
+                                else round(self.throughput, 1),
+                }
+
+# ------------------------------------------------------------------
+
+def StartMemoryTracing():
+    """
+    Start tracemalloc for a run, if it isn't already tracing. Returns
+    True if it was started, in which case StopMemoryTracing() should be
+    called at the end of the run.
+    """
+    if tracemalloc.is_tracing():
+        return False
+    tracemalloc.start()
+    return True
+
+def StopMemoryTracing():
+    tracemalloc.stop()
+
+# ------------------------------------------------------------------
+
+def __FormatBytes(numBytes):
+    if numBytes is None:
+        return "-"
+    for unit in ("B", "KB", "MB"):
+        if numBytes < 1024:
+            return f"{numBytes:.0f} {unit}"
+        numBytes /= 1024
+    return f"{numBytes:.1f} GB"
+
+def SummaryLines(statsList):
+    """
+    Returns a list of strings summarising the statistics, one line per
+    module, with a header line.
+    """
+    if not statsList:
+        return []
+
+    width = max(len(s.moduleName) for s in statsList)
+    lines = ["{:<{w}}  {:>9}  {:>9}  {:>10}  {:>9}  {:>9}".format(
+                _("Module"), _("Time (s)"), _("CPU (s)"),
+                _("Memory"), _("Messages"), _("Items/s"), w=width)]
+    for s in statsList:
+        cpuTime = "-" if s.cpuTime is None else f"{s.cpuTime:.2f}"
+        throughput = "-" if s.throughput is None else f"{s.throughput:.0f}"
+        lines.append("{:<{w}}  {:>9.2f}  {:>9}  {:>10}  {:>9}  {:>9}".format(
+                s.moduleName, s.wallTime, cpuTime,
+                __FormatBytes(s.peakMemory), s.messages, throughput, w=width))
+    return lines
+
+def AppendToHistory(historyPath, projectName, modifyAllowed, statsList):
+    """
+    Append one JSON record per module run to the history file.
+    """
+    if not historyPath or not statsList:
+        return
+
+    timestamp = datetime.now().isoformat(timespec="seconds")
+    try:
+        with open(historyPath, "a", encoding="utf-8") as f:
+            for s in statsList:
+                record = {"time"          : timestamp,
+                          "project"       : projectName,
+                          "modifyAllowed" : bool(modifyAllowed),
+                          "flextools"     : version,
+                          }
+                record.update(s.AsDict())
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    except OSError as e:
+        logger.error(f"Failed to write run history to {historyPath}: {e}")
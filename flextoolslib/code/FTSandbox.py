@@ -0,0 +1,473 @@
+#
+#   Project: FlexTools
+#   Module:  FTSandbox
+#
+#   Runs a Module in a child process, so that a Module that leaks
+#   memory, hangs in LCM code or crashes Python.NET doesn't take
+#   FlexTools down with it, and the memory that the Module used is
+#   returned to the system when the child process exits:
+#    - RunModules() runs a Module in the sandbox if FTConfig.IsolateModules
+#      is True, or the collection gives the Isolate option for it.
+#    - The child process opens the project itself. RunModules() only
+#      opens the project in FlexTools before a Module that runs there,
+#      and closes it (saving any changes) before a sandboxed Module, so
+#      a run of sandboxed Modules never opens it in FlexTools.
+#    - The child process imports the Module, opens the project, and
+#      runs the Module with an FTSandboxReporter. The report messages
+#      and progress are sent back over the child's stdout, one JSON
+#      list per line, and passed on to the FlexTools reporter.
+#    - report.runData, report.changes and report.checkpoint work as
+#      usual. The child saves the changes and the checkpoint when it
+#      closes the project.
+#    - When the run is stopped, or the Module's time budget runs out,
+#      FlexTools tells the child on its stdin. The child replies when
+#      the Module has returned and it starts saving the project. If it
+#      doesn't reply within STOP_TIMEOUT seconds (e.g. it is stuck in
+#      LCM code), it is killed, and the Module's changes are lost. The
+#      save itself isn't timed, so large change sets aren't lost.
+#    - The child's log, and anything that the Module prints, is written
+#      to flextools-sandbox.log.
+#    - The child reports its CPU time, which is recorded as the Module's
+#      CPU time (see FTRunStats.py). It also sends the project's link
+#      template and last-modified date, in case the project hasn't
+#      been opened in FlexTools.
+#    - The child doesn't save flextools.ini (see FTConfig.NoSave()).
+#
+#   Each Module run pays for starting Python and opening the project,
+#   so the sandbox is best for long-running or unreliable Modules.
+#
+
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+import traceback
+
+from .FTReport import FTReporter, FTR_CancelledError
+from .FTReportProxy import PortableMessage
+
+import logging
+logger = logging.getLogger(__name__)
+
+# ------------------------------------------------------------------
+
+STOP_TIMEOUT = 10               # Seconds
+LOG_FILE = "flextools-sandbox.log"
+MAX_LOG_SIZE = 1024 * 1024      # Bytes, before the log is started again
+
+# Items sent by the child process
+_MESSAGE  = "m"                 # msgType, msg, ref, key
+_PROGRESS = "p"                 # value, max, message
+_SAVING   = "s"                 # The Module has returned; saving the project
+_DONE     = "d"                 # result dictionary
+
+# Sent to the child process
+_CANCEL   = "cancel"
+
+# The child process configures logging before importing flextoolslib,
+# which would otherwise log to flextools.log.
+CHILD_COMMAND = ("import logging, sys;"
+                 "logging.basicConfig(level=logging.INFO, stream=sys.stderr);"
+                 "from flextoolslib.code.FTSandbox import _ChildMain;"
+                 "_ChildMain()")
+
+def IsolateOption(value):
+    """
+    Convert an Isolate option (e.g. from a collection .ini file) to
+    True or False, or None if it isn't given.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("yes", "true", "on", "1")
+
+# ------------------------------------------------------------------
+
+class FTSandboxResult(object):
+    """
+    The outcome of a sandboxed Module run.
+    """
+    def __init__(self, data, exitCode, killed):
+        self.finished     = data.get("finished", False)
+        self.stopped      = data.get("stopped")       # Stop message
+        self.exception    = data.get("exception")     # (name, details, isRuntimeError)
+        self.changes      = data.get("changes")       # FTChangeSet counters
+        self.discarded    = data.get("discarded", 0)
+        self.profiles     = data.get("profiles", [])
+        self.cpuTime      = data.get("cpuTime")       # The child's CPU time
+        self.urlTemplate  = data.get("urlTemplate")   # See FTReport.GotoURLTemplate()
+        self.dateModified = data.get("dateModified")
+        self.completed    = "finished" in data        # The child reported back
+        self.exitCode     = exitCode
+        self.killed       = killed
+
+
+class FTSandbox(object):
+    """
+    Runs one Module in a child process. params are passed to the child
+    (see __RunInChild()). childCommand is the Python code that the
+    child runs.
+    """
+    def __init__(self, configPath, params, childCommand=CHILD_COMMAND):
+        self.configPath = configPath
+        self.params = params
+        self.childCommand = childCommand
+        self.logPath = os.path.join(os.path.dirname(configPath), LOG_FILE)
+
+    def __Start(self):
+        if sys.platform == "win32":
+            creationflags = subprocess.CREATE_NO_WINDOW
+        else:
+            creationflags = 0
+        try:
+            mode = "ab" if os.path.getsize(self.logPath) < MAX_LOG_SIZE else "wb"
+        except OSError:
+            mode = "wb"
+        with open(self.logPath, mode) as log:
+            return subprocess.Popen([sys.executable, "-c", self.childCommand,
+                                     self.configPath,
+                                     json.dumps(self.params)],
+                                    stdin=subprocess.PIPE,
+                                    stdout=subprocess.PIPE,
+                                    stderr=log,
+                                    cwd=os.path.dirname(self.configPath),
+                                    creationflags=creationflags)
+
+    def Run(self, reporter):
+        """
+        Run the Module, passing its messages and progress on to
+        reporter, and return an FTSandboxResult.
+        Stopping the run through reporter.cancelToken (including its
+        time budget) stops the child process.
+        """
+        process = self.__Start()
+        logger.info(f"Sandbox: started process {process.pid} for {self.params['moduleName']}")
+
+        # Read the child's output on another thread, so that this
+        # thread can check for cancellation while the child is busy.
+        items = queue.Queue()
+        def __Read():
+            for line in process.stdout:
+                try:
+                    items.put(json.loads(line))
+                except ValueError:
+                    logger.warning(f"Sandbox: bad output {line!r}")
+            items.put(None)
+        reader = threading.Thread(target=__Read, daemon=True)
+        reader.start()
+
+        result = {}
+        stopMessage = None
+        stopDeadline = None
+        saving = False
+        killed = False
+        progress = None                 # (max, message)
+        while True:
+            try:
+                item = items.get(timeout=0.1)
+            except queue.Empty:
+                item = ()
+            if item is None:
+                break
+            try:
+                if stopMessage is None:
+                    reporter.cancelToken.Check()
+                if not item:
+                    pass
+                elif item[0] == _MESSAGE:
+                    msgType, msg, ref, key = item[1:]
+                    if msgType == reporter.BLANK:
+                        reporter.Blank()
+                    elif msgType == reporter.ERROR:
+                        reporter.Error(msg, ref, key)
+                    elif stopMessage is None:
+                        if msgType == reporter.WARNING:
+                            reporter.Warning(msg, ref, key)
+                        else:
+                            reporter.Info(msg, ref, key)
+                elif item[0] == _PROGRESS:
+                    value, max, message = item[1:]
+                    if not max:
+                        reporter.ProgressStop()
+                        progress = None
+                    elif stopMessage is None:
+                        if (max, message) != progress:
+                            progress = (max, message)
+                            reporter.ProgressStart(max, message)
+                        reporter.ProgressUpdate(value - 1)
+                elif item[0] == _SAVING:
+                    # The child has stopped, so don't kill it while it
+                    # saves the changes.
+                    saving = True
+                    stopDeadline = None
+                elif item[0] == _DONE:
+                    result = item[1]
+            except FTR_CancelledError as e:
+                # Ask the child to stop, and only pass on its errors
+                # from now on.
+                logger.warning(f"Sandbox: stopping {self.params['moduleName']}: {e.message}")
+                stopMessage = e.message
+                if not saving:
+                    stopDeadline = time.monotonic() + STOP_TIMEOUT
+                try:
+                    process.stdin.write((_CANCEL + "\n").encode("utf-8"))
+                    process.stdin.flush()
+                except OSError:
+                    pass
+            if stopDeadline and time.monotonic() > stopDeadline \
+               and process.poll() is None:
+                logger.error(f"Sandbox: killing process {process.pid}")
+                process.kill()
+                killed = True
+                stopDeadline = None
+
+        exitCode = process.wait()
+        reader.join()
+        process.stdin.close()
+        process.stdout.close()
+        logger.info(f"Sandbox: process {process.pid} exited with code {exitCode}")
+        if stopMessage:
+            result["stopped"] = stopMessage
+        return FTSandboxResult(result, exitCode, killed)
+
+# ------------------------------------------------------------------
+# The child process
+
+class FTSandboxReporter(FTReporter):
+    """
+    The reporter for a Module in the child process. Messages and
+    progress are sent to FlexTools instead of being stored.
+    """
+    def __init__(self, channel, flushInterval=0.1, maxBuffered=100):
+        FTReporter.__init__(self)
+        self.__channel = channel
+        self.__lock = threading.Lock()
+        self.__buffer = []
+        self.flushInterval = flushInterval
+        self.maxBuffered = maxBuffered
+        self.__nextFlush = time.monotonic() + flushInterval
+        self.RegisterProgressHandler(self.__SendProgress)
+
+    def Send(self, item, flush=False):
+        with self.__lock:
+            self.__buffer.append(json.dumps(item))
+            now = time.monotonic()
+            if flush or len(self.__buffer) >= self.maxBuffered \
+               or now >= self.__nextFlush:
+                self.__Write()
+                self.__nextFlush = now + self.flushInterval
+
+    def __Write(self):
+        if self.__buffer:
+            self.__channel.write("\n".join(self.__buffer) + "\n")
+            self.__buffer = []
+        self.__channel.flush()
+
+    def Flush(self):
+        with self.__lock:
+            self.__Write()
+
+    def __SendProgress(self, value, max, message):
+        self.Send((_PROGRESS, value, max, message), flush=True)
+
+    def __SendMessage(self, msgType, msg, ref, key):
+        msg, ref = PortableMessage(msg, ref)
+        self.Send((_MESSAGE, msgType, msg, ref, key))
+
+    def Blank(self):
+        self.__SendMessage(self.BLANK, None, None, None)
+
+    def Info(self, msg, ref=None, key=None):
+        self.cancelToken.Check()
+        self.__SendMessage(self.INFO, msg, ref, key)
+
+    def Warning(self, msg, ref=None, key=None):
+        self.cancelToken.Check()
+        self.__SendMessage(self.WARNING, msg, ref, key)
+
+    def Error(self, msg, ref=None, key=None):
+        self.__SendMessage(self.ERROR, msg, ref, key)
+
+
+def _ExceptionDetails(e):
+    # Returns (name, details) for an exception in the Module, as
+    # ModuleManager does for Modules run in FlexTools.
+    try:
+        import System
+        if isinstance(e, System.Exception):
+            return e.GetType().FullName, e.ToString()
+    except ImportError:
+        pass
+    name = e.__class__.__name__
+    message = e.message if hasattr(e, "message") else ""
+    return name, f"{name}: {message}\n{traceback.format_exc()}"
+
+
+def __ImportModule(modulePath, moduleName):
+    import importlib.util
+    spec = importlib.util.spec_from_file_location(moduleName, modulePath)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.FlexToolsModule
+
+
+def __RunInChild(params, reporter):
+    # params:
+    #   modulePath, moduleName, displayName, moduleVersion,
+    #   projectName, modifyAllowed,
+    #   checkpointPath - for Modules that can make changes, or None
+    #   profileMode, profilePath
+    #   cacheLookups, uiLanguage, modulesPath
+    import gettext
+    import site
+    from flexlibs import (
+        FLExInitialize,
+        FLExCleanup,
+        FLExProject,
+        FP_RuntimeError,
+        )
+    from .FTReport import GotoURLTemplate
+    from .FTRunData import FTRunData
+    from .FTChangeSet import FTChangeSet
+    from .FTCheckpoint import FTCheckpoint
+    from .FTProfiler import FTProfiler
+    from .FTProjectCache import FTProjectCache, FTCachingProject
+
+    translator = gettext.translation("flextools",
+                                     os.path.join(os.path.dirname(os.path.dirname(__file__)),
+                                                  "locales"),
+                                     languages=[params["uiLanguage"] or "en"],
+                                     fallback=True)
+    translator.install()
+    # Loads .pth files from Modules\ (as FTModules does)
+    site.addsitedir(params["modulesPath"])
+
+    moduleName = params["moduleName"]
+    modifyAllowed = params["modifyAllowed"]
+    result = {"finished" : False}
+
+    FLExInitialize()
+    try:
+        try:
+            ftm = __ImportModule(params["modulePath"], moduleName)
+            project = FLExProject()
+            project.OpenProject(params["projectName"],
+                                writeEnabled=modifyAllowed)
+        except Exception as e:
+            logger.exception(f"Sandbox: failed to start {moduleName}")
+            result["exception"] = _ExceptionDetails(e) + (False,)
+            return result
+        logger.info(f"Sandbox: running {moduleName} on {params['projectName']}")
+        try:
+            result["urlTemplate"] = GotoURLTemplate(project)
+            result["dateModified"] = str(project.GetDateLastModified())
+        except Exception as e:
+            logger.warning(f"Sandbox: project details failed: {e}")
+
+        reporter.runData = FTRunData(project)
+        if params["cacheLookups"]:
+            moduleProject = FTCachingProject(project, FTProjectCache(),
+                                             cacheObjects=not modifyAllowed)
+        else:
+            moduleProject = project
+        changes = FTChangeSet(moduleProject, reporter, modifyAllowed)
+        reporter.changes = changes
+        checkpoint = None
+        if params["checkpointPath"]:
+            checkpoint = FTCheckpoint(params["checkpointPath"],
+                                      params["projectName"],
+                                      moduleName,
+                                      params["moduleVersion"])
+            changes.onApply = checkpoint.Commit
+        reporter.checkpoint = checkpoint
+        profiler = None
+        if params["profileMode"]:
+            profiler = FTProfiler(params["profilePath"],
+                                  params["displayName"],
+                                  params["profileMode"])
+
+        try:
+            if profiler:
+                profiler.Start()
+            try:
+                ftm.Run(moduleProject, reporter, modifyAllowed=modifyAllowed)
+            finally:
+                if profiler:
+                    profiler.Stop()
+            changes.Checkpoint()
+            result["finished"] = True
+        except FTR_CancelledError as e:
+            result["stopped"] = e.message
+        except Exception as e:
+            logger.exception(f"Sandbox: {moduleName} failed")
+            result["exception"] = _ExceptionDetails(e) + \
+                                  (isinstance(e, FP_RuntimeError),)
+        finally:
+            reporter.changes = None
+            reporter.checkpoint = None
+            discarded = changes.Discard()
+            if checkpoint:
+                if discarded:
+                    checkpoint.Discard()
+                else:
+                    checkpoint.Commit()
+            reporter.runData = None
+            # Save the changes (FlexTools doesn't kill the process after
+            # this.)
+            reporter.Send((_SAVING,), flush=True)
+            project.CloseProject()
+
+        if checkpoint:
+            if result["finished"]:
+                checkpoint.Remove()
+            elif checkpoint.HasProgress():
+                checkpoint.Save()
+        if profiler:
+            result["profiles"] = profiler.Save()
+        result["discarded"] = discarded
+        result["changes"] = {"modifyAllowed" : modifyAllowed,
+                             "queued"        : changes.queued,
+                             "applied"       : changes.applied,
+                             "unchanged"     : changes.unchanged,
+                             "previewed"     : changes.previewed}
+        return result
+    finally:
+        FLExCleanup()
+
+
+def _ChildMain(runFunction=None):
+    # The entry point of the child process (see CHILD_COMMAND). The
+    # arguments are the path of flextools.ini (which FTConfig uses) and
+    # the params for runFunction(params, reporter), which returns the
+    # result dictionary. The default is __RunInChild().
+    from .FTConfig import NoSave
+    NoSave()
+    params = json.loads(sys.argv[2])
+
+    # Keep stdout for the messages; anything else written to it goes
+    # to the log.
+    channel = os.fdopen(os.dup(sys.stdout.fileno()), "w",
+                        encoding="utf-8", newline="\n")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    sys.stdout = sys.stderr
+
+    reporter = FTSandboxReporter(channel)
+
+    def __Listen():
+        for line in sys.stdin:
+            if line.strip() == _CANCEL:
+                reporter.cancelToken.Cancel()
+    threading.Thread(target=__Listen, daemon=True).start()
+
+    try:
+        result = (runFunction or __RunInChild)(params, reporter)
+    except BaseException as e:
+        logger.exception("Sandbox: unexpected error")
+        result = {"finished"  : False,
+                  "exception" : _ExceptionDetails(e) + (False,)}
+    result["cpuTime"] = time.process_time()
+    reporter.Send((_DONE, result), flush=True)
@@ -0,0 +1,120 @@
+#
+#   Project: FlexTools
+#   Module:  FTScheduler
+#
+#   Works out which Modules in a run can be run concurrently.
+#
+#   Modules declare the data they use with the optional FTM_Reads and
+#   FTM_Writes documentation keys (see FTModuleClass.py). Two Modules
+#   depend on each other if one of them writes data that the other
+#   reads or writes. A Module that doesn't declare FTM_Reads is assumed
+#   to read everything, and a modifying Module that doesn't declare
+#   FTM_Writes is assumed to write everything.
+#
+#   BuildStages() splits the module list into stages that are run one
+#   after the other. All the Modules in a stage are independent of each
+#   other, so they can be run concurrently. The order of the list is
+#   preserved: Modules are never moved ahead of a Module that they
+#   depend on, and writing Modules are always run in the order given,
+#   one per stage.
+#
+
+from .FTModuleClass import *
+
+# ------------------------------------------------------------------
+
+ALL_DATA = None                 # Undeclared reads/writes
+
+def __Overlaps(area1, area2):
+    # "lexicon" overlaps with "lexicon" and "lexicon:FTFlags", but
+    # "lexicon:FTFlags" doesn't overlap with "lexicon:Pinyin".
+    if area1 == area2:
+        return True
+    return area2.startswith(area1 + ":") or area1.startswith(area2 + ":")
+
+def __Intersects(areas1, areas2):
+    if areas1 is ALL_DATA:
+        # (An empty list means no data)
+        return areas2 is ALL_DATA or bool(areas2)
+    if areas2 is ALL_DATA:
+        return bool(areas1)
+    return any(__Overlaps(a1, a2) for a1 in areas1 for a2 in areas2)
+
+def DataAccess(docs, modifyAllowed):
+    """
+    Returns a tuple of (reads, writes) for a module's docs, where
+    each is a list of data areas, or ALL_DATA if they aren't declared.
+    Writes is empty if the module won't be making changes in this run.
+    """
+    reads = docs.get(FTM_Reads, ALL_DATA)
+    writes = docs.get(FTM_Writes, ALL_DATA if docs[FTM_ModifiesDB] else [])
+    if reads is not ALL_DATA:
+        reads = list(reads)
+    if writes is not ALL_DATA:
+        writes = list(writes)
+
+    if not (modifyAllowed and docs[FTM_ModifiesDB]):
+        # In preview mode the module still reads the data that it
+        # would have written.
+        if reads is not ALL_DATA:
+            reads = ALL_DATA if writes is ALL_DATA else reads + writes
+        writes = []
+    return reads, writes
+
+def Conflicts(access1, access2):
+    """
+    Returns True if two modules with the given (reads, writes) access
+    tuples can't be run at the same time.
+    """
+    reads1, writes1 = access1
+    reads2, writes2 = access2
+    return __Intersects(writes1, reads2) or \
+           __Intersects(writes1, writes2) or \
+           __Intersects(reads1, writes2)
+
+def CanRunConcurrently(access):
+    """
+    Returns True if the module can be run on a worker thread. Only
+    read-only modules that declare what they read can be. Other modules
+    are run on the calling thread, but that can still be at the same
+    time as the worker-thread modules in its stage (see BuildStages).
+    """
+    reads, writes = access
+    return reads is not ALL_DATA and not writes
+
+def BuildStages(modules, isolated=()):
+    """
+    modules is a list of (moduleName, access) tuples in run order,
+    where access is the (reads, writes) tuple from DataAccess().
+    Returns a list of stages, each of which is a list of module names.
+    The modules in a stage don't conflict with each other, and at most
+    one of them has to run on the calling thread. That one runs while
+    the others are running on worker threads.
+    The modules named in isolated are always in a stage of their own.
+    """
+    stages = []
+    current = []                # (moduleName, access)
+
+    def __fits(access):
+        if any(Conflicts(access, a) for n, a in current):
+            return False
+        if CanRunConcurrently(access):
+            return True
+        return all(CanRunConcurrently(a) for n, a in current)
+
+    for moduleName, access in modules:
+        if moduleName in isolated:
+            if current:
+                stages.append([n for n, a in current])
+                current = []
+            stages.append([moduleName])
+            continue
+        if not __fits(access):
+            stages.append([n for n, a in current])
+            current = []
+        current.append((moduleName, access))
+
+    if current:
+        stages.append([n for n, a in current])
+
+    return stages
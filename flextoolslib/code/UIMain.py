@@ -18,6 +18,26 @@
 #       module will not run it. (Double click is ignored.)
 #       If FTConfig.stopOnError is True, then processing will stop after
 #       any module that outputs an error message.
+#       A module can be given a time budget (in seconds) in the
+#       collection .ini file. (See FTCollections.py)
+#       If FTConfig.concurrentModules is True, then independent read-only 
+#       modules that declare FTM_Reads are run at the same time. 
+#       (See FTScheduler.py)
+#       If FTConfig.cacheLookups is True, then modules are given a proxy
+#       for the project that caches writing system handles, headwords,
+#       glosses, etc. (See FTProjectCache.py)
+#       If FTConfig.cacheResults is True, then the saved report of a
+#       read-only module is shown if the project hasn't changed since
+#       it was last run. (See FTResultCache.py)
+#       If FTConfig.isolateModules is True, then each module is run in
+#       a child process, so that a module that crashes or hangs doesn't
+#       stop FlexTools. Individual modules can be isolated with the
+#       Isolate option in the collection .ini file. (See FTSandbox.py)
+#       The report can be saved to a JSONL, CSV or HTML file, either
+#       after a run or while the next run is in progress.
+#       (See FTReportSinks.py)
+#       The warnings and errors of a run can be compared with the 
+#       previous run on the same project. (See FTReportDiff.py)
 #
 #   Copyright Craig Farrow, 2010 - 2025
 #
@@ -32,7 +52,6 @@ import System
 
 clr.AddReference("System.Windows.Forms")
 from System.Windows.Forms import (
-    Application,
     Form,
     Panel, 
     MessageBox, MessageBoxButtons, MessageBoxIcon, DialogResult,
@@ -48,6 +67,7 @@ from System.Windows.Forms import (
     SplitContainer,
     Keys, Control,
     MouseButtons,
+    SaveFileDialog,
     )
 
 from System.Drawing import (
@@ -57,13 +77,15 @@ from System.Drawing import (
     StringAlignment,
     )
 
+from System import Action
 from System.Threading import Thread, ThreadStart, ApartmentState
 
 from .. import version
 from . import UIGlobal
 from .FTConfig import FTConfig
 from . import UICollections, FTCollections
-from . import UIModulesList, UIReport
+from . import UIModulesList, UIReport, FTReport, FTReportSinks, FTReportDiff
+from . import FTProfiler
 from .UIModuleInfo import ModuleInfoDialog
 from .UIProjectChooser import ProjectChooser
 from . import FTModules
@@ -171,7 +193,9 @@ class FTPanel(Panel):
             self.modulesList.SetActivatedHandler(self.Run)
 
         self.reportWindow = UIReport.ReportWindow()
-        self.reportWindow.Reporter.RegisterProgressHandler(progressFunction)
+        self.reportWindow.RegisterProgressHandler(progressFunction)
+        self.runThread = None
+        self.runReportFile = None      # Save the next run to this file
 
         # -- Startup messages and getting started hint.
         
@@ -238,7 +262,8 @@ class FTPanel(Panel):
 
     # ---- Run actions ----
 
-    def __Run(self, message, modules, modifyAllowed = False):
+    def __Run(self, message, modules, modifyAllowed = False, profileMode = None,
+              forceRun = False):
         # Reload the modules to make sure we're using the latest code.
         if self.reloadFunction: self.reloadFunction()
 
@@ -269,7 +294,7 @@ class FTPanel(Panel):
                 message += _(" (Changes enabled)")
        
         self.reportWindow.Reporter.Info(message)
-        self.reportWindow.Refresh()
+        self.reportWindow.Flush()
         
         # Freeze our UI when modules are running by disabling all 
         # controls (menu, toolbar, and keyboard shortcuts) on the main 
@@ -277,16 +302,53 @@ class FTPanel(Panel):
         
         self.lockUIFunction(True)
 
-        self.moduleManager.RunModules(FTConfig.currentProject,
-                                      modules,
-                                      self.reportWindow.Reporter,
-                                      modifyAllowed)
-                                                  
+        # Run the modules on a worker thread so that the UI stays
+        # responsive. The report window displays the messages and 
+        # progress on the UI thread. The thread is STA so that modules
+        # can open their own dialogs.
+        moduleOptions = self.listOfModules.moduleOptions
+        reportFiles = [self.runReportFile] if self.runReportFile else None
+        self.runReportFile = None
+
+        def __RunModules():
+            try:
+                self.moduleManager.RunModules(FTConfig.currentProject,
+                                              modules,
+                                              self.reportWindow.Reporter,
+                                              modifyAllowed,
+                                              moduleOptions,
+                                              reportFiles,
+                                              profileMode,
+                                              forceRun)
+            except FTReport.FTR_CancelledError:
+                # Stopped after the last module had finished
+                pass
+            except Exception as e:
+                logger.exception("RunModules failed:")
+                self.reportWindow.Reporter.Error(
+                    _("Unexpected error running modules: {}").format(e))
+            finally:
+                self.BeginInvoke(Action(self.__RunFinished))
+
+        self.runThread = Thread(ThreadStart(__RunModules))
+        self.runThread.SetApartmentState(ApartmentState.STA)
+        self.runThread.IsBackground = True
+        self.runThread.Start()
+
+    def __RunFinished(self):
+        # Called on the UI thread when the worker thread has finished.
+        self.runThread = None
+
         # Make sure the progress indicator is off
         self.reportWindow.Reporter.ProgressStop()
+        self.reportWindow.Flush()
         
         # Re-enable
         self.lockUIFunction(False)
+
+    @property
+    def IsRunning(self):
+        return self.runThread is not None
         
     def RunAll(self, modifyAllowed=False):
         if len(self.listOfModules) > 0:
@@ -294,7 +356,7 @@ class FTPanel(Panel):
                        self.listOfModules,
                        modifyAllowed)
 
-    def Run(self, modifyAllowed=False):
+    def Run(self, modifyAllowed=False, profileMode=None, forceRun=False):
         selectedModules = list(self.modulesList.SelectedIndices)
         if len(selectedModules) > 0:
             if len(selectedModules) == 1:
@@ -305,7 +367,9 @@ class FTPanel(Panel):
             modulesToRun = [m for i, m in enumerate(self.listOfModules) if i in selectedModules]
             self.__Run(msg,
                        modulesToRun,
-                       modifyAllowed)
+                       modifyAllowed,
+                       profileMode,
+                       forceRun)
 
     def RunAllModify(self):
         self.RunAll(True)
@@ -313,6 +377,26 @@ class FTPanel(Panel):
     def RunModify(self):
         self.Run(True)
 
+    def RunProfiled(self):
+        # The profiles are saved with flextools.log, and linked from
+        # the report. (See FTProfiler.py)
+        self.Run(FTConfig.simplifiedRunOps,
+                 profileMode=FTProfiler.PROFILE_CPROFILE)
+
+    def RunSampled(self):
+        # A low-overhead profile for long runs. (See FTProfiler.py)
+        self.Run(FTConfig.simplifiedRunOps,
+                 profileMode=FTProfiler.PROFILE_SAMPLING)
+
+    def RunForced(self):
+        # Don't use the saved reports. (See FTResultCache.py)
+        self.Run(FTConfig.simplifiedRunOps, forceRun=True)
+
+    def Stop(self):
+        # The running module is stopped the next time it reports
+        # progress or a message.
+        self.reportWindow.Reporter.cancelToken.Cancel()
+
     # ---- Collections Tab handlers ----
     
     # Called when a tab is selected
@@ -425,6 +509,54 @@ class FTPanel(Panel):
     def ClearReport(self):
         self.reportWindow.Clear()
 
+    def __ChooseReportFile(self, title):
+        dlg = SaveFileDialog()
+        dlg.Title = title
+        dlg.Filter = "HTML (*.html)|*.html|CSV (*.csv)|*.csv|JSON Lines (*.jsonl)|*.jsonl"
+        dlg.OverwritePrompt = True
+        if dlg.ShowDialog() == DialogResult.OK:
+            return dlg.FileName
+        return None
+
+    def SaveReport(self):
+        path = self.__ChooseReportFile(_("Save the report"))
+        if path:
+            try:
+                self.reportWindow.SaveToFile(path)
+            except FTReportSinks.FTR_SinkError as e:
+                self.reportWindow.Report((FTReport.FTReporter.ERROR, e.message, None))
+            else:
+                self.reportWindow.Report(_("Report saved to {}").format(path))
+
+    def CompareWithPreviousRun(self):
+        result = FTReportDiff.Compare(FTConfig.ReportHistoryPath,
+                                      FTConfig.currentProject)
+        if result is None:
+            self.reportWindow.Report(_("There is no previous run of this project to compare with."))
+            return
+
+        new, resolved, unchanged = result
+        self.reportWindow.Clear()
+        reportItems = [(FTReport.FTReporter.INFO,
+                        _("Compared with the previous run on '{}': {} new, {} resolved, {} unchanged.").format(
+                          FTConfig.currentProject, len(new), len(resolved), len(unchanged)),
+                        None)]
+        for heading, records in ((_("New:"), new),
+                                 (_("Resolved:"), resolved),
+                                 (_("Unchanged:"), unchanged)):
+            if records:
+                reportItems.append("")
+                reportItems.append(heading)
+                reportItems.extend((msgType, f"{moduleName}: {msg}", ref)
+                                   for moduleName, msgType, msg, ref in records)
+        self.reportWindow.ReportMany(reportItems)
+
+    def SaveNextRun(self):
+        path = self.__ChooseReportFile(_("Save the report of the next run"))
+        if path:
+            self.runReportFile = path
+            self.reportWindow.Report(_("The report of the next run will be saved to {}").format(path))
+
     def RefreshModules(self):
         self.modulesList.UpdateAllItems(self.listOfModules,
                                         keepSelection=True)
@@ -542,6 +674,25 @@ class FTMainForm (Form):
                         Keys.Control | Keys.A,
                         _("Run all the modules")
                        ),
+                       None,     # Separator
+                       (self.RunProfiled,
+                        # NOTE: Menu item
+                        _("Run with profiling"),
+                        None,
+                        _("Run the selected module(s) and save a profile of where the time is spent")
+                       ),
+                       (self.RunSampled,
+                        # NOTE: Menu item
+                        _("Run with sampling profiler"),
+                        None,
+                        _("Run the selected module(s) and save a low-overhead profile for long runs, by sampling where the time is spent")
+                       ),
+                       (self.RunForced,
+                        # NOTE: Menu item
+                        _("Run without saved reports"),
+                        None,
+                        _("Run the selected module(s), even if the project hasn't changed since they were last run")
+                       ),
                       ]
         else:
             RunMenu = [(self.Run,
@@ -568,6 +719,25 @@ class FTMainForm (Form):
                         Keys.Control | Keys.Shift | Keys.A,
                         _("Run all the modules and allow changes to the project")
                        ),
+                       None,     # Separator
+                       (self.RunProfiled,
+                        # NOTE: Menu item
+                        _("Run with profiling"),
+                        None,
+                        _("Run the selected module(s) and save a profile of where the time is spent")
+                       ),
+                       (self.RunSampled,
+                        # NOTE: Menu item
+                        _("Run with sampling profiler"),
+                        None,
+                        _("Run the selected module(s) and save a low-overhead profile for long runs, by sampling where the time is spent")
+                       ),
+                       (self.RunForced,
+                        # NOTE: Menu item
+                        _("Run without saved reports"),
+                        None,
+                        _("Run the selected module(s), even if the project hasn't changed since they were last run")
+                       ),
                       ]
         ReportMenu =    [(self.CopyToClipboard,
                           # NOTE: Menu item
@@ -575,8 +745,24 @@ class FTMainForm (Form):
                           Keys.Control | Keys.C,
                           _("Copy the report contents to the clipboard")
                          ),
-                         #(TODO, _("Save..."), Keys.Control | Keys.S,
-                         # _("Save the current report to a file")),
+                         (self.SaveReport,
+                          # NOTE: Menu item
+                          _("Save..."),
+                          Keys.Control | Keys.S,
+                          _("Save the current report to an HTML, CSV or JSONL file")
+                         ),
+                         (self.SaveNextRun,
+                          # NOTE: Menu item
+                          _("Save next run..."),
+                          None,
+                          _("Save the report to a file while the next run is in progress")
+                         ),
+                         (self.CompareWithPreviousRun,
+                          # NOTE: Menu item
+                          _("Compare with previous run"),
+                          None,
+                          _("Show the new, resolved and unchanged warnings and errors since the previous run on this project")
+                         ),
                          (self.ClearReport,
                           # NOTE: Menu item
                           _("Clear"),
@@ -652,7 +838,7 @@ class FTMainForm (Form):
         # Pre-calculate the menu items to disable when disableRunAll is defined
         # for a collection.
         runallIndices = [i for i, m in enumerate(RunMenu)
-                         if m[0] in (self.RunAll, self.RunAllModify)]
+                         if m and m[0] in (self.RunAll, self.RunAllModify)]
         runMenu = self.MainMenuStrip.Items[1]
         self.runallMenuItems = [runMenu.DropDownItems[i]
                                 for i in runallIndices]
@@ -721,10 +907,19 @@ class FTMainForm (Form):
                               _("Run all the modules and allow changes to the project"))
                           ]
             
+        ButtonListC = [
+                        None, # Separator
+                       (self.Stop,
+                          # NOTE: Toolbar item
+                          _("Stop"),
+                          "delete",
+                          _("Stop running the modules")),
+                      ]
+
         if FTConfig.hideCollectionsButton:
             ButtonListA.pop(1)
         
-        ButtonList = ButtonListA + ButtonListB
+        ButtonList = ButtonListA + ButtonListB + ButtonListC
 
         self.toolbar = CustomToolBar(ButtonList,
                                      UIGlobal.ToolbarIconParams)
@@ -739,6 +934,11 @@ class FTMainForm (Form):
         self.runallButtons = [self.toolbar.Items[i]
                               for i in runallIndices]
 
+        # The Stop button is only enabled while modules are running.
+        self.stopButton = self.toolbar.Items[len(ButtonList) - 1]
+        self.stopButton.Enabled = False
+        self.toolbarStates = None
+
     def __LoadModules(self):
         logger.debug("Loading modules")
         errorList = self.moduleManager.LoadAll()
@@ -833,6 +1033,14 @@ class FTMainForm (Form):
             FTConfig.hideCollectionsButton = False
         if FTConfig.sortCollectionTabs is None:
             FTConfig.sortCollectionTabs = True
+        if FTConfig.concurrentModules is None:
+            FTConfig.concurrentModules = False
+        if FTConfig.traceMemory is None:
+            FTConfig.traceMemory = False
+        if FTConfig.cacheResults is None:
+            FTConfig.cacheResults = False
+        if FTConfig.isolateModules is None:
+            FTConfig.isolateModules = False
 
         if FTConfig.simplifiedRunOps:
             self.ClientSize = UIGlobal.mainWindowSizeNarrow
@@ -879,6 +1087,7 @@ class FTMainForm (Form):
         # Status bar
         self.progressPercent = -1
         self.progressMessage = None
+        self.progressRateText = ""
         self.StatusBar = StatusBar()
         self.statusbarCallback = appStatusbar
         self.UpdateStatusBar()
@@ -899,6 +1108,17 @@ class FTMainForm (Form):
                                   listOfModules.disableRunAll)
 
         self.Shown += self.UIPanel.OnShown
+        self.FormClosing += self.__OnFormClosing
+
+    def __OnFormClosing(self, sender, event):
+        # Don't close while modules are running, since the project
+        # would be left open. Stop them instead; the user can close 
+        # the window when they have finished.
+        if self.UIPanel.IsRunning:
+            self.UIPanel.Stop()
+            self.UIPanel.reportWindow.Report(
+                _("Stopping the modules before closing..."))
+            event.Cancel = True
 
     # ---- UI/update functions ----
     
@@ -919,7 +1139,24 @@ class FTMainForm (Form):
         
         self.MenuShortcutsEnabled = enable
         for c in self.Controls:
-            c.Enabled = enable
+            if not c.Equals(self.toolbar):
+                c.Enabled = enable
+
+        # The toolbar stays enabled so that the Stop button can be
+        # used, so disable the other buttons individually.
+        if lock:
+            if self.toolbarStates is None:
+                self.toolbarStates = [(b, b.Enabled) 
+                                      for b in self.toolbar.Items]
+            for b, enabled in self.toolbarStates:
+                b.Enabled = False
+            self.stopButton.Enabled = True
+        else:
+            if self.toolbarStates is not None:
+                for b, enabled in self.toolbarStates:
+                    b.Enabled = enabled
+                self.toolbarStates = None
+            self.stopButton.Enabled = False
 
     def UpdateStatusBar(self):
         collectionText = _("Collection: {}").format(FTConfig.currentCollection)
@@ -934,7 +1171,8 @@ class FTMainForm (Form):
 
         if self.progressPercent >= 0:
             msg = self.progressMessage if self.progressMessage else _("Progress")
-            progressText = "[%s: %i%%]" % (msg, self.progressPercent)
+            progressText = "[%s: %i%%%s]" % (msg, self.progressPercent,
+                                             self.progressRateText)
         else:
             progressText = ""
         
@@ -949,7 +1187,7 @@ class FTMainForm (Form):
         for button in self.runallButtons:
             button.Enabled = not disableRunAll
 
-    def __ProgressBar(self, val, max, msg=None):
+    def __ProgressBar(self, val, max, msg=None, rate=None, eta=None):
         if max == 0: # Clear progress bar
             if self.progressPercent != -1:
                 self.progressPercent = -1
@@ -957,17 +1195,26 @@ class FTMainForm (Form):
             return
 
         newPercent = (val * 100) // max          # val = [0...max]
+        # rate (items per second) and eta (seconds remaining) are 
+        # provided by the Reporter once the module is under way.
+        if rate:
+            minutes, seconds = divmod(int(eta or 0), 60)
+            # NOTE: Keep the leading comma and space if your language uses them.
+            rateText = _(", {:.0f}/s, {}:{:02d} left").format(rate, minutes, seconds)
+        else:
+            rateText = ""
         refresh = False
         if msg != self.progressMessage:
             refresh = True
         elif newPercent != self.progressPercent:
             refresh = True
+        elif rateText != self.progressRateText:
+            refresh = True
         if refresh:
             self.progressPercent = newPercent
             self.progressMessage = msg
+            self.progressRateText = rateText
             self.UpdateStatusBar()
-            # Give the report window a chance to refresh
-            Application.DoEvents()   
 
     # ---- Menu & Toolbar handlers ----
 
@@ -1020,6 +1267,15 @@ class FTMainForm (Form):
     def ClearReport(self, sender, event):
         self.UIPanel.ClearReport()
 
+    def SaveReport(self, sender, event):
+        self.UIPanel.SaveReport()
+
+    def SaveNextRun(self, sender, event):
+        self.UIPanel.SaveNextRun()
+
+    def CompareWithPreviousRun(self, sender, event):
+        self.UIPanel.CompareWithPreviousRun()
+
     def ModuleInfo(self, sender, event):
         self.UIPanel.ModuleInfo()
 
@@ -1060,12 +1316,24 @@ class FTMainForm (Form):
             sender.Visible = False
             sender.Visible = True
 
+    def RunProfiled(self, sender, event):
+        self.UIPanel.RunProfiled()
+
+    def RunSampled(self, sender, event):
+        self.UIPanel.RunSampled()
+
+    def RunForced(self, sender, event):
+        self.UIPanel.RunForced()
+
     def RunAll(self, sender, event):
         self.UIPanel.RunAll()
 
     def RunAllModify(self, sender, event):
         self.UIPanel.RunAllModify()
 
+    def Stop(self, sender, event):
+        self.UIPanel.Stop()
+
     def CheckForUpdates(self, sender, event):
         reporter = self.UIPanel.reportWindow
         reporter.Clear()
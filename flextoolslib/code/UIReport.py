@@ -10,24 +10,27 @@
 #
 
 import os
+import bisect
+from collections import deque
 
 import logging
 logger = logging.getLogger(__name__)
 
 from . import UIGlobal
 from . import FTReport
+from . import FTReportSinks
 
 from System.Drawing import (
     Bitmap,
     )
 
 from System.Windows.Forms import (
-    Application,
     DockStyle, View,
     ListView, ListViewItem, ColumnHeaderStyle,
     HorizontalAlignment, 
     ImageList, ColorDepth,
     Clipboard,
+    Timer,
     )
 
 from System import Environment
@@ -48,14 +51,44 @@ class ReportWindow(ListView):
         self.ShowItemToolTips = True
         self.Columns.Add("", -2, HorizontalAlignment.Left)
 
+        # The list is in virtual mode: the rows are served on demand
+        # from the Reporter's message store, so only the visible rows 
+        # have ListViewItems. A small cache holds the items for the 
+        # range that the ListView has asked for.
+        self.VirtualMode = True
+        self.VirtualListSize = 0
+        self.__cacheStart = 0
+        self.__cache = []
+        # The window's own lines (see Report()) aren't part of the
+        # Reporter's messages. They are shown at the rows in __uiRows.
+        self.__uiLines = []
+        self.__uiRows = []
+
         # Events
         self.Resize += self.__OnResize
         self.DoubleClick += self.__OnDoubleClick
+        self.RetrieveVirtualItem += self.__OnRetrieveVirtualItem
+        self.CacheVirtualItems += self.__OnCacheVirtualItems
 
         # Register this class as the sink for all messages.
         # The higher level passes self.Reporter to the Modules.
+        # Modules are run on a worker thread, so the sizes of the 
+        # Reporter's message batches are queued, and a timer on the UI
+        # thread grows the list by them and shows the latest progress 
+        # value. So the list is resized at most batchRate times a 
+        # second, and the timer doesn't poll the message store. 
+        # (deque appends and pops are thread-safe.)
         self.Reporter = FTReport.FTReporter()
-        self.Reporter.RegisterUIHandler(self.Report)
+        self.Reporter.RegisterBatchHandler(self.__QueueBatch)
+        self.__pending = deque()
+        self.__delivered = 0            # Reporter messages in the list
+        self.__progressHandler = None
+        self.__progress = None
+
+        self.__timer = Timer()
+        self.__timer.Interval = 50      # milliseconds
+        self.__timer.Tick += self.__OnTimer
+        self.__timer.Start()
 
         # Configure icons
         self.SmallImageList = ImageList()
@@ -72,18 +105,123 @@ class ReportWindow(ListView):
         self.Columns[0].Width = self.Size.Width - 24
 
     def __OnDoubleClick(self, sender, event):
-        if sender.SelectedItems.Count:
-            item = sender.SelectedItems[0]
-            if item.Tag and item.Tag.startswith(("silfw:", "file:")):
+        if sender.SelectedIndices.Count:
+            index = sender.SelectedIndices[0]
+            text, toolTip, tag = self.__ItemTexts(self.__Rows(index, index+1)[0])
+            # The link for a Guid reference is only built now.
+            tag = self.Reporter.ResolveRef(tag)
+            if tag and tag.startswith(("silfw:", "file:")):
                 try:
-                    os.startfile(item.Tag)
+                    os.startfile(tag)
                 except FileNotFoundError as e:
-                    logger.error(f"os.startfile failed with {item.Tag}")
+                    logger.error(f"os.startfile failed with {tag}")
+
+    # --- Virtual mode handlers
+
+    def __OnCacheVirtualItems(self, sender, event):
+        cacheEnd = self.__cacheStart + len(self.__cache)
+        if self.__cacheStart <= event.StartIndex and event.EndIndex < cacheEnd:
+            return
+        # Read the whole range from the store at once.
+        reportItems = self.__Rows(event.StartIndex, event.EndIndex+1)
+        self.__cacheStart = event.StartIndex
+        self.__cache = [self.__MakeItem(r) for r in reportItems]
+
+    def __OnRetrieveVirtualItem(self, sender, event):
+        index = event.ItemIndex - self.__cacheStart
+        if 0 <= index < len(self.__cache):
+            event.Item = self.__cache[index]
+        else:
+            event.Item = self.__MakeItem(self.__Rows(event.ItemIndex,
+                                                     event.ItemIndex+1)[0])
+
+    def __ClearCache(self):
+        self.__cacheStart = 0
+        self.__cache = []
+
+    def __Rows(self, start, stop):
+        # Returns the report items for rows start to stop-1: the
+        # Reporter's messages with the window's own lines between them.
+        items = []
+        k = bisect.bisect_left(self.__uiRows, start)    # UI lines before start
+        row = start
+        while row < stop:
+            if k < len(self.__uiRows) and self.__uiRows[k] < stop:
+                uiRow = self.__uiRows[k]
+            else:
+                uiRow = stop
+            items.extend(self.Reporter.messages[row-k:uiRow-k])
+            if uiRow < stop:
+                items.append(self.__uiLines[k])
+                k += 1
+            row = uiRow + 1
+        return items
+
+    def __AllRows(self):
+        # All the rows, read from the store in blocks.
+        count = self.__delivered + len(self.__uiLines)
+        blockSize = self.Reporter.messages.windowSize
+        for start in range(0, count, blockSize):
+            yield from self.__Rows(start, min(count, start + blockSize))
+
+    # --- Thread-safe handlers for the Reporter
+
+    def __QueueBatch(self, reportItems):
+        # The messages are already in the Reporter's store.
+        self.__pending.append(len(reportItems))
+
+    def __QueueProgress(self, val, max, msg):
+        # Only the latest progress value is needed.
+        self.__progress = (val, max, msg, 
+                           self.Reporter.progressRate,
+                           self.Reporter.progressETA)
+
+    def __OnTimer(self, sender, event):
+        self.__Update(False)
+
+    def RegisterProgressHandler(self, handler):
+        """
+        Register a UI function to show the Reporter's progress. It is 
+        always called on the UI thread, with the arguments:
+            (value, max, message, rate, eta)
+        where rate is in items per second and eta is in seconds. (These
+        are None until the rate is known.)
+        """
+        self.__progressHandler = handler
+        self.Reporter.RegisterProgressHandler(self.__QueueProgress)
+
+    def Flush(self):
+        """
+        Display any new messages and the latest progress value.
+        Must be called on the UI thread.
+        """
+        self.__Update(True)
+
+    def __Update(self, force):
+        # Messages that have waited too long for a batch (e.g. the 
+        # Module is busy without reporting) are delivered by the timer.
+        self.Reporter.Flush(force)
+        self.__UpdateSize()
+
+        progress, self.__progress = self.__progress, None
+        if progress and self.__progressHandler:
+            self.__progressHandler(*progress)
+
+    def __UpdateSize(self):
+        # Show the messages that have been delivered since the last
+        # update, and scroll to the last one.
+        while self.__pending:
+            self.__delivered += self.__pending.popleft()
+        count = self.__delivered + len(self.__uiLines)
+        if count != self.VirtualListSize:
+            self.VirtualListSize = count
+            if count:
+                self.EnsureVisible(count - 1)
 
     def Report(self, reportItem):
         """
-        Output a new status or error message by appending an item to 
-        the ListView. Messages can be shown with icons and tooltips for
+        Output a new status or error message by appending it to the 
+        list. Messages can be shown with icons and tooltips for
         extra information. They can optionally provide a hyperlink to a
         FieldWorks data element or a file to open when the list item is
         double-clicked.
@@ -105,47 +243,93 @@ class ReportWindow(ListView):
                     Additionally, if extraInfo is not a string (such as 
                     a FieldWorks object) then the tooltip displays its
                     representation (using repr()).
+
+        The message is only shown in the window: it isn't added to the
+        Reporter's messages, so it isn't saved or counted.
         """
-        if type(reportItem) == tuple:
-            msgType, msg, extra = reportItem
-            if msg == None: msg = ""            # If None then no icon shows
-            item = ListViewItem([msg], msgType) # 2nd = image index; 3 => no icon
-            if extra:
-                try:
-                    if extra.startswith("silfw:"):
-                        item.ToolTipText = _("Double-click to jump to FieldWorks")
-                    elif extra.startswith("file:"):
-                        item.ToolTipText = _("Double-click to open file")
-                    else:
-                        item.ToolTipText = extra
-                    item.Tag = extra
-                except AttributeError:      # Not a string
-                    item.Tag = item.ToolTipText = repr(extra)
-            addedItem = self.Items.Add(item)
-        else:
-            addedItem = self.Items.Add(reportItem)
-        addedItem.EnsureVisible()
-        if self.Items.Count % 10 == 0:
-            Application.DoEvents()
+        self.ReportMany([reportItem])
+
+    def ReportMany(self, reportItems):
+        """
+        Output a list of messages (as for Report()) in one update of
+        the list, scrolling to the last one.
+        """
+        # Show the lines after the messages that have been reported so far.
+        self.Reporter.Flush()
+        self.__UpdateSize()
+        for reportItem in reportItems:
+            if type(reportItem) != tuple:
+                # Shown as a line with no icon
+                reportItem = (self.Reporter.BLANK, reportItem, None)
+            self.__uiRows.append(self.__delivered + len(self.__uiLines))
+            self.__uiLines.append(reportItem)
+        self.__UpdateSize()
+
+    def __ItemTexts(self, reportItem):
+        # Returns the (text, toolTip, tag) for a message tuple.
+        msgType, msg, extra = reportItem
+        if msg == None: msg = ""
+        toolTip = tag = None
+        if extra:
+            try:
+                if extra.startswith(("silfw:", FTReport.GUID_REF_PREFIX)):
+                    toolTip = _("Double-click to jump to FieldWorks")
+                elif extra.startswith("file:"):
+                    toolTip = _("Double-click to open file")
+                else:
+                    toolTip = extra
+                tag = extra
+            except AttributeError:      # Not a string
+                tag = toolTip = repr(extra)
+        return msg, toolTip, tag
+
+    def __MakeItem(self, reportItem):
+        text, toolTip, tag = self.__ItemTexts(reportItem)
+        msgType = reportItem[0]
+        item = ListViewItem([text], msgType) # 2nd = image index; 3 => no icon
+        if toolTip:
+            item.ToolTipText = toolTip
+            item.Tag = tag
+        return item
 
     def CopyToClipboard(self):
-        def __getData(item):
-            if item.Tag:
-                if item.Tag.startswith("silfw:"):
-                    return item.Text
+        def __getData(reportItem):
+            text, toolTip, tag = self.__ItemTexts(reportItem)
+            if tag:
+                if tag.startswith(("silfw:", FTReport.GUID_REF_PREFIX)):
+                    return text
                 else:
-                    return Environment.NewLine.join((item.Text, 
-                                                     item.ToolTipText))
+                    return Environment.NewLine.join((text, toolTip))
             else:
-                return item.Text
+                return text
 
-        data = [__getData(i) for i in self.Items]
+        # Read the rows from the store rather than the ListView, since
+        # the list only has items for the visible rows.
+        data = [__getData(r) for r in self.__AllRows()]
 
         if data:
             Clipboard.SetText(Environment.NewLine.join(data))
         else:
             Clipboard.Clear()
 
+    def SaveToFile(self, path):
+        """
+        Write the report to a JSONL, CSV or HTML file (determined by
+        the extension). The messages are streamed from the store.
+        Raises FTReportSinks.FTR_SinkError if the file can't be written.
+        """
+        sink = FTReportSinks.OpenSink(path)
+        try:
+            sink.WriteMany((msgType, msg, self.Reporter.ResolveRef(ref))
+                           for msgType, msg, ref in self.__AllRows())
+        finally:
+            sink.Close()
+
     def Clear(self):
         self.Reporter.Reset()
-        self.Items.Clear()
+        self.__pending.clear()
+        self.__delivered = 0
+        self.__uiLines = []
+        self.__uiRows = []
+        self.__ClearCache()
+        self.VirtualListSize = 0
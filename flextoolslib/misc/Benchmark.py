@@ -0,0 +1,243 @@
+#
+#   Benchmark
+#
+#   Measures how Modules scale with project size, by running them
+#   against FakeProjects (see FakeProject.py) of several sizes.
+#   Used by FlexTools\scripts\BenchmarkModules.py
+#
+#   For each Module and size, the results include:
+#    - seconds:     wall time of the Module's run.
+#    - peakMemory:  peak bytes allocated by Python during the run (from
+#                   tracemalloc, in a second run so that tracing doesn't
+#                   slow down the timed run).
+#    - messages:    the number of report messages, and their counts by
+#                   type.
+#
+#   Each metric's scaling exponent is fitted across the sizes (1.0 is
+#   linear, 2.0 is quadratic), leaving out the runs that failed. Results
+#   can be saved to JSON and compared with a baseline from an earlier
+#   run. Modules that couldn't be imported are listed in the results'
+#   "failed" list.
+#
+#   Modules can be run with the caching project proxy that FlexTools
+#   uses (see FTProjectCache.py), to compare with the uncached times.
+#
+#   Project generation isn't included in the measurements. Modules are
+#   run in a temporary folder, so that any files they export are
+#   discarded.
+#
+
+import gc
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import logging
+logger = logging.getLogger(__name__)
+
+from .. import version
+from .FakeLCM import InstallFakeLCM
+from .FakeProject import GenerateProject
+from .RunModule import ImportModule, RunModuleOnProject
+
+#----------------------------------------------------------------
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+METRICS = ("seconds", "peakMemory", "messages")
+
+# Metrics below these values are too small to measure scaling or
+# regressions reliably.
+NOISE_FLOOR = {
+    "seconds"    : 0.05,
+    "peakMemory" : 1024 * 1024,
+    "messages"   : 100,
+    }
+
+# A scaling exponent above this is reported as super-linear.
+SUPERLINEAR_EXPONENT = 1.3
+
+#----------------------------------------------------------------
+
+def __Measure(ftm, size, modifyAllowed, seed, traceMemory, cacheLookups):
+    # Returns (seconds, peakMemory, reporter) for one run of the Module.
+    project = GenerateProject(size, seed=seed)
+    project.OpenProject(writeEnabled=modifyAllowed)
+    gc.collect()
+    if traceMemory:
+        tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        reporter = RunModuleOnProject(ftm, project, modifyAllowed,
+                                      cacheLookups=cacheLookups)
+        seconds = time.perf_counter() - start
+        peakMemory = tracemalloc.get_traced_memory()[1] if traceMemory else None
+    finally:
+        if traceMemory:
+            tracemalloc.stop()
+        project.CloseProject()
+    return seconds, peakMemory, reporter
+
+
+def BenchmarkModule(modulePath, sizes=DEFAULT_SIZES, modifyAllowed=False,
+                    seed=0, measureMemory=True, cacheLookups=False):
+    """
+    Run the Module at modulePath against projects of each size (number
+    of entries). Returns a dictionary of the results for each size and
+    the fitted scaling exponents, or None if the Module couldn't be
+    imported.
+    """
+    InstallFakeLCM()
+    mod = ImportModule(modulePath)
+    if not mod or not hasattr(mod, "FlexToolsModule"):
+        logger.error(f"Benchmark: couldn't import {modulePath}")
+        return None
+    ftm = mod.FlexToolsModule
+
+    results = []
+    for size in sizes:
+        logger.info(f"Benchmark: {modulePath} with {size} entries")
+        seconds, peakMemory, reporter = __Measure(ftm, size, modifyAllowed,
+                                                  seed, traceMemory=False,
+                                                  cacheLookups=cacheLookups)
+        result = {"size"     : size,
+                  "seconds"  : round(seconds, 4),
+                  "failed"   : reporter is None}
+        if reporter is not None:
+            result["messages"] = len(reporter.messages)
+            result["messageCounts"] = dict(zip(("info", "warning", "error", "blank"),
+                                               reporter.messageCounts))
+        if measureMemory:
+            peakMemory = __Measure(ftm, size, modifyAllowed, seed,
+                                   traceMemory=True,
+                                   cacheLookups=cacheLookups)[1]
+            result["peakMemory"] = peakMemory
+        results.append(result)
+
+    return {"module"        : os.path.basename(modulePath),
+            "modifyAllowed" : modifyAllowed,
+            "cacheLookups"  : cacheLookups,
+            "results"       : results,
+            "exponents"     : {metric : ScalingExponent(results, metric)
+                               for metric in METRICS}}
+
+#----------------------------------------------------------------
+
+def ScalingExponent(results, metric):
+    """
+    Fit value = c * size ** k to the results by least squares on the
+    log-log values, and return k (rounded), or None if there aren't
+    two sizes with measurable values.
+    """
+    points = [(math.log(r["size"]), math.log(r[metric]))
+              for r in results
+              if not r.get("failed")
+                 and r.get(metric) and r[metric] >= NOISE_FLOOR[metric]]
+    if len(points) < 2:
+        return None
+    meanX = sum(x for x, y in points) / len(points)
+    meanY = sum(y for x, y in points) / len(points)
+    sxx = sum((x - meanX) ** 2 for x, y in points)
+    if not sxx:
+        return None
+    sxy = sum((x - meanX) * (y - meanY) for x, y in points)
+    return round(sxy / sxx, 2)
+
+
+def SuperLinear(benchmark, threshold=SUPERLINEAR_EXPONENT,
+                metrics=("seconds", "peakMemory")):
+    """
+    Returns a list of (metric, exponent) for the metrics of a Module's
+    benchmark that scale worse than linearly. (The number of messages
+    depends on the data, so isn't checked by default.)
+    """
+    return [(metric, benchmark["exponents"][metric]) for metric in metrics
+            if (benchmark["exponents"][metric] or 0) > threshold]
+
+#----------------------------------------------------------------
+
+def RunBenchmarks(modulePaths, sizes=DEFAULT_SIZES, modifyAllowed=False,
+                  seed=0, measureMemory=True, cacheLookups=False):
+    """
+    Benchmark each Module, running them in a temporary folder. Returns
+    the results as a dictionary that can be saved with SaveResults().
+    """
+    benchmarks = {}
+    failed = []                 # Modules that couldn't be imported
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="flextools-benchmark-") as folder:
+        os.chdir(folder)
+        try:
+            for path in modulePaths:
+                benchmark = BenchmarkModule(os.path.join(cwd, path), sizes,
+                                            modifyAllowed, seed, measureMemory,
+                                            cacheLookups)
+                if benchmark:
+                    benchmarks[benchmark["module"]] = benchmark
+                else:
+                    failed.append(path)
+        finally:
+            os.chdir(cwd)
+
+    return {"created"      : datetime.now().isoformat(timespec="seconds"),
+            "flextoolslib" : version,
+            "python"       : sys.version.split()[0],
+            "platform"     : platform.platform(),
+            "sizes"        : list(sizes),
+            "seed"         : seed,
+            "modules"      : benchmarks,
+            "failed"       : failed}
+
+
+def SaveResults(results, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+
+def LoadResults(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+#----------------------------------------------------------------
+
+def CompareResults(results, baseline, tolerance=0.25):
+    """
+    Compare results with a baseline (both from RunBenchmarks()).
+    Returns a list of regressions as tuples of:
+        (module, size, metric, baseline value, new value)
+    Times and memory are regressions if they have grown by more than
+    tolerance (a fraction); the number of messages if it has changed at
+    all (if the projects were generated with the same seed). Values
+    below the noise floor are ignored.
+    """
+    sameData = results.get("seed") == baseline.get("seed")
+    regressions = []
+    for name, benchmark in results["modules"].items():
+        try:
+            baseResults = {r["size"] : r
+                           for r in baseline["modules"][name]["results"]}
+        except KeyError:
+            continue
+        for result in benchmark["results"]:
+            base = baseResults.get(result["size"])
+            if not base or base.get("failed") or result["failed"]:
+                continue
+            for metric in METRICS:
+                old, new = base.get(metric), result.get(metric)
+                if old is None or new is None:
+                    continue
+                if max(old, new) < NOISE_FLOOR[metric]:
+                    continue
+                if metric == "messages":
+                    regressed = sameData and new != old
+                else:
+                    regressed = new > old * (1 + tolerance)
+                if regressed:
+                    regressions.append((name, result["size"], metric, old, new))
+    return regressions
@@ -0,0 +1,101 @@
+#
+#   FakeLCM
+#
+#   Stand-ins for the names that the bundled Modules import from the
+#   FieldWorks LCM assemblies (SIL.LCModel, etc.), so that the Modules
+#   can be imported and run against a FakeProject where FieldWorks
+#   isn't installed.
+#
+#   InstallFakeLCM() only installs these if the real SIL.LCModel can't
+#   be imported.
+#
+
+import enum
+import sys
+import types
+import uuid
+
+import logging
+logger = logging.getLogger(__name__)
+
+#----------------------------------------------------------------
+# SIL.LCModel
+
+class MoMorphTypeTags(object):
+    kguidMorphStem               = uuid.UUID("d7f713e8-e8cf-11d3-9764-00c04f186933")
+    kguidMorphRoot               = uuid.UUID("d7f713e5-e8cf-11d3-9764-00c04f186933")
+    kguidMorphPrefix             = uuid.UUID("d7f713db-e8cf-11d3-9764-00c04f186933")
+    kguidMorphSuffix             = uuid.UUID("d7f713dd-e8cf-11d3-9764-00c04f186933")
+    kguidMorphPhrase             = uuid.UUID("a23b6faa-1052-4f4d-984b-4b338bdaf95f")
+    kguidMorphDiscontiguousPhrase = uuid.UUID("0cc8c35a-cee9-434d-be58-5d29130fba5b")
+
+class SpellingStatusStates(enum.IntEnum):
+    undecided = 0
+    correct   = 1
+    incorrect = 2
+
+# Repository interfaces are only used as arguments to ObjectsIn(),
+# which the FakeProject matches by name.
+class ILexEntryRepository(object): pass
+class ILexSenseRepository(object): pass
+class ISegmentRepository(object): pass
+class IWfiWordformRepository(object): pass
+class IReversalIndexEntryRepository(object): pass
+
+#----------------------------------------------------------------
+# SIL.LCModel.Core.*
+
+class ITsString(object):
+    # Casting a string with ITsString(s).Text
+    def __init__(self, s):
+        self.Text = None if s is None else str(s)
+
+class ITsStrBldr(object): pass
+
+class TsStringUtils(object):
+    @staticmethod
+    def MakeString(text, ws):
+        return text
+
+class CellarPropertyType(object): pass      # Only imported
+
+#----------------------------------------------------------------
+
+__NAMESPACES = {
+    "SIL"                              : [],
+    "SIL.LCModel"                      : [MoMorphTypeTags,
+                                          SpellingStatusStates,
+                                          ILexEntryRepository,
+                                          ILexSenseRepository,
+                                          ISegmentRepository,
+                                          IWfiWordformRepository,
+                                          IReversalIndexEntryRepository],
+    "SIL.LCModel.Core"                 : [],
+    "SIL.LCModel.Core.KernelInterfaces": [ITsString, ITsStrBldr],
+    "SIL.LCModel.Core.Text"            : [TsStringUtils],
+    "SIL.LCModel.Core.Cellar"          : [CellarPropertyType],
+    }
+
+def InstallFakeLCM():
+    """
+    Make the stand-in LCM names importable, unless the real LCM
+    assemblies are available. Returns True if they were installed.
+    """
+    try:
+        import SIL.LCModel
+        return False
+    except ImportError:
+        pass
+
+    logger.info("FieldWorks LCM not available: installing FakeLCM")
+    for name, contents in __NAMESPACES.items():
+        module = types.ModuleType(name)
+        module.__path__ = []            # Allows sub-modules
+        for item in contents:
+            setattr(module, item.__name__, item)
+        module.__all__ = [item.__name__ for item in contents]
+        sys.modules[name] = module
+        parent, dot, child = name.rpartition(".")
+        if parent:
+            setattr(sys.modules[parent], child, module)
+    return True
@@ -0,0 +1,1035 @@
+#
+#   FakeProject
+#
+#   An in-memory stand-in for flexlibs.FLExProject, so that Modules can
+#   be run, profiled and benchmarked without FieldWorks (e.g. on a Linux
+#   build server).
+#
+#   FakeProject implements the FLExProject methods that the bundled
+#   Modules use, and the fake LCM objects have the attributes that they
+#   read (SensesOS, LexemeFormOA, MorphTypeRA, AnalysesRS, etc.) LCM
+#   collections are Python lists (or tuples), with a Count property.
+#   Strings in the default writing systems are held on the objects;
+#   strings in other writing systems are held by the project.
+#
+#   GenerateProject() builds a project with a synthetic lexicon, reversal
+#   index and text corpus. The same arguments always build the same
+#   project.
+#
+#   Modules import names from SIL.LCModel, etc.; call InstallFakeLCM()
+#   (from FakeLCM.py) before importing them.
+#
+#   Usage:
+#       project = GenerateProject(100000)
+#       project.OpenProject("Synthetic", writeEnabled=True)
+#       module.Run(project, report, modifyAllowed=True)
+#
+
+import itertools
+import random
+import uuid
+from datetime import datetime
+
+from .FakeLCM import MoMorphTypeTags, SpellingStatusStates
+
+#----------------------------------------------------------------
+
+class FakeProjectError(Exception):
+    """
+    Exception raised for invalid calls to a FakeProject.
+
+    Attributes:
+        message -- explanation of the error
+    """
+
+    def __init__(self, message):
+        self.message = message
+
+#----------------------------------------------------------------
+# LCM collections
+
+class _Sequence(list):
+    # An owning or reference sequence (...OS, ...OC, ...RS)
+    __slots__ = ()
+    @property
+    def Count(self):
+        return len(self)
+
+class _Fixed(tuple):
+    # A collection that is shared between objects, and so is never
+    # changed in place.
+    __slots__ = ()
+    @property
+    def Count(self):
+        return len(self)
+
+EMPTY = _Fixed()
+
+#----------------------------------------------------------------
+# LCM objects
+
+_NextHvo = itertools.count(5000).__next__
+
+# Guids are derived from the Hvo when they are needed.
+_GUID_BASE = uuid.UUID("f1e70000-0000-4000-8000-000000000000").int
+
+class FakeObject(object):
+    __slots__ = ("Hvo", "Owner")
+    ClassName = "CmObject"
+
+    def __init__(self, owner=None):
+        self.Hvo = _NextHvo()
+        self.Owner = owner
+
+    @property
+    def Guid(self):
+        return uuid.UUID(int=_GUID_BASE + self.Hvo)
+
+    def __repr__(self):
+        return f"<{self.ClassName} {self.Hvo}>"
+
+
+class FakeMultiString(object):
+    # For the few places where Modules use the MultiString directly.
+    __slots__ = ("text",)
+
+    def __init__(self, text):
+        self.text = text
+
+    @property
+    def BestVernacularAlternative(self):
+        return self.text
+    BestAnalysisAlternative = BestVernacularAlternative
+    BestAnalysisVernacularAlternative = BestVernacularAlternative
+    BestVernacularAnalysisAlternative = BestVernacularAlternative
+
+    def __str__(self):
+        return self.text
+
+
+class FakePossibility(FakeObject):
+    __slots__ = ("Name", "Abbreviation")
+    ClassName = "CmPossibility"
+
+    def __init__(self, name, abbreviation=None, owner=None):
+        super().__init__(owner)
+        self.Name = name
+        self.Abbreviation = abbreviation or name
+
+    def ToString(self):
+        return self.Name
+
+    def __str__(self):
+        return self.Name
+
+
+class FakeMorphType(FakePossibility):
+    __slots__ = ("IsAffixType", "_guid")
+    ClassName = "MoMorphType"
+
+    def __init__(self, name, guid, isAffix):
+        super().__init__(name)
+        self._guid = guid
+        self.IsAffixType = isAffix
+
+    @property
+    def Guid(self):
+        return self._guid
+
+
+class FakeMSA(FakeObject):
+    __slots__ = ("PartOfSpeechRA",)
+    ClassName = "MoStemMsa"
+
+    def __init__(self, pos):
+        super().__init__()
+        self.PartOfSpeechRA = pos
+
+    @property
+    def ShortName(self):
+        return self.PartOfSpeechRA.Name if self.PartOfSpeechRA else ""
+
+    @property
+    def InterlinearAbbr(self):
+        return self.PartOfSpeechRA.Abbreviation if self.PartOfSpeechRA else ""
+    InterlinearName = InterlinearAbbr
+
+
+class FakeMoForm(FakeObject):
+    __slots__ = ("form", "MorphTypeRA")
+    ClassName = "MoStemAllomorph"
+
+    def __init__(self, owner, form, morphType):
+        super().__init__(owner)
+        self.form = form
+        self.MorphTypeRA = morphType
+
+
+class FakeExample(FakeObject):
+    __slots__ = ("example",)
+    ClassName = "LexExampleSentence"
+
+    def __init__(self, owner, example):
+        super().__init__(owner)
+        self.example = example
+
+
+class FakeSense(FakeObject):
+    __slots__ = ("gloss", "definition", "MorphoSyntaxAnalysisRA",
+                 "ExamplesOS", "SensesOS", "SemanticDomainsRC",
+                 "analysesCount")
+    ClassName = "LexSense"
+
+    def __init__(self, owner, gloss, definition="", msa=None):
+        super().__init__(owner)
+        self.gloss = gloss
+        self.definition = definition
+        self.MorphoSyntaxAnalysisRA = msa
+        self.ExamplesOS = EMPTY
+        self.SensesOS = EMPTY
+        self.SemanticDomainsRC = EMPTY
+        self.analysesCount = 0
+
+    @property
+    def Entry(self):
+        owner = self.Owner
+        while isinstance(owner, FakeSense):
+            owner = owner.Owner
+        return owner
+
+    @property
+    def ShortName(self):
+        return self.gloss or self.definition
+
+    def MergeObject(self, source, append):
+        if append and source.gloss and source.gloss != self.gloss:
+            self.gloss = "; ".join(filter(None, (self.gloss, source.gloss)))
+        if append and source.definition and source.definition != self.definition:
+            self.definition = "; ".join(filter(None, (self.definition,
+                                                      source.definition)))
+        if source.ExamplesOS:
+            self.ExamplesOS = _Sequence(self.ExamplesOS)
+            for example in source.ExamplesOS:
+                example.Owner = self
+                self.ExamplesOS.append(example)
+        self.analysesCount += source.analysesCount
+        source.Owner.SensesOS.remove(source)
+
+
+class FakeEntry(FakeObject):
+    __slots__ = ("LexemeFormOA", "citationForm", "HomographNumber",
+                 "SensesOS", "MorphoSyntaxAnalysesOC", "EntryRefsOS",
+                 "PublishIn", "analysesCount")
+    ClassName = "LexEntry"
+
+    def __init__(self, owner, form, morphType, msas):
+        super().__init__(owner)
+        self.LexemeFormOA = FakeMoForm(self, form, morphType)
+        self.citationForm = ""
+        self.HomographNumber = 0
+        self.SensesOS = _Sequence()
+        self.MorphoSyntaxAnalysesOC = msas
+        self.EntryRefsOS = EMPTY
+        self.PublishIn = EMPTY
+        self.analysesCount = 0
+
+    @property
+    def HomographForm(self):
+        return self.citationForm or self.LexemeFormOA.form
+
+    @property
+    def HeadWord(self):
+        if self.HomographNumber:
+            return FakeMultiString(f"{self.HomographForm}{self.HomographNumber}")
+        return FakeMultiString(self.HomographForm)
+
+    @property
+    def AllSenses(self):
+        def __Senses(senses):
+            for sense in senses:
+                yield sense
+                yield from __Senses(sense.SensesOS)
+        return list(__Senses(self.SensesOS))
+
+    def MergeObject(self, source, append):
+        for sense in list(source.SensesOS):
+            sense.Owner = self
+            self.SensesOS.append(sense)
+        source.SensesOS = _Sequence()
+        self.analysesCount += source.analysesCount
+        source.Delete()
+
+    def Delete(self):
+        self.Owner.Remove(self)
+
+
+class FakeReversalEntry(FakeObject):
+    __slots__ = ("form", "SensesRS")
+    ClassName = "ReversalIndexEntry"
+
+    def __init__(self, owner, form, senses):
+        super().__init__(owner)
+        self.form = form
+        self.SensesRS = senses
+
+
+class FakeReversalIndex(FakeObject):
+    __slots__ = ("WritingSystem", "EntriesOC")
+    ClassName = "ReversalIndex"
+
+    def __init__(self, writingSystem):
+        super().__init__()
+        self.WritingSystem = writingSystem
+        self.EntriesOC = _Sequence()
+
+    @property
+    def AllEntries(self):
+        return self.EntriesOC
+
+    @property
+    def ShortName(self):
+        return self.WritingSystem
+
+
+class FakeWfiMorphBundle(FakeObject):
+    __slots__ = ("MorphRA", "SenseRA")
+    ClassName = "WfiMorphBundle"
+
+    def __init__(self, owner, morph, sense):
+        super().__init__(owner)
+        self.MorphRA = morph
+        self.SenseRA = sense
+
+
+class FakeWfiAnalysis(FakeObject):
+    __slots__ = ("MorphBundlesOS",)
+    ClassName = "WfiAnalysis"
+
+    def __init__(self, owner):
+        super().__init__(owner)
+        self.MorphBundlesOS = _Sequence()
+
+    @property
+    def Analysis(self):
+        return self
+
+    @property
+    def ShortNameTSS(self):
+        return self.Owner.Form.text
+
+
+class FakeWfiWordform(FakeObject):
+    __slots__ = ("Form", "SpellingStatus", "AnalysesOC")
+    ClassName = "WfiWordform"
+
+    def __init__(self, form):
+        super().__init__()
+        self.Form = FakeMultiString(form)
+        self.SpellingStatus = int(SpellingStatusStates.undecided)
+        self.AnalysesOC = _Sequence()
+
+    @property
+    def Analysis(self):
+        # Segments refer to the wordform when it hasn't been analysed.
+        return None
+
+
+class FakeSegment(FakeObject):
+    __slots__ = ("AnalysesRS",)
+    ClassName = "Segment"
+
+    def __init__(self, owner, analyses):
+        super().__init__(owner)
+        self.AnalysesRS = analyses
+
+
+class FakeText(FakeObject):
+    __slots__ = ("Name", "paragraphs")
+    ClassName = "Text"
+
+    def __init__(self, name, paragraphs):
+        super().__init__()
+        self.Name = name
+        self.paragraphs = paragraphs
+
+
+class FakeLangProject(FakeObject):
+    __slots__ = ("DateCreated", "DateModified")
+    ClassName = "LangProject"
+
+    def __init__(self):
+        super().__init__()
+        self.DateCreated = self.DateModified = datetime(2020, 1, 1)
+
+
+class _Lexicon(object):
+    # The owner of the entries.
+    def __init__(self):
+        self.entries = []
+
+    def Remove(self, entry):
+        self.entries.remove(entry)
+
+#----------------------------------------------------------------
+
+# Tools for BuildGotoURL()
+_TOOLS = {
+    "ReversalIndexEntry" : "reversalToolEditComplete",
+    "WfiWordform"        : "Analyses",
+    "WfiAnalysis"        : "Analyses",
+    "WfiGloss"           : "Analyses",
+    "Text"               : "interlinearEdit",
+    }
+
+# Classes for each repository interface name (see ObjectsIn())
+_REPOSITORIES = {
+    "ILexEntryRepository"           : "entries",
+    "ILexSenseRepository"           : "senses",
+    "IReversalIndexEntryRepository" : "reversalEntries",
+    "ISegmentRepository"            : "segments",
+    "IWfiWordformRepository"        : "wordforms",
+    "ITextRepository"               : "texts",
+    }
+
+# Custom field types
+CF_STRING      = "String"
+CF_MULTISTRING = "MultiString"
+CF_INTEGER     = "Integer"
+
+_FIRST_CUSTOM_FLID = 5002500
+
+#----------------------------------------------------------------
+
+class FakeProject(object):
+    """
+    An in-memory project with the same interface as flexlibs.FLExProject.
+    Use GenerateProject() to create one with data.
+    """
+
+    def __init__(self, name="Synthetic",
+                 vernacularWSs=(("qaa-x-syn", "Synthetic"),),
+                 analysisWSs=(("en", "English"),)):
+        self.name = name
+        self.writeEnabled = False
+        self.isOpen = False
+        self.lp = FakeLangProject()
+        self.lexicon = _Lexicon()
+        self.reversalIndexes = []
+        self.segments = []
+        self.wordforms = []
+        self.texts = []
+        self.partsOfSpeech = []
+        self.semanticDomains = []
+        self.publications = []
+
+        # Writing systems: {language-tag : (handle, name)}
+        self.__vernacularWSs = [tag for tag, name in vernacularWSs]
+        self.__analysisWSs = [tag for tag, name in analysisWSs]
+        self.__writingSystems = {}
+        for handle, (tag, name) in enumerate(vernacularWSs + analysisWSs, 1):
+            self.__writingSystems[self.__NormaliseLangTag(tag)] = (handle, name)
+        self.__defaultVern = self.WSHandle(self.__vernacularWSs[0])
+        self.__defaultAnal = self.WSHandle(self.__analysisWSs[0])
+
+        # Strings in non-default writing systems: {(hvo, field, ws) : text}
+        self.__strings = {}
+
+        # Custom fields: {flid : (className, name, type)}
+        # and values: {(hvo, flid[, ws]) : value}
+        self.__customFields = {}
+        self.__customValues = {}
+
+    # --- FLExProject: project ---
+
+    def OpenProject(self, projectName=None, writeEnabled=False):
+        if projectName:
+            self.name = projectName
+        self.writeEnabled = writeEnabled
+        self.isOpen = True
+
+    def CloseProject(self):
+        if self.writeEnabled:
+            self.lp.DateModified = datetime.now()
+        self.isOpen = False
+
+    def ProjectName(self):
+        return self.name
+
+    @property
+    def entries(self):
+        return self.lexicon.entries
+
+    @property
+    def senses(self):
+        for entry in self.lexicon.entries:
+            yield from entry.AllSenses
+
+    @property
+    def reversalEntries(self):
+        for index in self.reversalIndexes:
+            yield from index.EntriesOC
+
+    def __CheckWriteEnabled(self, obj):
+        if not self.writeEnabled:
+            raise FakeProjectError("Project is read-only")
+        if not obj:
+            raise FakeProjectError("Null parameter")
+
+    # --- FLExProject: writing systems ---
+
+    def __NormaliseLangTag(self, languageTag):
+        return languageTag.replace("-", "_").lower()
+
+    def __WSHandle(self, languageTagOrHandle, defaultWS):
+        if languageTagOrHandle is None:
+            return defaultWS
+        if isinstance(languageTagOrHandle, str):
+            handle = self.WSHandle(languageTagOrHandle)
+        else:
+            handle = languageTagOrHandle
+        if not handle:
+            raise FakeProjectError(f"Invalid writing system: {languageTagOrHandle}")
+        return handle
+
+    def GetAllVernacularWSs(self):
+        return set(self.__vernacularWSs)
+
+    def GetAllAnalysisWSs(self):
+        return set(self.__analysisWSs)
+
+    def GetWritingSystems(self):
+        return [(self.WSUIName(tag), tag, self.WSHandle(tag),
+                 tag in self.__vernacularWSs)
+                for tag in self.__vernacularWSs + self.__analysisWSs]
+
+    def WSUIName(self, languageTagOrHandle):
+        if isinstance(languageTagOrHandle, str):
+            ws = self.__writingSystems.get(self.__NormaliseLangTag(languageTagOrHandle))
+            return ws[1] if ws else None
+        for handle, name in self.__writingSystems.values():
+            if handle == languageTagOrHandle:
+                return name
+        return None
+
+    def WSHandle(self, languageTag):
+        ws = self.__writingSystems.get(self.__NormaliseLangTag(languageTag))
+        return ws[0] if ws else None
+
+    def GetDefaultVernacularWS(self):
+        tag = self.__vernacularWSs[0]
+        return (tag, self.WSUIName(tag))
+
+    def GetDefaultAnalysisWS(self):
+        tag = self.__analysisWSs[0]
+        return (tag, self.WSUIName(tag))
+
+    # Strings in the default WS are held by the object, others by
+    # the project.
+    def __GetString(self, obj, attribute, ws, defaultWS):
+        if ws == defaultWS:
+            return getattr(obj, attribute) or ""
+        return self.__strings.get((obj.Hvo, attribute, ws), "")
+
+    def __SetString(self, obj, attribute, ws, defaultWS, text):
+        if ws == defaultWS:
+            setattr(obj, attribute, text or "")
+        elif text:
+            self.__strings[(obj.Hvo, attribute, ws)] = text
+        else:
+            self.__strings.pop((obj.Hvo, attribute, ws), None)
+
+    # --- FLExProject: other global information ---
+
+    def BestStr(self, stringObj):
+        s = str(stringObj) if stringObj is not None else ""
+        return "" if s == "***" else s
+
+    def GetDateLastModified(self):
+        return self.lp.DateModified
+
+    def GetPartsOfSpeech(self):
+        return [pos.Name for pos in self.partsOfSpeech]
+
+    def GetAllSemanticDomains(self, flat=False):
+        return list(self.semanticDomains)
+
+    def BuildGotoURL(self, objectOrGuid):
+        try:
+            guid = objectOrGuid.Guid
+            tool = _TOOLS.get(objectOrGuid.ClassName, "lexiconEdit")
+        except AttributeError:
+            guid = objectOrGuid
+            tool = "lexiconEdit"
+        return (f"silfw://localhost/link?database={self.name}"
+                f"&tool={tool}&guid={guid}")
+
+    def ObjectsIn(self, repository):
+        try:
+            attribute = _REPOSITORIES[repository.__name__]
+        except KeyError:
+            raise FakeProjectError(f"ObjectsIn: {repository.__name__} isn't supported")
+        return iter(getattr(self, attribute))
+
+    def ObjectCountFor(self, repository):
+        return sum(1 for _ in self.ObjectsIn(repository))
+
+    # --- FLExProject: lexicon ---
+
+    def LexiconNumberOfEntries(self):
+        return len(self.lexicon.entries)
+
+    def LexiconAllEntries(self):
+        return iter(self.lexicon.entries)
+
+    def LexiconGetHeadword(self, entry):
+        return entry.HeadWord.text
+
+    def LexiconGetLexemeForm(self, entry, languageTagOrHandle=None):
+        ws = self.__WSHandle(languageTagOrHandle, self.__defaultVern)
+        if not entry.LexemeFormOA:
+            return ""
+        return self.__GetString(entry.LexemeFormOA, "form", ws, self.__defaultVern)
+
+    def LexiconSetLexemeForm(self, entry, form, languageTagOrHandle=None):
+        self.__CheckWriteEnabled(entry)
+        ws = self.__WSHandle(languageTagOrHandle, self.__defaultVern)
+        self.__SetString(entry.LexemeFormOA, "form", ws, self.__defaultVern, form)
+
+    def LexiconGetCitationForm(self, entry, languageTagOrHandle=None):
+        ws = self.__WSHandle(languageTagOrHandle, self.__defaultVern)
+        return self.__GetString(entry, "citationForm", ws, self.__defaultVern)
+
+    def LexiconGetPublishInCount(self, entry):
+        return entry.PublishIn.Count
+
+    def LexiconGetExample(self, example, languageTagOrHandle=None):
+        ws = self.__WSHandle(languageTagOrHandle, self.__defaultVern)
+        return self.__GetString(example, "example", ws, self.__defaultVern)
+
+    def LexiconSetExample(self, example, newString, languageTagOrHandle=None):
+        self.__CheckWriteEnabled(example)
+        ws = self.__WSHandle(languageTagOrHandle, self.__defaultVern)
+        self.__SetString(example, "example", ws, self.__defaultVern, newString)
+
+    def LexiconGetSenseNumber(self, sense):
+        number = str(sense.Owner.SensesOS.index(sense) + 1)
+        if isinstance(sense.Owner, FakeSense):
+            return f"{self.LexiconGetSenseNumber(sense.Owner)}.{number}"
+        return number
+
+    def LexiconGetSenseGloss(self, sense, languageTagOrHandle=None):
+        ws = self.__WSHandle(languageTagOrHandle, self.__defaultAnal)
+        return self.__GetString(sense, "gloss", ws, self.__defaultAnal)
+
+    def LexiconSetSenseGloss(self, sense, gloss, languageTagOrHandle=None):
+        self.__CheckWriteEnabled(sense)
+        ws = self.__WSHandle(languageTagOrHandle, self.__defaultAnal)
+        self.__SetString(sense, "gloss", ws, self.__defaultAnal, gloss)
+
+    def LexiconGetSenseDefinition(self, sense, languageTagOrHandle=None):
+        ws = self.__WSHandle(languageTagOrHandle, self.__defaultAnal)
+        return self.__GetString(sense, "definition", ws, self.__defaultAnal)
+
+    def LexiconGetSensePOS(self, sense):
+        if sense.MorphoSyntaxAnalysisRA != None:
+            return sense.MorphoSyntaxAnalysisRA.InterlinearAbbr
+        return ""
+
+    def LexiconGetSenseSemanticDomains(self, sense):
+        return list(sense.SemanticDomainsRC)
+
+    def LexiconEntryAnalysesCount(self, entry):
+        return entry.analysesCount
+
+    def LexiconSenseAnalysesCount(self, sense):
+        return sense.analysesCount
+
+    # --- FLExProject: custom fields ---
+
+    def AddCustomField(self, className, fieldName, fieldType=CF_STRING):
+        """
+        Define a custom field for className ("LexEntry", "LexSense",
+        "LexExampleSentence" or "MoForm"). Returns the field ID.
+        (Not part of the FLExProject interface.)
+        """
+        flid = _FIRST_CUSTOM_FLID + len(self.__customFields)
+        self.__customFields[flid] = (className, fieldName, fieldType)
+        return flid
+
+    def __FieldType(self, fieldID):
+        if not fieldID:
+            raise FakeProjectError("Null field ID")
+        try:
+            return self.__customFields[fieldID][2]
+        except KeyError:
+            raise FakeProjectError(f"Unknown field ID: {fieldID}")
+
+    def __ValidatedHvo(self, senseOrEntryOrHvo, fieldID):
+        if not senseOrEntryOrHvo or not fieldID:
+            raise FakeProjectError("Null parameter")
+        return getattr(senseOrEntryOrHvo, "Hvo", senseOrEntryOrHvo)
+
+    def __CustomFieldKey(self, hvo, fieldID, languageTagOrHandle):
+        if self.__FieldType(fieldID) == CF_MULTISTRING:
+            return (hvo, fieldID,
+                    self.__WSHandle(languageTagOrHandle, self.__defaultAnal))
+        return (hvo, fieldID)
+
+    def LexiconFieldIsStringType(self, fieldID):
+        return self.__FieldType(fieldID) == CF_STRING
+
+    def LexiconFieldIsMultiType(self, fieldID):
+        return self.__FieldType(fieldID) == CF_MULTISTRING
+
+    def LexiconFieldIsAnyStringType(self, fieldID):
+        return self.__FieldType(fieldID) in (CF_STRING, CF_MULTISTRING)
+
+    def GetCustomFieldValue(self, senseOrEntryOrHvo, fieldID,
+                            languageTagOrHandle=None):
+        hvo = self.__ValidatedHvo(senseOrEntryOrHvo, fieldID)
+        key = self.__CustomFieldKey(hvo, fieldID, languageTagOrHandle)
+        default = 0 if self.__FieldType(fieldID) == CF_INTEGER else ""
+        return self.__customValues.get(key, default)
+
+    def LexiconGetFieldText(self, senseOrEntryOrHvo, fieldID,
+                            languageTagOrHandle=None):
+        value = self.GetCustomFieldValue(senseOrEntryOrHvo, fieldID,
+                                         languageTagOrHandle)
+        return value if isinstance(value, str) and value != "***" else ""
+
+    def LexiconSetFieldText(self, senseOrEntryOrHvo, fieldID, text,
+                            languageTagOrHandle=None):
+        self.__CheckWriteEnabled(senseOrEntryOrHvo)
+        if not self.LexiconFieldIsAnyStringType(fieldID):
+            raise FakeProjectError("LexiconSetFieldText: field is not a supported type")
+        hvo = self.__ValidatedHvo(senseOrEntryOrHvo, fieldID)
+        key = self.__CustomFieldKey(hvo, fieldID, languageTagOrHandle)
+        if text:
+            self.__customValues[key] = text
+        else:
+            self.__customValues.pop(key, None)
+
+    def LexiconClearField(self, senseOrEntryOrHvo, fieldID):
+        self.__CheckWriteEnabled(senseOrEntryOrHvo)
+        if not self.LexiconFieldIsAnyStringType(fieldID):
+            raise FakeProjectError("LexiconClearField: field is not a supported type")
+        hvo = self.__ValidatedHvo(senseOrEntryOrHvo, fieldID)
+        for key in [k for k in self.__customValues if k[:2] == (hvo, fieldID)]:
+            del self.__customValues[key]
+
+    def LexiconSetFieldInteger(self, senseOrEntryOrHvo, fieldID, integer):
+        self.__CheckWriteEnabled(senseOrEntryOrHvo)
+        if self.__FieldType(fieldID) != CF_INTEGER:
+            raise FakeProjectError("LexiconSetFieldInteger: field is not Integer type")
+        hvo = self.__ValidatedHvo(senseOrEntryOrHvo, fieldID)
+        self.__customValues[(hvo, fieldID)] = integer
+
+    def LexiconAddTagToField(self, senseOrEntryOrHvo, fieldID, tag):
+        s = self.LexiconGetFieldText(senseOrEntryOrHvo, fieldID)
+        if s:
+            if tag in s: return
+            newText = "; ".join((s, tag))
+        else:
+            newText = tag
+        self.LexiconSetFieldText(senseOrEntryOrHvo, fieldID, newText)
+
+    def __CustomFieldsOf(self, className):
+        return [(flid, name) for flid, (cls, name, fieldType)
+                in self.__customFields.items() if cls == className]
+
+    def __FindCustomField(self, className, fieldName):
+        for flid, name in self.__CustomFieldsOf(className):
+            if name == fieldName:
+                return flid
+        return None
+
+    def LexiconGetEntryCustomFields(self):
+        return self.__CustomFieldsOf("LexEntry")
+
+    def LexiconGetSenseCustomFields(self):
+        return self.__CustomFieldsOf("LexSense")
+
+    def LexiconGetExampleCustomFields(self):
+        return self.__CustomFieldsOf("LexExampleSentence")
+
+    def LexiconGetAllomorphCustomFields(self):
+        return self.__CustomFieldsOf("MoForm")
+
+    def LexiconGetEntryCustomFieldNamed(self, fieldName):
+        return self.__FindCustomField("LexEntry", fieldName)
+
+    def LexiconGetSenseCustomFieldNamed(self, fieldName):
+        return self.__FindCustomField("LexSense", fieldName)
+
+    # --- FLExProject: publications ---
+
+    def GetPublications(self):
+        return [pub.Name for pub in self.publications]
+
+    def PublicationType(self, publicationName):
+        for pub in self.publications:
+            if pub.Name == publicationName:
+                return pub
+        return None
+
+    # --- FLExProject: reversal indexes ---
+
+    def ReversalIndex(self, languageTag):
+        languageTag = self.__NormaliseLangTag(languageTag)
+        for ri in self.reversalIndexes:
+            if self.__NormaliseLangTag(ri.WritingSystem) == languageTag:
+                return ri
+        return None
+
+    def ReversalEntries(self, languageTag):
+        ri = self.ReversalIndex(languageTag)
+        return iter(ri.EntriesOC) if ri else None
+
+    def __ReversalWS(self, entry, languageTagOrHandle):
+        # The form in the index's own writing system is held by the entry.
+        indexWS = self.WSHandle(entry.Owner.WritingSystem)
+        return (self.__WSHandle(languageTagOrHandle, self.__defaultAnal),
+                indexWS)
+
+    def ReversalGetForm(self, entry, languageTagOrHandle=None):
+        ws, indexWS = self.__ReversalWS(entry, languageTagOrHandle)
+        return self.__GetString(entry, "form", ws, indexWS)
+
+    def ReversalSetForm(self, entry, form, languageTagOrHandle=None):
+        self.__CheckWriteEnabled(entry)
+        ws, indexWS = self.__ReversalWS(entry, languageTagOrHandle)
+        self.__SetString(entry, "form", ws, indexWS, form)
+
+    # --- FLExProject: texts ---
+
+    def TextsNumberOfTexts(self):
+        return len(self.texts)
+
+    def TextsGetAll(self, supplyName=True, supplyText=True):
+        for text in self.texts:
+            content = "\n".join(text.paragraphs)
+            if not supplyText:
+                yield text.Name
+            elif not supplyName:
+                yield content
+            else:
+                yield (text.Name, content)
+
+#----------------------------------------------------------------
+# Synthetic data
+
+_ONSETS = ("", "b", "d", "g", "k", "l", "m", "n", "p", "r", "s", "t",
+           "w", "y", "ch", "sh", "ng", "kw")
+_NUCLEI = ("a", "e", "i", "o", "u", "aa", "ii", "uu", "ai", "au")
+_CODAS  = ("", "", "", "n", "m", "k", "s", "ng")
+
+_GLOSSES = ("go", "come", "eat", "drink", "see", "hear", "sleep", "sit",
+            "stand", "give", "take", "say", "water", "fire", "tree",
+            "stone", "house", "dog", "bird", "fish", "man", "woman",
+            "child", "mother", "father", "sun", "moon", "rain", "road",
+            "big", "small", "good", "bad", "new", "old", "red", "black",
+            "white", "one", "two", "three", "hand", "foot", "head", "eye",
+            "mouth", "name", "day", "night", "village")
+
+_POS = (("Noun", "n"), ("Verb", "v"), ("Adjective", "adj"),
+        ("Adverb", "adv"), ("Particle", "prt"))
+
+_SEMANTIC_DOMAINS = ("1 Universe, creation", "2 Person", "3 Language and thought",
+                     "4 Social behavior", "5 Daily life", "6 Work and occupation",
+                     "7 Physical actions", "8 States", "9 Grammar")
+
+
+def GenerateProject(numEntries,
+                    name="Synthetic",
+                    vernacularWSs=(("qaa-x-syn", "Synthetic"),),
+                    analysisWSs=(("en", "English"),),
+                    maxSenses=3,
+                    homographRate=0.05,
+                    affixRate=0.08,
+                    phraseRate=0.02,
+                    variantRate=0.02,
+                    definitionRate=0.6,
+                    exampleRate=0.3,
+                    reversalRate=0.8,
+                    publishRate=0.9,
+                    numSegments=None,
+                    maxWordsPerSegment=12,
+                    incompleteRate=0.03,
+                    numTexts=None,
+                    seed=0):
+    """
+    Build a FakeProject with a synthetic lexicon of numEntries entries,
+    with:
+      - 1 to maxSenses senses per entry, some with sub-senses, and
+        definitions and examples for a proportion of them. Some
+        definitions are repeated within an entry.
+      - Groups of homographs (homographRate is the proportion of entries
+        that are in a group), affixes, phrases and variants.
+      - A reversal index for each analysis writing system. (The forms
+        are the same in each.)
+      - A text corpus of numSegments segments (default numEntries // 2),
+        made up of analysed and unanalysed wordforms. incompleteRate of
+        the analyses have a missing morph or sense. The entries' and
+        senses' analyses counts match the corpus.
+      - numTexts texts (default numEntries // 1000, at least 1).
+      - Entry-level "FTFlags" (String) and "Entry Frequency" (Integer),
+        and sense-level "Sense Frequency" (Integer) custom fields.
+    """
+    rng = random.Random(seed)
+    project = FakeProject(name, vernacularWSs, analysisWSs)
+
+    # --- Lists ---
+
+    project.partsOfSpeech = [FakePossibility(n, a) for n, a in _POS]
+    msaLists = [_Fixed([FakeMSA(pos)]) for pos in project.partsOfSpeech]
+    project.semanticDomains = [FakePossibility(sd) for sd in _SEMANTIC_DOMAINS]
+    project.publications = [FakePossibility("Main Dictionary"),
+                            FakePossibility("Learners Dictionary")]
+    publishIn = (_Fixed(project.publications[:1]),
+                 _Fixed(project.publications))
+
+    stem   = FakeMorphType("stem", MoMorphTypeTags.kguidMorphStem, False)
+    prefix = FakeMorphType("prefix", MoMorphTypeTags.kguidMorphPrefix, True)
+    suffix = FakeMorphType("suffix", MoMorphTypeTags.kguidMorphSuffix, True)
+    phrase = FakeMorphType("phrase", MoMorphTypeTags.kguidMorphPhrase, False)
+    variantRef = _Fixed([FakeObject()])     # A LexEntryRef
+
+    project.AddCustomField("LexEntry", "FTFlags", CF_STRING)
+    project.AddCustomField("LexEntry", "Entry Frequency", CF_INTEGER)
+    project.AddCustomField("LexSense", "Sense Frequency", CF_INTEGER)
+
+    # --- Lexicon ---
+
+    def __Word(syllables):
+        return "".join(rng.choice(_ONSETS) + rng.choice(_NUCLEI) + rng.choice(_CODAS)
+                       for _ in range(syllables))
+
+    def __Sense(owner, msa):
+        gloss = " ".join(rng.sample(_GLOSSES, rng.choice((1, 1, 1, 2))))
+        definition = f"to {gloss}" if rng.random() < definitionRate else ""
+        return FakeSense(owner, gloss, definition, msa)
+
+    lexicon = project.entries
+    forms = set()
+    allSenses = []
+    homographs = {}
+
+    while len(lexicon) < numEntries:
+        r = rng.random()
+        if r < affixRate:
+            morphType = rng.choice((prefix, suffix))
+            form = __Word(1)
+        elif r < affixRate + phraseRate:
+            morphType = phrase
+            form = __Word(2) + " " + __Word(rng.randint(1, 3))
+        else:
+            morphType = stem
+            form = __Word(rng.randint(1, 4))
+        # Avoid accidental homographs, which would become more frequent
+        # as the size increases.
+        while form in forms:
+            form += __Word(1)
+        forms.add(form)
+
+        # Homographs: repeat a form several times.
+        copies = rng.randint(2, 4) if rng.random() < homographRate / 3 else 1
+        for _ in range(min(copies, numEntries - len(lexicon))):
+            entry = FakeEntry(project.lexicon, form, morphType,
+                              rng.choice(msaLists))
+            msa = entry.MorphoSyntaxAnalysesOC[0]
+            for _ in range(rng.randint(1, maxSenses)):
+                sense = __Sense(entry, msa)
+                entry.SensesOS.append(sense)
+                allSenses.append(sense)
+                if rng.random() < 0.05:
+                    sense.SensesOS = _Sequence([__Sense(sense, msa)])
+                    allSenses.extend(sense.SensesOS)
+                if rng.random() < exampleRate:
+                    sense.ExamplesOS = _Sequence(
+                        [FakeExample(sense, f"{form} {__Word(2)} {__Word(1)}.")])
+                sense.SemanticDomainsRC = _Fixed([rng.choice(project.semanticDomains)])
+            if len(entry.SensesOS) > 1 and rng.random() < 0.1:
+                # A repeated definition
+                entry.SensesOS[1].definition = entry.SensesOS[0].definition
+            if rng.random() < variantRate:
+                entry.EntryRefsOS = variantRef
+            r = rng.random()
+            if r < publishRate:
+                entry.PublishIn = publishIn[r < publishRate / 3]
+            lexicon.append(entry)
+            homographs.setdefault((form, morphType.IsAffixType), []).append(entry)
+
+    for group in homographs.values():
+        if len(group) > 1:
+            for number, entry in enumerate(group, 1):
+                entry.HomographNumber = number
+
+    # --- Reversal index ---
+
+    reversals = {}
+    for sense in allSenses:
+        if rng.random() < reversalRate:
+            reversals.setdefault(sense.gloss, []).append(sense)
+    for languageTag, wsName in analysisWSs:
+        index = FakeReversalIndex(languageTag)
+        project.reversalIndexes.append(index)
+        for form in sorted(reversals):
+            index.EntriesOC.append(FakeReversalEntry(index, form,
+                                                     _Fixed(reversals[form])))
+
+    # --- Corpus ---
+
+    # A pool of wordforms that the segments are made from. Each analysed
+    # wordform has one analysis of one or two morphs.
+    stems = [e for e in lexicon if not e.LexemeFormOA.MorphTypeRA.IsAffixType
+             and e.LexemeFormOA.MorphTypeRA is not phrase]
+    affixes = [e for e in lexicon if e.LexemeFormOA.MorphTypeRA.IsAffixType]
+    wordforms = project.wordforms
+    numWordforms = max(1, min(len(stems), 50000))
+    for stemEntry in rng.sample(stems, numWordforms) if stems else []:
+        bundles = [stemEntry]
+        if affixes and rng.random() < 0.3:
+            bundles.append(rng.choice(affixes))
+        wordform = FakeWfiWordform("".join(e.LexemeFormOA.form for e in bundles))
+        if rng.random() < 0.85:
+            analysis = FakeWfiAnalysis(wordform)
+            for i, e in enumerate(bundles):
+                sense = rng.choice(e.SensesOS)
+                if rng.random() < incompleteRate:
+                    if i == 0: sense = None
+                    else: e = None
+                analysis.MorphBundlesOS.append(
+                    FakeWfiMorphBundle(analysis, e and e.LexemeFormOA, sense))
+            wordform.AnalysesOC.append(analysis)
+        wordforms.append(wordform)
+    for number in ("7", "12", "1984", "2-3", "10-12", "2nd"):
+        wordforms.append(FakeWfiWordform(number))
+
+    # Segments refer to the analysis, or the wordform if there isn't one.
+    occurrences = [w.AnalysesOC[0] if w.AnalysesOC else w for w in wordforms]
+    # (Zipf-like frequencies. The cumulative weights are computed once,
+    # rather than for each segment by choices().)
+    cumWeights = list(itertools.accumulate(1.0 / rank for rank in
+                                           range(1, len(occurrences) + 1)))
+    if numSegments is None:
+        numSegments = numEntries // 2
+    if numTexts is None:
+        numTexts = max(1, numEntries // 1000)
+    project.texts = [FakeText(f"Text {n + 1}", []) for n in range(numTexts)]
+    for n in range(numSegments):
+        text = project.texts[n % numTexts]
+        analyses = _Sequence(rng.choices(occurrences, cum_weights=cumWeights,
+                                         k=rng.randint(1, maxWordsPerSegment)))
+        project.segments.append(FakeSegment(text, analyses))
+        text.paragraphs.append(" ".join(a.Owner.Form.text
+                                        if isinstance(a, FakeWfiAnalysis)
+                                        else a.Form.text
+                                        for a in analyses) + ".")
+        for analysis in analyses:
+            for bundle in getattr(analysis, "MorphBundlesOS", EMPTY):
+                if bundle.MorphRA:
+                    bundle.MorphRA.Owner.analysesCount += 1
+                if bundle.SenseRA:
+                    bundle.SenseRA.analysesCount += 1
+
+    return project
@@ -0,0 +1,330 @@
+#
+#   RunCollection
+#
+#   Runs a collection of Modules on many projects without the FlexTools
+#   UI, e.g. for nightly checks from a scheduled task or a CI system.
+#   Used by FlexTools\scripts\RunCollection.py
+#
+#   Each project is run in its own worker process, with up to 'workers'
+#   processes at a time. A worker loads the Modules and collections
+#   from the FlexTools folder (the current directory, as for
+#   RunFlexTools.py), runs the collection with RunModules(), and writes
+#   these files to the output folder:
+#    - <project>.jsonl: the report, one JSON object per message.
+#    - <project>.html:  the report as a web page.
+#    - <project>.json:  a summary of the run (see __Summary()).
+#    - <project>.log:   the log of the worker process.
+#   The workers don't save flextools.ini (see FTConfig.NoSave()); the
+#   settings they need, such as the UI language, are passed to them.
+#   Projects with the same file name (e.g. .fwdata files in different
+#   folders) are given a suffix: <project>-2, etc. (See ReportNames())
+#   RunProjects() reads the summaries as the workers finish, and
+#   writes an aggregate summary.json. A worker that exits without
+#   writing its summary is recorded as crashed.
+#
+#   Project names can be given as wildcards (e.g. "Test-*"), which are
+#   matched against the FieldWorks projects on this computer.
+#
+#   The exit codes (see ExitCode()) are:
+#       0 - EXIT_OK:     All the projects ran with no errors reported.
+#       1 - EXIT_ERRORS: Modules reported errors (or warnings, with
+#                        failOnWarnings).
+#       2 - EXIT_FAILED: A project couldn't be opened, a worker crashed,
+#                        or the collection couldn't be run.
+#
+
+import fnmatch
+import gettext
+import json
+import logging
+import multiprocessing
+import multiprocessing.connection
+import os
+import re
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+from .. import version
+from ..code.FTConfig import FTConfig, NoSave
+from ..code.FTCollections import (
+    COLLECTIONS_PATH,
+    CollectionsManager,
+    FTC_NameError,
+    )
+
+#----------------------------------------------------------------
+
+EXIT_OK     = 0
+EXIT_ERRORS = 1
+EXIT_FAILED = 2
+
+SUMMARY_FILE = "summary.json"
+
+# Project status in the summaries
+STATUS_OK      = "ok"           # Run completed (Modules may have reported errors)
+STATUS_FAILED  = "failed"       # Couldn't open the project or run the collection
+STATUS_CRASHED = "crashed"      # The worker exited without a summary
+
+LOCALES_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)),
+                            "locales")
+
+#----------------------------------------------------------------
+
+def ReportName(projectName):
+    # The base file name for a project's reports. The project name can
+    # be a path to a .fwdata file.
+    projectName = os.path.splitext(os.path.basename(projectName))[0]
+    return re.sub(r'[^\w.-]+', "_", projectName)
+
+
+def ReportNames(projects):
+    #
+    # Returns a dictionary of project name : base file name for the
+    # project's reports, with a suffix added to any names that are
+    # already used. (File names are compared without case, as on
+    # Windows.)
+    #
+    used = {os.path.splitext(SUMMARY_FILE)[0].lower()}
+    names = {}
+    for projectName in projects:
+        baseName = name = ReportName(projectName)
+        n = 1
+        while name.lower() in used:
+            n += 1
+            name = f"{baseName}-{n}"
+        used.add(name.lower())
+        names[projectName] = name
+    return names
+
+
+def ExpandProjects(patterns, allProjectNames=None):
+    #
+    # Returns the list of project names for the names and wildcard
+    # patterns given, without duplicates. allProjectNames is a function
+    # that returns the FieldWorks projects; it is only called if there
+    # are wildcards.
+    #
+    projects = []
+    available = None
+    for pattern in patterns:
+        if not any(c in pattern for c in "*?["):
+            names = [pattern]
+        else:
+            if available is None:
+                available = sorted(allProjectNames())
+            names = [p for p in available
+                     if fnmatch.fnmatchcase(p.lower(), pattern.lower())]
+            if not names:
+                logger.warning(f"No projects match '{pattern}'")
+        for name in names:
+            if name not in projects:
+                projects.append(name)
+    return projects
+
+
+def CollectionNames():
+    # The collections in the FlexTools folder (without loading the
+    # Modules).
+    suffix = CollectionsManager.COLLECTIONS_SUFFIX
+    return sorted(os.path.splitext(f)[0] for f in os.listdir(COLLECTIONS_PATH)
+                  if f.endswith(suffix))
+
+
+def ExitCode(summary, failOnWarnings=False):
+    #
+    # The exit code for an aggregate summary from RunProjects().
+    #
+    projects = summary["projects"]
+    if not projects or any(p["status"] != STATUS_OK for p in projects):
+        return EXIT_FAILED
+    if any(p["errors"] for p in projects):
+        return EXIT_ERRORS
+    if failOnWarnings and any(p["warnings"] for p in projects):
+        return EXIT_ERRORS
+    return EXIT_OK
+
+#----------------------------------------------------------------
+# Worker process
+
+def __SaveJSON(data, path):
+    tempPath = path + ".tmp"
+    with open(tempPath, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tempPath, path)
+
+
+def __Summary(projectName, collectionName, status, reporter=None,
+              seconds=None, message=None):
+    summary = {"project"    : projectName,
+               "collection" : collectionName,
+               "status"     : status,
+               "errors"     : 0,
+               "warnings"   : 0,
+               "seconds"    : round(seconds, 3) if seconds is not None else None,
+               "message"    : message,
+               "finished"   : datetime.now().isoformat(timespec="seconds"),
+               }
+    if reporter:
+        summary["errors"]   = reporter.messageCounts[reporter.ERROR]
+        summary["warnings"] = reporter.messageCounts[reporter.WARNING]
+    return summary
+
+
+def _RunProject(projectName, reportName, collectionName, outputFolder,
+                modifyAllowed, forceRun, uiLanguage):
+    #
+    # The worker process for one project. Writes the project's reports
+    # and summary to outputFolder, with the base file name reportName.
+    #
+    # The parent process and the other workers use flextools.ini too.
+    NoSave()
+    baseName = os.path.join(outputFolder, reportName)
+    # (force, since importing flextoolslib can configure logging.)
+    logging.basicConfig(filename=baseName + ".log",
+                        filemode="w",
+                        level=logging.INFO,
+                        encoding="utf-8",
+                        force=True)
+    start = time.perf_counter()
+    try:
+        summary = __RunProject(projectName, collectionName, baseName,
+                               modifyAllowed, forceRun, uiLanguage)
+    except Exception as e:
+        logger.exception("RunProject failed:")
+        summary = __Summary(projectName, collectionName, STATUS_FAILED,
+                            message=f"{e.__class__.__name__}: {e}")
+    summary["seconds"] = round(time.perf_counter() - start, 3)
+    summary["report"] = reportName
+    __SaveJSON(summary, baseName + ".json")
+
+
+def __RunProject(projectName, collectionName, baseName,
+                 modifyAllowed, forceRun, uiLanguage):
+    from flexlibs import FLExInitialize, FLExCleanup
+
+    # The FlexTools UI normally installs _()
+    translator = gettext.translation("flextools",
+                                     LOCALES_PATH,
+                                     languages=[uiLanguage or "en"],
+                                     fallback=True)
+    translator.install()
+
+    FLExInitialize()
+    try:
+        # (These import Python.NET and flexlibs.)
+        from ..code.FTModules import ModuleManager
+        from ..code.FTReport import FTReporter
+
+        moduleManager = ModuleManager()
+        for error in moduleManager.LoadAll():
+            logger.error(error)
+        try:
+            modules = CollectionsManager(moduleManager).ListOfModules(collectionName)
+        except FTC_NameError as e:
+            return __Summary(projectName, collectionName, STATUS_FAILED,
+                             message=e.message)
+
+        logger.info(f"Running {collectionName} on {projectName}: {list(modules)}")
+        reporter = FTReporter()
+        ok = moduleManager.RunModules(projectName,
+                                      list(modules),
+                                      reporter,
+                                      modifyAllowed,
+                                      modules.moduleOptions,
+                                      [baseName + ".jsonl", baseName + ".html"],
+                                      forceRun=forceRun)
+        if ok:
+            return __Summary(projectName, collectionName, STATUS_OK, reporter)
+        # The reason is the last error in the report
+        errors = [msg for msgType, msg, ref in reporter.messages
+                  if msgType == reporter.ERROR]
+        return __Summary(projectName, collectionName, STATUS_FAILED, reporter,
+                         message=errors[-1] if errors else None)
+    finally:
+        FLExCleanup()
+
+#----------------------------------------------------------------
+
+def RunProjects(collectionName, projects, outputFolder, workers=None,
+                modifyAllowed=False, forceRun=False, progress=None):
+    #
+    # Run the collection on each project in its own worker process, with
+    # up to workers processes at a time (the default is the number of
+    # CPUs). Returns the aggregate summary, which is also saved in
+    # outputFolder/summary.json.
+    # progress(numDone, numProjects, projectSummary) is called as each
+    # project finishes.
+    #
+    os.makedirs(outputFolder, exist_ok=True)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(projects) or 1))
+    logger.info(f"Running {collectionName} on {len(projects)} projects with {workers} workers")
+
+    # FieldWorks can't be shared with a forked process.
+    context = multiprocessing.get_context("spawn")
+    uiLanguage = FTConfig.UILanguage
+    reportNames = ReportNames(projects)
+    waiting = list(projects)
+    running = {}                # process sentinel : (process, project, start)
+    results = []
+    start = time.perf_counter()
+
+    def __Finished(process, projectName, processStart):
+        process.join()
+        path = os.path.join(outputFolder, reportNames[projectName] + ".json")
+        try:
+            with open(path, encoding="utf-8") as f:
+                summary = json.load(f)
+        except (OSError, ValueError):
+            summary = __Summary(projectName, collectionName, STATUS_CRASHED,
+                                seconds=time.perf_counter() - processStart,
+                                message=f"Worker exited with code {process.exitcode}")
+            summary["report"] = reportNames[projectName]
+            logger.error(f"{projectName}: {summary['message']}")
+        results.append(summary)
+        if progress:
+            progress(len(results), len(projects), summary)
+
+    try:
+        while waiting or running:
+            while waiting and len(running) < workers:
+                projectName = waiting.pop(0)
+                # Don't read a summary from an earlier run
+                reportName = reportNames[projectName]
+                path = os.path.join(outputFolder, reportName + ".json")
+                if os.path.exists(path):
+                    os.remove(path)
+                process = context.Process(target=_RunProject,
+                                          args=(projectName, reportName,
+                                                collectionName, outputFolder,
+                                                modifyAllowed, forceRun,
+                                                uiLanguage),
+                                          name=f"RunCollection-{reportName}")
+                process.start()
+                running[process.sentinel] = (process, projectName,
+                                             time.perf_counter())
+            for sentinel in multiprocessing.connection.wait(list(running)):
+                __Finished(*running.pop(sentinel))
+    finally:
+        # Stopped with Ctrl-C, etc.
+        for process, projectName, processStart in running.values():
+            logger.warning(f"Stopping the worker for {projectName}")
+            process.terminate()
+            process.join()
+
+    # In the order given
+    order = {p : i for i, p in enumerate(projects)}
+    results.sort(key=lambda s: order.get(s["project"], len(order)))
+    summary = {"collection"    : collectionName,
+               "modifyAllowed" : modifyAllowed,
+               "workers"       : workers,
+               "seconds"       : round(time.perf_counter() - start, 3),
+               "finished"      : datetime.now().isoformat(timespec="seconds"),
+               "flextoolslib"  : version,
+               "errors"        : sum(s["errors"] for s in results),
+               "warnings"      : sum(s["warnings"] for s in results),
+               "projects"      : results,
+               }
+    __SaveJSON(summary, os.path.join(outputFolder, SUMMARY_FILE))
+    return summary
@@ -4,6 +4,9 @@
 #   A test frame for developing a new Module. 
 #   Used by FlexTools\scripts\TestAModule.py 
 #
+#   ImportModule() and RunModuleOnProject() don't need FieldWorks, and
+#   can be used with a FakeProject (see Benchmark.py).
+#
 
 import os
 import sys
@@ -14,19 +17,28 @@ import traceback
 import logging
 logger = logging.getLogger(__name__)
 
-from flexlibs import FLExInitialize, FLExCleanup
-from flexlibs import (
-    FLExProject,
-    FP_ProjectError, 
-    FP_FileNotFoundError)
-
-from ..code.FTModuleClass import FTM_ModuleError
-from ..code.FTReport import FTReporter
+try:
+    from flexlibs import FLExInitialize, FLExCleanup
+    from flexlibs import (
+        FLExProject,
+        FP_ProjectError, 
+        FP_FileNotFoundError)
+except ImportError:
+    # No Python.NET or FieldWorks: RunModule() isn't available.
+    FLExProject = None
+
+from ..code.FTModuleClass import FTM_ModuleError, FTM_Name
+from ..code.FTReport import FTReporter, GotoURLBuilder
+from ..code.FTRunData import FTRunData
+from ..code.FTReportSinks import OpenSink, FTR_SinkError
+from ..code.FTProfiler import FTProfiler
+from ..code.FTProjectCache import FTProjectCache, FTCachingProject
+from ..code.FTChangeSet import FTChangeSet
 
     
 #----------------------------------------------------------------
 
-def __ImportModule(moduleFolderAndName):
+def ImportModule(moduleFolderAndName):
     #
     # Import the module given the full path and file name.
     #
@@ -68,10 +80,63 @@ def __ImportModule(moduleFolderAndName):
 
 #----------------------------------------------------------------
 
-def __RunModule(module, project):
+def RunModuleOnProject(ftm, project, modifyAllowed=False, reportFiles=None,
+                       profileMode=None, cacheLookups=False):
+    #
+    # Run the FlexToolsModule ftm on an open project (an FLExProject or
+    # FakeProject). Returns the FTReporter, or None if the module raised
+    # an exception.
+    # If profileMode is given, the profile is saved in the current
+    # directory. (See FTProfiler.py)
+    # If cacheLookups is True, the module is given a caching proxy for
+    # the project, as in FlexTools. (See FTProjectCache.py)
+    #
+
+    reporter = FTReporter()
+    reporter.runData = FTRunData(project)
+    reporter.urlBuilder = GotoURLBuilder(project)
+    sinks = []
+    for path in reportFiles or []:
+        try:
+            sinks.append(OpenSink(path))
+            reporter.AddSink(sinks[-1])
+        except FTR_SinkError as e:
+            logger.error(e.message)
+    profiler = None
+    if profileMode:
+        profiler = FTProfiler(os.getcwd(), ftm.docs[FTM_Name], profileMode)
+        profiler.Start()
+    if cacheLookups:
+        project = FTCachingProject(project, FTProjectCache(),
+                                   cacheObjects=not modifyAllowed)
+    reporter.changes = FTChangeSet(project, reporter, modifyAllowed)
+    try:
+        try:
+            ftm.Run(project, reporter, modifyAllowed)
+        finally:
+            if profiler:
+                profiler.Stop()
+        reporter.changes.Checkpoint()
+        logger.info(f"Changes: {reporter.changes.applied} applied, "
+                    f"{reporter.changes.previewed} previewed, "
+                    f"{reporter.changes.unchanged} unchanged")
+        reporter.ReportKeySummary()
+        if profiler:
+            for path in profiler.Save():
+                reporter.Info(f"Profile saved to {path}", reporter.FileURL(path))
+    except:
+        logger.exception("Runtime error:")
+        return None
+    finally:
+        for sink in sinks:
+            sink.Close()
+    return reporter
+
+
+def __RunModule(module, project, reportFiles, profileMode):
 
     # --- Import the module ---
-    mod = __ImportModule(module)
+    mod = ImportModule(module)
     
     if not mod:
         return False
@@ -99,11 +164,9 @@ def __RunModule(module, project):
         return False
         
     # --- Run the module ---
-    reporter = FTReporter()
-    try:
-        ftm.Run(FlexDB, reporter)
-    except:
-        logger.exception("Runtime error:")
+    reporter = RunModuleOnProject(ftm, FlexDB, reportFiles=reportFiles,
+                                  profileMode=profileMode)
+    if reporter is None:
         return False
     
     TYPE_LOOKUP = ["INFO", "WARN", "ERR ", "    "]
@@ -111,18 +174,21 @@ def __RunModule(module, project):
         msgType, msg, ref = m
         logger.info (f"{TYPE_LOOKUP[msgType]}: {msg}")
         if ref:
-            logger.info (f">>>>  {ref}")
+            logger.info (f">>>>  {reporter.ResolveRef(ref)}")
     
     FlexDB.CloseProject()
     
     return True
     
     
-def RunModule(module, project):
+def RunModule(module, project, reportFiles=None, profileMode=None):
+    # reportFiles is an optional list of JSONL, CSV or HTML file paths
+    # that the report is written to while the module runs.
+    # profileMode is "cprofile" or "sampling" to profile the module.
 
     FLExInitialize()
 
-    result = __RunModule(module, project)
+    result = __RunModule(module, project, reportFiles, profileMode)
     
     FLExCleanup()
     
@@ -0,0 +1,47 @@
+#
+#   conftest.py
+#
+#   pytest fixtures for the flextoolslib tests. These run without
+#   FieldWorks: the project is a FakeProject (see misc/FakeProject.py)
+#   and the LCM names come from misc/FakeLCM.py.
+#
+#   Run from the repository root with:
+#       python -m pytest tests
+#
+
+import pytest
+
+from flextoolslib.misc.FakeLCM import InstallFakeLCM
+from flextoolslib.misc.FakeProject import GenerateProject
+
+InstallFakeLCM()
+
+# Importing FTConfig loads flextools.ini from the current directory
+# and saves it again at exit. Stop the tests rewriting it.
+from flextoolslib.code.FTConfig import NoSave
+NoSave()
+
+#----------------------------------------------------------- 
+
+NUM_ENTRIES = 200
+
+@pytest.fixture
+def project():
+    """
+    A synthetic project, opened read-only.
+    """
+    p = GenerateProject(NUM_ENTRIES, seed=0)
+    p.OpenProject(writeEnabled=False)
+    yield p
+    p.CloseProject()
+
+
+@pytest.fixture
+def writableProject():
+    """
+    A synthetic project, opened with write access.
+    """
+    p = GenerateProject(NUM_ENTRIES, seed=0)
+    p.OpenProject(writeEnabled=True)
+    yield p
+    p.CloseProject()
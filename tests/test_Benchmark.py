@@ -0,0 +1,95 @@
+#
+#   test_Benchmark.py
+#
+#   A pytest suite for the scaling and regression checks of the Module
+#   benchmark harness (misc/Benchmark.py).
+#
+
+import os
+
+import pytest
+
+from flextoolslib.misc import Benchmark
+
+MODULES_PATH = os.path.join(os.path.dirname(__file__), 
+                            "..", "FlexTools", "Modules")
+
+#----------------------------------------------------------- 
+
+def Results(metric, values, sizes=(1000, 10000, 100000)):
+    return [{"size" : size, metric : value, "failed" : False}
+            for size, value in zip(sizes, values)]
+
+
+@pytest.mark.parametrize("values, exponent", [
+    ((0.1, 1.0, 10.0),      1.0),       # Linear
+    ((0.1, 10.0, 1000.0),   2.0),       # Quadratic
+    ((1.0, 1.0, 1.0),       0.0),       # Constant
+    ])
+def test_scaling_exponent(values, exponent):
+    assert Benchmark.ScalingExponent(Results("seconds", values), 
+                                     "seconds") == exponent
+
+def test_scaling_exponent_ignores_noise():
+    # The first time is below the noise floor, so only two points fit.
+    results = Results("seconds", (0.001, 1.0, 100.0))
+    assert Benchmark.ScalingExponent(results, "seconds") == 2.0
+    results = Results("seconds", (0.001, 0.01, 1.0))
+    assert Benchmark.ScalingExponent(results, "seconds") is None
+
+def test_scaling_exponent_ignores_failed_runs():
+    results = Results("seconds", (0.1, 1.0, 100.0))
+    results[2]["failed"] = True
+    assert Benchmark.ScalingExponent(results, "seconds") == 1.0
+    results[1]["failed"] = True
+    assert Benchmark.ScalingExponent(results, "seconds") is None
+
+def test_scaling_exponent_missing_metric():
+    assert Benchmark.ScalingExponent(Results("seconds", (1, 2, 3)), 
+                                     "peakMemory") is None
+
+def test_superlinear():
+    benchmark = {"exponents" : {"seconds" : 1.9, "peakMemory" : 1.0,
+                                "messages" : 3.0}}
+    assert Benchmark.SuperLinear(benchmark) == [("seconds", 1.9)]
+
+#----------------------------------------------------------- 
+
+def Run(seconds, messages, failed=False, seed=0):
+    return {"seed" : seed,
+            "modules" : {"M.py" : {"results" : [
+                            {"size" : 1000, "seconds" : seconds,
+                             "messages" : messages, "failed" : failed}]}}}
+
+def test_compare_results():
+    base = Run(1.0, 500)
+    assert Benchmark.CompareResults(Run(1.2, 500), base) == []
+    assert Benchmark.CompareResults(Run(1.3, 500), base) == \
+           [("M.py", 1000, "seconds", 1.0, 1.3)]
+    assert Benchmark.CompareResults(Run(1.0, 501), base) == \
+           [("M.py", 1000, "messages", 500, 501)]
+    # Different data
+    assert Benchmark.CompareResults(Run(1.0, 501, seed=1), base) == []
+
+def test_compare_results_skips_failed_runs():
+    assert Benchmark.CompareResults(Run(0, None, failed=True), 
+                                    Run(1.0, 500)) == []
+    assert Benchmark.CompareResults(Run(5.0, 500), 
+                                    Run(0, None, failed=True)) == []
+
+#----------------------------------------------------------- 
+
+def test_run_benchmarks(tmp_path):
+    results = Benchmark.RunBenchmarks(
+                [os.path.join(MODULES_PATH, "Reports", "Lexicon_Statistics.py"),
+                 os.path.join(MODULES_PATH, "Reports", "Missing.py")],
+                sizes=(50, 100), measureMemory=False)
+    assert list(results["modules"]) == ["Lexicon_Statistics.py"]
+    assert results["failed"] == [os.path.join(MODULES_PATH, "Reports", "Missing.py")]
+    benchmark = results["modules"]["Lexicon_Statistics.py"]
+    assert [r["size"] for r in benchmark["results"]] == [50, 100]
+    assert not any(r["failed"] for r in benchmark["results"])
+
+    path = tmp_path / "results.json"
+    Benchmark.SaveResults(results, path)
+    assert Benchmark.LoadResults(path) == results
@@ -0,0 +1,131 @@
+#
+#   test_FTBulkRead.py
+#
+#   A pytest suite for the columnar field reads of FTBulkRead.py, run
+#   against a FakeProject.
+#
+
+import os
+from array import array
+
+import pytest
+
+from flextoolslib.code.FTBulkRead import (
+    FTBR_FieldError,
+    ReadEntryFields,
+    IterEntryFields,
+    ReadSenseFields,
+    IterSenseFields,
+    ReadReversalFields,
+    IterReversalFields,
+    )
+from flextoolslib.code.FTReport import FTReporter, GotoRef
+from flextoolslib.misc.FakeProject import GenerateProject
+from flextoolslib.misc.RunModule import ImportModule
+
+MODULES_PATH = os.path.join(os.path.dirname(__file__),
+                            "..", "FlexTools", "Modules")
+
+#-----------------------------------------------------------
+
+def test_entry_rows(project):
+    columns = ReadEntryFields(project, ("Headword", "HomographNumber", "Ref"))
+    entries = list(project.LexiconAllEntries())
+    assert len(columns) == len(entries)
+    assert list(columns.Rows()) == [(e.Hvo,
+                                     project.LexiconGetHeadword(e),
+                                     e.HomographNumber,
+                                     GotoRef(e)) for e in entries]
+    # Integer fields are arrays
+    assert isinstance(columns["HomographNumber"], array)
+    assert isinstance(columns["Headword"], list)
+
+
+def test_by_hvo(project):
+    columns = ReadSenseFields(project, ("Gloss", "Headword"))
+    glosses = columns.ByHvo("Gloss")
+    headwords = columns.ByHvo("Headword")
+    for entry in project.LexiconAllEntries():
+        for sense in entry.AllSenses:
+            assert glosses[sense.Hvo] == project.LexiconGetSenseGloss(sense)
+            # Entry fields give the value for the sense's entry
+            assert headwords[sense.Hvo] == project.LexiconGetHeadword(entry)
+
+
+def test_writing_systems():
+    project = GenerateProject(20, analysisWSs=(("en", "English"),
+                                               ("fr", "French")))
+    project.OpenProject(writeEnabled=False)
+    columns = ReadSenseFields(project, (("Gloss", "fr"), "Gloss"))
+    senses = [s for e in project.LexiconAllEntries() for s in e.AllSenses]
+    assert list(columns.Rows()) == [(s.Hvo,
+                                     project.LexiconGetSenseGloss(s, "fr"),
+                                     project.LexiconGetSenseGloss(s))
+                                    for s in senses]
+    with pytest.raises(FTBR_FieldError):
+        ReadSenseFields(project, (("Gloss", "de"),))
+
+
+def test_custom_field(writableProject):
+    flags = writableProject.LexiconGetEntryCustomFieldNamed("FTFlags")
+    entries = list(writableProject.LexiconAllEntries())
+    writableProject.LexiconSetFieldText(entries[3], flags, "m")
+    columns = ReadEntryFields(writableProject, (flags,))
+    values = columns.ByHvo(flags)
+    assert values[entries[3].Hvo] == "m"
+    assert values[entries[4].Hvo] == ""
+
+
+@pytest.mark.parametrize("chunkSize", [1, 7, 50, 10000])
+def test_chunks(project, chunkSize):
+    fields = ("LexemeForm", "NumberOfSenses")
+    whole = ReadEntryFields(project, fields)
+    chunks = list(IterEntryFields(project, fields, chunkSize=chunkSize))
+    assert all(len(c) <= chunkSize for c in chunks)
+    assert all(len(c) for c in chunks)
+    rows = [row for c in chunks for row in c.Rows()]
+    assert rows == list(whole.Rows())
+
+
+def test_sense_chunks(project):
+    fields = ("EntryHvo", "SenseNumber")
+    rows = [row for c in IterSenseFields(project, fields, chunkSize=13)
+            for row in c.Rows()]
+    assert rows == list(ReadSenseFields(project, fields).Rows())
+
+
+def test_reversal_fields(project):
+    columns = ReadReversalFields(project, "en", ("Form", "NumberOfSenses"))
+    entries = list(project.ReversalEntries("en"))
+    assert list(columns.Rows()) == [(r.Hvo,
+                                     project.ReversalGetForm(r, "en"),
+                                     r.SensesRS.Count) for r in entries]
+
+
+def test_unknown_field(project):
+    with pytest.raises(FTBR_FieldError):
+        ReadEntryFields(project, ("Gloss",))
+    with pytest.raises(FTBR_FieldError):
+        ReadReversalFields(project, "en", ("Headword",))
+
+
+def test_no_reversal_index(project):
+    # A writing system with no reversal index
+    ws = project.GetDefaultVernacularWS()[0]
+    with pytest.raises(FTBR_FieldError) as e:
+        IterReversalFields(project, ws, ("Form",))
+    assert ws in e.value.message
+
+
+def test_find_duplicate_entries(writableProject):
+    # A Module that uses IterEntryFields() (See Modules/Duplicates)
+    mod = ImportModule(os.path.join(MODULES_PATH, "Duplicates",
+                                    "Find_Duplicate_Entries.py"))
+    reporter = FTReporter()
+    mod.FlexToolsModule.Run(writableProject, reporter, True)
+    flags = writableProject.LexiconGetEntryCustomFieldNamed("FTFlags")
+    tagged = [e for e in writableProject.LexiconAllEntries()
+              if writableProject.LexiconGetFieldText(e, flags)]
+    assert tagged
+    assert all(e.HomographNumber for e in tagged)
+    assert not any(m[0] == FTReporter.ERROR for m in reporter.messages)
@@ -0,0 +1,147 @@
+#
+#   test_FTChangeSet.py
+#
+#   A pytest suite for the write-behind changes of FTChangeSet.py, run
+#   against a FakeProject.
+#
+
+import pytest
+
+from flextoolslib.code.FTChangeSet import FTChangeSet, PREVIEW_KEY
+from flextoolslib.code.FTReport import FTReporter
+
+#-----------------------------------------------------------
+
+def Senses(project, n):
+    senses = [s for e in project.LexiconAllEntries() for s in e.SensesOS]
+    return senses[:n]
+
+def Entries(project, n):
+    return list(project.LexiconAllEntries())[:n]
+
+
+def test_changes_are_queued(writableProject):
+    changes = FTChangeSet(writableProject, modifyAllowed=True)
+    sense = Senses(writableProject, 1)[0]
+    old = writableProject.LexiconGetSenseGloss(sense)
+    changes.LexiconSetSenseGloss(sense, "new gloss")
+    assert len(changes) == 1
+    # Reads don't see the queued change
+    assert writableProject.LexiconGetSenseGloss(sense) == old
+    assert changes.Apply() == 1
+    assert writableProject.LexiconGetSenseGloss(sense) == "new gloss"
+    assert len(changes) == 0
+    assert changes.queued == changes.applied == 1
+
+
+def test_last_value_is_written(writableProject):
+    changes = FTChangeSet(writableProject, modifyAllowed=True)
+    entry = Entries(writableProject, 1)[0]
+    changes.LexiconSetLexemeForm(entry, "one")
+    changes.LexiconSetLexemeForm(entry, "two")
+    changes.LexiconSetLexemeForm(entry, "three")
+    assert len(changes) == 1
+    assert changes.queued == 3
+    changes.Apply()
+    assert writableProject.LexiconGetLexemeForm(entry) == "three"
+
+
+def test_tags_are_combined(writableProject):
+    flags = writableProject.LexiconGetEntryCustomFieldNamed("FTFlags")
+    entry = Entries(writableProject, 1)[0]
+    writableProject.LexiconSetFieldText(entry, flags, "old")
+    changes = FTChangeSet(writableProject, modifyAllowed=True)
+    changes.LexiconAddTagToField(entry, flags, "a")
+    changes.LexiconAddTagToField(entry, flags, "b")
+    changes.LexiconAddTagToField(entry, flags, "a")
+    assert len(changes) == 1
+    assert changes.Apply() == 1
+    assert writableProject.LexiconGetFieldText(entry, flags) == "old; a; b"
+
+
+def test_tags_added_to_queued_text(writableProject):
+    flags = writableProject.LexiconGetEntryCustomFieldNamed("FTFlags")
+    entry = Entries(writableProject, 1)[0]
+    changes = FTChangeSet(writableProject, modifyAllowed=True)
+    changes.LexiconAddTagToField(entry, flags, "lost")
+    changes.LexiconSetFieldText(entry, flags, "text")
+    changes.LexiconAddTagToField(entry, flags, "m")
+    assert len(changes) == 1
+    changes.Apply()
+    assert writableProject.LexiconGetFieldText(entry, flags) == "text; m"
+
+
+def test_clear_replaces_text(writableProject):
+    flags = writableProject.LexiconGetEntryCustomFieldNamed("FTFlags")
+    entry = Entries(writableProject, 1)[0]
+    writableProject.LexiconSetFieldText(entry, flags, "old")
+    changes = FTChangeSet(writableProject, modifyAllowed=True)
+    changes.LexiconSetFieldText(entry, flags, "text")
+    changes.LexiconAddTagToField(entry.Hvo, flags, "m")
+    changes.LexiconClearField(entry, flags)
+    assert len(changes) == 1
+    assert changes.Apply() == 1
+    assert writableProject.LexiconGetFieldText(entry, flags) == ""
+
+
+def test_integer_field(writableProject):
+    frequency = writableProject.LexiconGetEntryCustomFieldNamed("Entry Frequency")
+    entry = Entries(writableProject, 1)[0]
+    changes = FTChangeSet(writableProject, modifyAllowed=True)
+    changes.LexiconSetFieldInteger(entry, frequency, 5)
+    changes.LexiconSetFieldInteger(entry, frequency, 7)
+    assert changes.Apply() == 1
+    assert writableProject.GetCustomFieldValue(entry, frequency) == 7
+
+
+def test_unchanged_values_are_not_written(writableProject):
+    senses = Senses(writableProject, 3)
+    changes = FTChangeSet(writableProject, modifyAllowed=True)
+    for sense in senses:
+        changes.LexiconSetSenseGloss(sense,
+                                     writableProject.LexiconGetSenseGloss(sense))
+    changes.LexiconSetSenseGloss(senses[0], "changed")
+    assert changes.Apply() == 1
+    assert changes.unchanged == 2
+
+
+def test_preview(project):
+    # A dry run on a read-only project: nothing is written.
+    reporter = FTReporter()
+    changes = FTChangeSet(project, reporter, modifyAllowed=False)
+    flags = project.LexiconGetEntryCustomFieldNamed("FTFlags")
+    sense = Senses(project, 1)[0]
+    entry = Entries(project, 1)[0]
+    old = project.LexiconGetSenseGloss(sense)
+    changes.LexiconSetSenseGloss(sense, "new gloss")
+    changes.LexiconAddTagToField(entry, flags, "m")
+    changes.LexiconSetSenseGloss(Senses(project, 2)[1],
+                                 project.LexiconGetSenseGloss(Senses(project, 2)[1]))
+    assert changes.Checkpoint() == 2
+    assert changes.previewed == 2
+    assert changes.unchanged == 1
+    assert project.LexiconGetSenseGloss(sense) == old
+    messages = [m[1] for m in reporter.messages]
+    assert f"Gloss: '{old}' → 'new gloss'" in messages
+    assert "FTFlags: '' → 'm'" in messages
+    assert len(changes) == 0
+
+
+def test_checkpoint_applies(writableProject):
+    applied = []
+    changes = FTChangeSet(writableProject, modifyAllowed=True)
+    changes.onApply = lambda: applied.append(True)
+    changes.LexiconSetSenseGloss(Senses(writableProject, 1)[0], "x")
+    assert changes.Checkpoint() == 1
+    assert applied
+
+
+def test_discard(writableProject):
+    changes = FTChangeSet(writableProject, modifyAllowed=True)
+    sense = Senses(writableProject, 1)[0]
+    old = writableProject.LexiconGetSenseGloss(sense)
+    changes.LexiconSetSenseGloss(sense, "discarded")
+    changes.ReversalSetForm(sense, "discarded")
+    assert changes.Discard() == 2
+    assert changes.Apply() == 0
+    assert writableProject.LexiconGetSenseGloss(sense) == old
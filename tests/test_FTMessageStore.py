@@ -0,0 +1,97 @@
+#
+#   test_FTMessageStore.py
+#
+#   A pytest suite for the spill-to-disk message store of
+#   FTMessageStore.py
+#
+
+import threading
+
+import pytest
+
+from flextoolslib.code.FTMessageStore import FTMessageStore
+
+#----------------------------------------------------------- 
+
+WINDOW = 10
+
+def Message(i):
+    return (i % 3, f"message {i} 路", f"silfw://link?{i}" if i % 2 else None)
+
+@pytest.fixture
+def store():
+    s = FTMessageStore(WINDOW)
+    for i in range(95):
+        s.append(Message(i))
+    yield s
+    s.Close()
+
+EXPECTED = [Message(i) for i in range(95)]
+
+#----------------------------------------------------------- 
+
+def test_spilled(store):
+    assert len(store) == 95
+    assert "on disk" in repr(store)
+    assert not repr(store).endswith(" 0 on disk>")
+
+def test_index(store):
+    for i in (0, 1, 50, 84, 85, 94, -1, -95):
+        assert store[i] == EXPECTED[i]
+    with pytest.raises(IndexError):
+        store[95]
+    with pytest.raises(IndexError):
+        store[-96]
+
+@pytest.mark.parametrize("start, stop", [
+    (0, 95),
+    (0, 10),            # On disk
+    (80, 90),           # Straddles the spill boundary
+    (84, 86),
+    (89, 95),           # In memory
+    (90, 200),
+    (-20, -3),
+    (50, 40),           # Empty
+    ])
+def test_slices(store, start, stop):
+    assert store[start:stop] == EXPECTED[start:stop]
+
+def test_step_slice(store):
+    assert store[3:90:7] == EXPECTED[3:90:7]
+
+def test_iterate(store):
+    assert list(store) == EXPECTED
+
+def test_refs_stored_as_strings():
+    s = FTMessageStore(2)
+    for i in range(4):
+        s.append((0, "msg", 1234))
+    assert s[0] == (0, "msg", "1234")       # Spilled
+    assert s[-1] == (0, "msg", 1234)        # In memory
+
+def test_close(store):
+    store.Close()
+    assert len(store) == 0
+    assert not store
+
+def test_length_while_appending():
+    # The length seen by another thread is always a count of messages
+    # that can be read.
+    s = FTMessageStore(WINDOW)
+    done = threading.Event()
+    errors = []
+
+    def __reader():
+        while not done.is_set():
+            n = len(s)
+            if n and s[n-1][1] != f"message {n-1}":
+                errors.append(n)
+
+    reader = threading.Thread(target=__reader)
+    reader.start()
+    for i in range(5000):
+        s.append((0, f"message {i}", None))
+    done.set()
+    reader.join()
+    assert not errors
+    assert len(s) == 5000
@@ -0,0 +1,80 @@
+#
+#   test_FTProfiler.py
+#
+#   A pytest suite for the profiling modes of FTProfiler.py
+#
+
+import cProfile
+import os
+
+import pytest
+
+from flextoolslib.code import FTProfiler
+
+#----------------------------------------------------------- 
+
+def Leaf(n):
+    return sum(i * i for i in range(n))
+
+def Caller():
+    return Leaf(200000) + Leaf(100000)
+
+def Recursive(n):
+    return Leaf(100000) if n == 0 else Recursive(n - 1)
+
+def Work():
+    for i in range(3):
+        Caller()
+    Recursive(10)
+
+def Frames(stacks):
+    return {frame.split(" (")[0] for stack in stacks for frame in stack.split(";")}
+
+#----------------------------------------------------------- 
+
+def test_profile_mode():
+    assert FTProfiler.ProfileMode(None) is None
+    assert FTProfiler.ProfileMode("Sampling") == FTProfiler.PROFILE_SAMPLING
+    assert FTProfiler.ProfileMode("yes") == FTProfiler.PROFILE_CPROFILE
+    assert FTProfiler.ProfileMode("off") is None
+    assert FTProfiler.ProfileMode("bogus") is None
+
+
+def test_collapsed_stacks():
+    profile = cProfile.Profile()
+    profile.enable()
+    Work()
+    profile.disable()
+    stacks = FTProfiler.CollapsedStacks(profile)
+    assert {"Caller", "Leaf", "Recursive"} <= Frames(stacks)
+    # The recursion is collapsed into the outermost call.
+    assert all(stack.count("Recursive") <= 1 for stack in stacks)
+    assert all(count > 0 for count in stacks.values())
+    # Leaf() is called from both Caller() and Recursive(), and most of
+    # the time is spent there.
+    leafTime = sum(count for stack, count in stacks.items() if "Leaf" in stack)
+    assert leafTime > 0.8 * sum(stacks.values())
+    assert any(s.startswith("Work") and ";Recursive" in s and ";Leaf" in s
+               for s in stacks)
+
+
+@pytest.mark.parametrize("mode, extensions", [
+    (FTProfiler.PROFILE_CPROFILE, [".prof", ".collapsed"]),
+    (FTProfiler.PROFILE_SAMPLING, [".collapsed"]),
+    ])
+def test_save(tmp_path, mode, extensions):
+    profiler = FTProfiler.FTProfiler(str(tmp_path), "Test Module", mode,
+                                     interval=0.001)
+    profiler.Start()
+    Work()
+    profiler.Stop()
+    paths = profiler.Save()
+    assert [os.path.splitext(p)[1] for p in paths] == extensions
+    collapsed = paths[-1]
+    with open(collapsed, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert lines
+    for line in lines:
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0
+    assert "Leaf" in Frames(line.rsplit(" ", 1)[0] for line in lines)
@@ -0,0 +1,120 @@
+#
+#   test_FTProjectCache.py
+#
+#   A pytest suite for the caching project proxy of FTProjectCache.py,
+#   run against a FakeProject.
+#
+
+import pytest
+
+from flextoolslib.code.FTProjectCache import FTProjectCache, FTCachingProject
+from flextoolslib.misc.FakeProject import FakeProject
+
+#-----------------------------------------------------------
+
+def FirstSense(project):
+    for entry in project.LexiconAllEntries():
+        if entry.SensesOS.Count:
+            return entry, entry.SensesOS[0]
+
+
+def test_project_lookups_are_cached(project):
+    cache = FTProjectCache()
+    proxy = FTCachingProject(project, cache)
+    handle = proxy.WSHandle("en")
+    assert proxy.WSHandle("en") == handle
+    assert proxy.LexiconGetEntryCustomFieldNamed("FTFlags") == \
+           project.LexiconGetEntryCustomFieldNamed("FTFlags")
+    assert cache.hits == 1
+    assert cache.misses == 2
+
+
+def test_list_lookups_are_not_shared(project):
+    cache = FTProjectCache()
+    proxy = FTCachingProject(project, cache)
+    fields = proxy.LexiconGetEntryCustomFields()
+    fields.append((0, "Mine"))
+    other = FTCachingProject(project, cache)
+    assert (0, "Mine") not in other.LexiconGetEntryCustomFields()
+    wss = proxy.GetAllVernacularWSs()
+    wss.clear()
+    assert other.GetAllVernacularWSs()
+    assert cache.hits == 0
+
+
+def test_object_lookups_are_cached(project):
+    cache = FTProjectCache()
+    proxy = FTCachingProject(project, cache)
+    entry, sense = FirstSense(project)
+    assert proxy.LexiconGetSenseGloss(sense) == \
+           project.LexiconGetSenseGloss(sense)
+    proxy.LexiconGetSenseGloss(sense)
+    proxy.LexiconGetHeadword(entry)
+    assert cache.hits == 1
+    assert cache.misses == 2
+
+
+def test_setter_invalidates(writableProject):
+    cache = FTProjectCache()
+    proxy = FTCachingProject(writableProject, cache)
+    entry, sense = FirstSense(writableProject)
+    proxy.LexiconGetSenseGloss(sense)
+    proxy.LexiconSetSenseGloss(sense, "changed")
+    assert proxy.LexiconGetSenseGloss(sense) == "changed"
+
+    headword = proxy.LexiconGetHeadword(entry)
+    proxy.LexiconSetLexemeForm(entry, "zzz")
+    assert proxy.LexiconGetHeadword(entry) == \
+           writableProject.LexiconGetHeadword(entry)
+    assert proxy.LexiconGetHeadword(entry) != headword
+
+
+def test_modifying_module_gets_fresh_values(writableProject):
+    # A read-only module and a modifying module sharing a cache
+    # (See FTModules.py)
+    cache = FTProjectCache()
+    reader = FTCachingProject(writableProject, cache)
+    modifier = FTCachingProject(writableProject, cache, cacheObjects=False)
+    entry, sense = FirstSense(writableProject)
+
+    reader.LexiconGetSenseGloss(sense)
+    # The modifier doesn't see the reader's cached value...
+    writableProject.LexiconSetSenseGloss(sense, "direct")
+    assert modifier.LexiconGetSenseGloss(sense) == "direct"
+    # ...and its changes are seen by the reader.
+    modifier.LexiconSetSenseGloss(sense, "modified")
+    assert reader.LexiconGetSenseGloss(sense) == "modified"
+
+
+def test_clear(project):
+    cache = FTProjectCache()
+    proxy = FTCachingProject(project, cache)
+    entry, sense = FirstSense(project)
+    proxy.LexiconGetSenseGloss(sense)
+    proxy.WSHandle("en")
+    cache.Clear()
+    proxy.LexiconGetSenseGloss(sense)
+    proxy.WSHandle("en")
+    assert cache.hits == 0
+    assert cache.misses == 4
+
+
+def test_proxy_looks_like_the_project(project):
+    proxy = FTCachingProject(project, FTProjectCache())
+    assert isinstance(proxy, FakeProject)
+    assert proxy.uncachedProject is project
+
+    proxy.myValue = 42
+    assert project.myValue == 42
+    assert proxy.myValue == 42
+
+
+def test_keyword_arguments(project):
+    cache = FTProjectCache()
+    proxy = FTCachingProject(project, cache)
+    entry, sense = FirstSense(project)
+    ws = project.GetDefaultAnalysisWS()[0]
+    assert proxy.LexiconGetSenseGloss(sense, languageTagOrHandle=ws) == \
+           project.LexiconGetSenseGloss(sense, ws)
+    assert proxy.WSHandle(ws) == project.WSHandle(ws)
+    assert cache.misses == 2
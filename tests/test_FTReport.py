@@ -0,0 +1,126 @@
+#
+#   test_FTReport.py
+#
+#   A pytest suite for the message batching and the Guid references
+#   of FTReporter.
+#
+
+import os
+import time
+
+import pytest
+
+from flextoolslib.code.FTReport import (
+    FTReporter,
+    GotoRef,
+    GotoURLBuilder,
+    GotoURLTemplate,
+    TemplateURLBuilder,
+    )
+from flextoolslib.misc.RunModule import ImportModule
+
+#----------------------------------------------------------- 
+
+@pytest.fixture
+def reporter():
+    r = FTReporter()
+    r.batches = []
+    # A long interval, so that only the first batch is due.
+    r.RegisterBatchHandler(r.batches.append, batchRate=0.001)
+    return r
+
+
+def test_first_message_delivered(reporter):
+    reporter.Info("one")
+    assert reporter.batches == [[(FTReporter.INFO, "one", None)]]
+
+def test_batches_are_rate_limited(reporter):
+    for i in range(5):
+        reporter.Info(str(i))
+    assert len(reporter.batches) == 1
+    reporter.Flush(False)               # Not due
+    assert len(reporter.batches) == 1
+    reporter.Flush()
+    assert [len(b) for b in reporter.batches] == [1, 4]
+    reporter.Flush()                    # Nothing waiting
+    assert len(reporter.batches) == 2
+
+def test_batch_delivered_by_progress(reporter):
+    reporter.batchRate = 20
+    reporter.Info("one")
+    reporter.Info("two")
+    assert len(reporter.batches) == 1
+    time.sleep(0.1)
+    reporter.ProgressStart(10)
+    assert [len(b) for b in reporter.batches] == [1, 1]
+
+def test_batches_match_the_store(reporter):
+    for i in range(50):
+        reporter.Warning(str(i))
+    reporter.Flush()
+    delivered = [m for b in reporter.batches for m in b]
+    assert delivered == list(reporter.messages)
+
+def test_reset_discards_the_batch(reporter):
+    reporter.Info("one")
+    reporter.Info("two")
+    reporter.Reset()
+    reporter.Flush()
+    assert len(reporter.batches) == 1
+
+def test_merged_messages_are_batched(reporter):
+    other = FTReporter()
+    other.Info("one")
+    other.Error("two")
+    reporter.Merge(other)
+    reporter.Flush()
+    assert [len(b) for b in reporter.batches] == [1, 1]
+
+#----------------------------------------------------------- 
+# References
+
+def test_guid_refs(project):
+    reporter = FTReporter()
+    reporter.urlBuilder = GotoURLBuilder(project)
+    entry = next(project.LexiconAllEntries())
+    reversal = next(project.ReversalEntries("en"))
+    wordform = project.wordforms[0]
+    for obj, ref in ((entry, entry.Guid),
+                     (entry, GotoRef(entry)),
+                     (reversal, GotoRef(reversal)),
+                     (wordform, GotoRef(wordform))):
+        reporter.Info("message", ref)
+        storedRef = reporter.messages[-1][2]
+        assert storedRef.startswith("guid:")
+        assert reporter.ResolveRef(storedRef) == project.BuildGotoURL(obj)
+    assert "reversalToolEditComplete" in reporter.ResolveRef(GotoRef(reversal))
+
+def test_url_template(project):
+    # The template can be passed from a sandboxed Module's process.
+    # (See FTSandbox.py)
+    template = GotoURLTemplate(project)
+    assert isinstance(template, str)
+    builder = TemplateURLBuilder(template)
+    reversal = next(project.ReversalEntries("en"))
+    guid = str(reversal.Guid)
+    assert builder(guid, "reversalToolEditComplete") == \
+           project.BuildGotoURL(reversal)
+    assert TemplateURLBuilder(None) is None
+
+def test_guid_refs_without_builder():
+    reporter = FTReporter()
+    assert reporter.ResolveRef("guid:Analyses:1234") == "guid:Analyses:1234"
+    assert reporter.ResolveRef("silfw://x") == "silfw://x"
+
+def test_module_refs(project):
+    # Incomplete_Analyses reports analyses, which are shown in the
+    # Analyses tool.
+    mod = ImportModule(os.path.join(os.path.dirname(__file__), "..", 
+                                    "FlexTools", "Modules", "Reports", 
+                                    "Incomplete_Analyses.py"))
+    reporter = FTReporter()
+    reporter.urlBuilder = GotoURLBuilder(project)
+    mod.FlexToolsModule.Run(project, reporter, False)
+    assert reporter.messageCounts[FTReporter.WARNING]
+    links = [reporter.ResolveRef(ref) for t, msg, ref in reporter.messages if ref]
+    assert links and all("tool=Analyses" in link for link in links)
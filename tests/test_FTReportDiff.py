@@ -0,0 +1,89 @@
+#
+#   test_FTReportDiff.py
+#
+#   A pytest suite for saving and comparing the reports of runs with
+#   FTReportDiff.py
+#
+
+import pytest
+
+from flextoolslib.code import FTReportDiff
+
+#----------------------------------------------------------- 
+
+WARNING = 1
+ERROR   = 2
+PROJECT = "Sena 3"
+
+def Records(moduleName, messages):
+    return [(moduleName, msgType, msg, "guid:" + msg) 
+            for msgType, msg in messages]
+
+
+def test_no_previous_run(tmp_path):
+    assert not FTReportDiff.HasPreviousRun(tmp_path, PROJECT)
+    assert FTReportDiff.Compare(tmp_path, PROJECT) is None
+    FTReportDiff.SaveRun(tmp_path, PROJECT, ["A"], 
+                         Records("A", [(WARNING, "w1")]))
+    assert not FTReportDiff.HasPreviousRun(tmp_path, PROJECT)
+    assert FTReportDiff.Compare(tmp_path, PROJECT) is None
+
+
+def test_compare(tmp_path):
+    FTReportDiff.SaveRun(tmp_path, PROJECT, ["A"], 
+                         Records("A", [(WARNING, "w1"), (ERROR, "e1"),
+                                       (WARNING, "w2")]))
+    FTReportDiff.SaveRun(tmp_path, PROJECT, ["A"], 
+                         Records("A", [(WARNING, "w1"), (WARNING, "w3"),
+                                       (ERROR, "w2")]))     # Type changed
+    assert FTReportDiff.HasPreviousRun(tmp_path, PROJECT)
+    new, resolved, unchanged = FTReportDiff.Compare(tmp_path, PROJECT)
+    assert new == Records("A", [(WARNING, "w3"), (ERROR, "w2")])
+    assert resolved == Records("A", [(ERROR, "e1"), (WARNING, "w2")])
+    assert unchanged == Records("A", [(WARNING, "w1")])
+
+
+def test_modules_compared_separately(tmp_path):
+    # The same message from another module isn't the same message.
+    FTReportDiff.SaveRun(tmp_path, PROJECT, ["A"], 
+                         Records("A", [(WARNING, "w1")]))
+    FTReportDiff.SaveRun(tmp_path, PROJECT, ["A", "B"], 
+                         Records("B", [(WARNING, "w1")]))
+    new, resolved, unchanged = FTReportDiff.Compare(tmp_path, PROJECT)
+    assert new == Records("B", [(WARNING, "w1")])
+    assert resolved == Records("A", [(WARNING, "w1")])
+    assert unchanged == []
+
+
+def test_other_collection_keeps_history(tmp_path):
+    # Running a different collection in between doesn't replace the
+    # history of the first one's modules.
+    FTReportDiff.SaveRun(tmp_path, PROJECT, ["A"], 
+                         Records("A", [(WARNING, "w1")]))
+    FTReportDiff.SaveRun(tmp_path, PROJECT, ["B"], 
+                         Records("B", [(WARNING, "b1")]))
+    assert FTReportDiff.Compare(tmp_path, PROJECT) is None
+    FTReportDiff.SaveRun(tmp_path, PROJECT, ["A"], 
+                         Records("A", [(WARNING, "w2")]))
+    new, resolved, unchanged = FTReportDiff.Compare(tmp_path, PROJECT)
+    assert new == Records("A", [(WARNING, "w2")])
+    assert resolved == Records("A", [(WARNING, "w1")])
+
+
+def test_projects_are_separate(tmp_path):
+    FTReportDiff.SaveRun(tmp_path, PROJECT, ["A"], 
+                         Records("A", [(WARNING, "w1")]))
+    FTReportDiff.SaveRun(tmp_path, PROJECT, ["A"], [])
+    FTReportDiff.SaveRun(tmp_path, "Other", ["A"], [])
+    assert FTReportDiff.Compare(tmp_path, "Other") is None
+    # A path to the project file is the same project.
+    new, resolved, unchanged = FTReportDiff.Compare(tmp_path, 
+                                    f"C:/Projects/{PROJECT}/{PROJECT}.fwdata")
+    assert resolved == Records("A", [(WARNING, "w1")])
+
+
+def test_message_key():
+    key = FTReportDiff.MessageKey("A", WARNING, "msg", None)
+    assert key == FTReportDiff.MessageKey("A", WARNING, "msg", "")
+    assert key != FTReportDiff.MessageKey("A", ERROR, "msg", None)
+    assert key != FTReportDiff.MessageKey("B", WARNING, "msg", None)
@@ -0,0 +1,111 @@
+#
+#   test_FTResultCache.py
+#
+#   A pytest suite for the keys and files of the report cache in
+#   FTResultCache.py
+#
+
+import os
+
+import pytest
+
+from flextoolslib.code.FTResultCache import (
+    FTResultCache,
+    CacheOption,
+    LibraryHash,
+    ResultKey,
+    )
+
+#-----------------------------------------------------------
+
+KEY_VALUES = ("Sena 3", "2025-01-01 10:00:00", "abc123", "1.0",
+              "def456", "en", "2.5.0")
+
+def test_result_key_is_stable():
+    assert ResultKey(*KEY_VALUES) == ResultKey(*KEY_VALUES)
+
+
+@pytest.mark.parametrize("index", range(len(KEY_VALUES)))
+def test_result_key_changes_with_each_input(index):
+    values = list(KEY_VALUES)
+    values[index] += "x"
+    assert ResultKey(*values) != ResultKey(*KEY_VALUES)
+
+
+def test_result_key_separates_values():
+    values = list(KEY_VALUES)
+    values[0], values[1] = "ab", "c"
+    other = list(KEY_VALUES)
+    other[0], other[1] = "a", "bc"
+    assert ResultKey(*values) != ResultKey(*other)
+
+
+@pytest.fixture
+def modulesFolder(tmp_path):
+    (tmp_path / "Module_A.py").write_text("# Module A\n")
+    (tmp_path / "notes.txt").write_text("not code\n")
+    lib = tmp_path / "Lib" / "Data"
+    lib.mkdir(parents=True)
+    (lib / "table.txt").write_text("a\tb\n")
+    return tmp_path
+
+
+def test_library_hash(modulesFolder):
+    first = LibraryHash(str(modulesFolder))
+    assert first and first == LibraryHash(str(modulesFolder))
+
+    # Files that Modules can't use don't change the hash...
+    (modulesFolder / "notes.txt").write_text("changed\n")
+    pycache = modulesFolder / "Lib" / "__pycache__"
+    pycache.mkdir()
+    (pycache / "x.pyc").write_bytes(b"\0")
+    assert LibraryHash(str(modulesFolder)) == first
+
+    # ...but a change to a Lib file does.
+    (modulesFolder / "Lib" / "Data" / "table.txt").write_text("a\tc\n")
+    second = LibraryHash(str(modulesFolder))
+    assert second != first
+
+    # And so does a new Python file.
+    (modulesFolder / "Module_B.py").write_text("# Module B\n")
+    assert LibraryHash(str(modulesFolder)) not in (first, second)
+
+
+def test_library_hash_missing_folder(tmp_path):
+    assert LibraryHash(str(tmp_path / "missing")) is None
+
+
+MESSAGES = [(0, "Info", None),
+            (1, "Warning 路", "guid:0f1e2d3c-0000-4000-8000-000000000001"),
+            (2, "Error", "file:///C:/report.txt")]
+
+def test_save_and_load(tmp_path):
+    cache = FTResultCache(str(tmp_path / "cache"))
+    assert cache.Load("Sena 3", "Reports.Stats", "key1") is None
+    assert cache.Save("Sena 3", "Reports.Stats", "key1", MESSAGES)
+    created, messages = cache.Load("Sena 3", "Reports.Stats", "key1")
+    assert messages == MESSAGES
+    assert created
+    # A different key (e.g. the project has changed)
+    assert cache.Load("Sena 3", "Reports.Stats", "key2") is None
+    # Each project and Module has its own file
+    assert cache.Load("Other", "Reports.Stats", "key1") is None
+    assert cache.Load(os.path.join("Projects", "Sena 3.fwdata"),
+                      "Reports.Stats", "key1") is not None
+
+
+def test_load_damaged_file(tmp_path):
+    cache = FTResultCache(str(tmp_path))
+    cache.Save("Sena 3", "Reports.Stats", "key1", MESSAGES)
+    (path,) = [p for p in tmp_path.iterdir() if p.suffix == ".json"]
+    path.write_text("{not json")
+    assert cache.Load("Sena 3", "Reports.Stats", "key1") is None
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, None), ("", None), (True, True), (False, False),
+    ("yes", True), (" On ", True), ("1", True),
+    ("no", False), ("off", False),
+    ])
+def test_cache_option(value, expected):
+    assert CacheOption(value) is expected
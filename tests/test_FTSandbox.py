@@ -0,0 +1,145 @@
+#
+#   test_FTSandbox.py
+#
+#   A pytest suite for running a Module in a child process with
+#   FTSandbox.py. The child runs ChildRun() below instead of a FlexTools
+#   Module, since FieldWorks isn't available.
+#
+
+import gettext
+import os
+import threading
+import time
+
+import pytest
+
+from flextoolslib.code import FTSandbox
+from flextoolslib.code.FTReport import FTReporter, FTR_CancelledError
+
+# FlexTools normally installs _()
+gettext.NullTranslations().install()
+
+#-----------------------------------------------------------
+# The child process
+
+TESTS_PATH = os.path.dirname(os.path.abspath(__file__))
+
+CHILD_COMMAND = ("import sys;"
+                 f"sys.path[:0] = [{os.path.dirname(TESTS_PATH)!r}, {TESTS_PATH!r}];"
+                 "from flextoolslib.code.FTSandbox import _ChildMain;"
+                 "import test_FTSandbox;"
+                 "_ChildMain(test_FTSandbox.ChildRun)")
+
+REF = "guid:0f1e2d3c-0000-4000-8000-000000000001"
+
+def ChildRun(params, reporter):
+    # A trivial Module run, in place of FTSandbox.__RunInChild()
+    gettext.NullTranslations().install()
+    mode = params["mode"]
+    if mode == "report":
+        reporter.Info("Information 路", REF)
+        reporter.Blank()
+        reporter.ProgressStart(3, "Counting")
+        for i in range(3):
+            reporter.ProgressUpdate(i)
+        reporter.Warning("A warning", key="k")
+        reporter.Error("An error")
+        print("Printed output goes to the log")
+        reporter.Send((FTSandbox._SAVING,), flush=True)
+        return {"finished" : True,
+                "changes"  : {"queued" : 2}}
+    if mode == "stop":
+        try:
+            while True:
+                reporter.Info("Working")
+                time.sleep(0.02)
+        except FTR_CancelledError as e:
+            reporter.Send((FTSandbox._SAVING,), flush=True)
+            reporter.Error("Saved")
+            return {"finished" : False, "stopped" : e.message}
+    if mode == "hang":
+        # Doesn't check for cancellation (e.g. stuck in LCM code)
+        reporter.Info("Hanging")
+        reporter.Flush()
+        while True:
+            time.sleep(1)
+    if mode == "crash":
+        reporter.Flush()
+        os._exit(3)
+    raise ValueError(f"Unknown mode: {mode}")
+
+#-----------------------------------------------------------
+
+@pytest.fixture
+def configPath(tmp_path):
+    path = tmp_path / "flextools.ini"
+    path.write_text("[DEFAULT]\nuilanguage = 'en'\n")
+    return path
+
+def Run(configPath, mode, reporter=None):
+    sandbox = FTSandbox.FTSandbox(str(configPath),
+                                  {"moduleName" : "Test.Sandbox",
+                                   "mode"       : mode},
+                                  childCommand=CHILD_COMMAND)
+    reporter = reporter or FTReporter()
+    return sandbox.Run(reporter), reporter, sandbox
+
+
+def test_round_trip(configPath):
+    before = configPath.read_bytes()
+    result, reporter, sandbox = Run(configPath, "report")
+    assert result.completed and result.finished
+    assert result.exitCode == 0
+    assert not result.killed and not result.stopped
+    assert result.changes == {"queued" : 2}
+    assert result.cpuTime > 0
+    assert list(reporter.messages) == [
+                (reporter.INFO, "Information 路", REF),
+                (reporter.BLANK, None, None),
+                (reporter.WARNING, "A warning", None),
+                (reporter.ERROR, "An error", None)]
+    assert reporter.ProgressTotals()[0] == 3
+    # The child's stdout and log are written to the log file...
+    with open(sandbox.logPath, encoding="utf-8") as log:
+        assert "Printed output goes to the log" in log.read()
+    # ...and it doesn't save flextools.ini.
+    assert configPath.read_bytes() == before
+
+
+def test_exception(configPath):
+    result, reporter, sandbox = Run(configPath, "unknown")
+    assert result.completed and not result.finished
+    name, details, isRuntimeError = result.exception
+    assert name == "ValueError"
+    assert "Unknown mode" in details
+
+
+def test_stop(configPath):
+    reporter = FTReporter()
+    threading.Timer(0.5, reporter.cancelToken.Cancel).start()
+    result, reporter, sandbox = Run(configPath, "stop", reporter)
+    assert result.completed and not result.killed
+    assert result.stopped
+    assert result.exitCode == 0
+    # Only errors are passed on after the stop.
+    assert reporter.messages[-1] == (reporter.ERROR, "Saved", None)
+
+
+def test_kill(configPath, monkeypatch):
+    monkeypatch.setattr(FTSandbox, "STOP_TIMEOUT", 0.5)
+    reporter = FTReporter()
+    reporter.cancelToken.SetTimeBudget(0.5)
+    start = time.monotonic()
+    result, reporter, sandbox = Run(configPath, "hang", reporter)
+    assert result.killed
+    assert not result.completed
+    assert result.stopped
+    assert result.cpuTime is None
+    assert time.monotonic() - start < 10
+    assert list(reporter.messages) == [(reporter.INFO, "Hanging", None)]
+
+
+def test_crash(configPath):
+    result, reporter, sandbox = Run(configPath, "crash")
+    assert not result.completed and not result.killed
+    assert result.exitCode == 3
@@ -0,0 +1,142 @@
+#
+#   test_FTScheduler.py
+#
+#   A pytest suite for the data access rules and stage building of 
+#   FTScheduler.py
+#
+
+import glob
+import os
+
+import pytest
+
+from flextoolslib import *
+from flextoolslib.code.FTScheduler import (
+    ALL_DATA,
+    DataAccess,
+    Conflicts,
+    CanRunConcurrently,
+    BuildStages,
+    )
+from flextoolslib.misc.RunModule import ImportModule
+
+MODULES_PATH = os.path.join(os.path.dirname(__file__), 
+                            "..", "FlexTools", "Modules")
+
+#----------------------------------------------------------- 
+
+def Docs(modifies=False, reads=None, writes=None):
+    docs = {FTM_ModifiesDB : modifies}
+    if reads is not None:
+        docs[FTM_Reads] = reads
+    if writes is not None:
+        docs[FTM_Writes] = writes
+    return docs
+
+READ_LEXICON = ([FTD_Lexicon], [])
+READ_TEXTS   = ([FTD_Texts], [])
+READ_ALL     = (ALL_DATA, [])
+WRITE_FLAGS  = ([FTD_Lexicon], [FTD_Lexicon+":FTFlags"])
+WRITE_ALL    = (ALL_DATA, ALL_DATA)
+
+#----------------------------------------------------------- 
+# DataAccess
+
+def test_access_undeclared():
+    assert DataAccess(Docs(), False) == (ALL_DATA, [])
+    assert DataAccess(Docs(True), True) == (ALL_DATA, ALL_DATA)
+
+def test_access_declared():
+    docs = Docs(True, [FTD_Lexicon], [FTD_Reversals])
+    assert DataAccess(docs, True) == ([FTD_Lexicon], [FTD_Reversals])
+
+def test_access_preview_reads_the_writes():
+    # Without modifyAllowed a modifying module still reads what it
+    # would have written.
+    docs = Docs(True, [FTD_Lexicon], [FTD_Reversals])
+    assert DataAccess(docs, False) == ([FTD_Lexicon, FTD_Reversals], [])
+    assert DataAccess(Docs(True, [FTD_Lexicon]), False) == (ALL_DATA, [])
+
+def test_access_no_data():
+    assert DataAccess(Docs(reads=[]), False) == ([], [])
+
+#----------------------------------------------------------- 
+# Conflicts
+
+@pytest.mark.parametrize("access1, access2, expected", [
+    (READ_LEXICON, READ_LEXICON, False),
+    (READ_LEXICON, READ_ALL,     False),
+    (READ_ALL,     READ_ALL,     False),
+    (WRITE_FLAGS,  READ_LEXICON, True),
+    (WRITE_FLAGS,  READ_TEXTS,   False),
+    (WRITE_FLAGS,  ([FTD_Lexicon+":Pinyin"], []), False),
+    (WRITE_FLAGS,  ([FTD_Lexicon+":FTFlags"], []), True),
+    (WRITE_FLAGS,  READ_ALL,     True),
+    (WRITE_ALL,    READ_TEXTS,   True),
+    (WRITE_ALL,    ([], []),     False),
+    ])
+def test_conflicts(access1, access2, expected):
+    assert Conflicts(access1, access2) == expected
+    assert Conflicts(access2, access1) == expected
+
+def test_can_run_concurrently():
+    assert CanRunConcurrently(READ_LEXICON)
+    assert not CanRunConcurrently(READ_ALL)
+    assert not CanRunConcurrently(WRITE_FLAGS)
+
+#----------------------------------------------------------- 
+# BuildStages
+
+def test_stages_of_readers():
+    modules = [("a", READ_LEXICON), ("b", READ_TEXTS), ("c", READ_LEXICON)]
+    assert BuildStages(modules) == [["a", "b", "c"]]
+
+def test_stages_one_module_on_calling_thread():
+    modules = [("a", READ_LEXICON), ("b", READ_ALL), 
+               ("c", READ_TEXTS), ("d", READ_ALL)]
+    assert BuildStages(modules) == [["a", "b", "c"], ["d"]]
+
+def test_stages_keep_order():
+    # A writer is never moved ahead of, or behind, a module that it
+    # conflicts with.
+    modules = [("a", READ_LEXICON), ("w", WRITE_FLAGS), 
+               ("b", READ_TEXTS), ("c", READ_LEXICON)]
+    assert BuildStages(modules) == [["a"], ["w", "b"], ["c"]]
+
+def test_stages_undeclared_writers():
+    modules = [("a", READ_TEXTS), ("w1", WRITE_ALL), ("w2", WRITE_ALL),
+               ("b", READ_TEXTS)]
+    assert BuildStages(modules) == [["a"], ["w1"], ["w2"], ["b"]]
+
+def test_stages_isolated():
+    modules = [("a", READ_LEXICON), ("i", READ_LEXICON), ("b", READ_LEXICON)]
+    assert BuildStages(modules, isolated={"i"}) == [["a"], ["i"], ["b"]]
+
+#----------------------------------------------------------- 
+# The bundled modules
+
+def BundledAccess(folder, modifyAllowed):
+    modules = []
+    for path in sorted(glob.glob(os.path.join(MODULES_PATH, folder, "*.py"))):
+        if os.path.basename(path).startswith("_"):
+            continue
+        mod = ImportModule(path)
+        if mod is None:
+            # (The Export modules need Python 3.12)
+            pytest.skip(f"Can't import {path}")
+        access = DataAccess(mod.FlexToolsModule.docs, modifyAllowed)
+        modules.append((os.path.basename(path), access))
+    return modules
+
+@pytest.mark.parametrize("folder", ["Reports", "Export"])
+def test_bundled_reports_run_concurrently(folder):
+    modules = BundledAccess(folder, False)
+    assert all(CanRunConcurrently(a) for n, a in modules)
+    assert len(BuildStages(modules)) == 1
+
+def test_bundled_duplicate_finders():
+    modules = [(n, a) for n, a in BundledAccess("Duplicates", True) 
+               if n.startswith("Find_Duplicate_")]
+    assert len(modules) == 2
+    # Both write FTFlags, so they are run one after the other.
+    assert len(BuildStages(modules)) == 2
@@ -0,0 +1,79 @@
+#
+#   test_FakeProject.py
+#
+#   A pytest suite for the FakeProject stand-in and its synthetic
+#   project generator.
+#
+
+import pytest
+
+from flextoolslib.misc.FakeProject import (
+    GenerateProject,
+    FakeProjectError,
+    )
+
+#----------------------------------------------------------- 
+
+def Headwords(project):
+    return [project.LexiconGetHeadword(e) for e in project.LexiconAllEntries()]
+
+
+def test_generate_is_repeatable():
+    assert Headwords(GenerateProject(50, seed=1)) == \
+           Headwords(GenerateProject(50, seed=1))
+    assert Headwords(GenerateProject(50, seed=1)) != \
+           Headwords(GenerateProject(50, seed=2))
+
+
+def test_generate_contents(project):
+    assert project.LexiconNumberOfEntries() == 200
+    assert len(project.segments) == 100
+    assert project.TextsNumberOfTexts() == 1
+    assert project.ReversalIndex("en") is not None
+    assert project.ReversalEntries("fr") is None
+    assert project.GetDefaultVernacularWS() == ("qaa-x-syn", "Synthetic")
+    assert project.LexiconGetEntryCustomFieldNamed("FTFlags")
+    assert project.LexiconGetSenseCustomFieldNamed("Sense Frequency")
+
+
+def test_read_only(project):
+    entry = next(project.LexiconAllEntries())
+    with pytest.raises(FakeProjectError):
+        project.LexiconSetLexemeForm(entry, "new")
+
+
+def test_strings():
+    p = GenerateProject(10, analysisWSs=(("en", "English"), ("fr", "French")))
+    p.OpenProject(writeEnabled=True)
+    sense = next(p.LexiconAllEntries()).SensesOS[0]
+    p.LexiconSetSenseGloss(sense, "gloss")
+    p.LexiconSetSenseGloss(sense, "glose", "fr")
+    assert p.LexiconGetSenseGloss(sense) == "gloss"
+    assert p.LexiconGetSenseGloss(sense, "fr") == "glose"
+    with pytest.raises(FakeProjectError):
+        p.LexiconGetSenseGloss(sense, "de")
+
+
+def test_custom_fields(writableProject):
+    p = writableProject
+    entry = next(p.LexiconAllEntries())
+    flags = p.LexiconGetEntryCustomFieldNamed("FTFlags")
+    assert p.LexiconGetFieldText(entry, flags) == ""
+    p.LexiconAddTagToField(entry, flags, "a")
+    p.LexiconAddTagToField(entry, flags, "b")
+    p.LexiconAddTagToField(entry, flags, "a")
+    assert p.LexiconGetFieldText(entry, flags) == "a; b"
+    p.LexiconClearField(entry, flags)
+    assert p.LexiconGetFieldText(entry, flags) == ""
+
+    frequency = p.LexiconGetEntryCustomFieldNamed("Entry Frequency")
+    p.LexiconSetFieldInteger(entry.Hvo, frequency, 7)
+    assert p.GetCustomFieldValue(entry, frequency) == 7
+    with pytest.raises(FakeProjectError):
+        p.LexiconSetFieldText(entry, frequency, "7")
+
+
+def test_close_updates_date_modified(writableProject):
+    before = writableProject.GetDateLastModified()
+    writableProject.CloseProject()
+    assert writableProject.GetDateLastModified() != before
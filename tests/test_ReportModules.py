@@ -0,0 +1,41 @@
+#
+#   test_ReportModules.py
+#
+#   A pytest suite for running the bundled report Modules on a
+#   FakeProject, with and without the shared run data (FTRunData).
+#
+
+import os
+
+import pytest
+
+from flextoolslib.code.FTReport import FTReporter
+from flextoolslib.code.FTRunData import FTRunData
+from flextoolslib.misc.RunModule import ImportModule
+
+MODULES_PATH = os.path.join(os.path.dirname(__file__), 
+                            "..", "FlexTools", "Modules")
+
+#----------------------------------------------------------- 
+
+def RunReport(moduleName, project, runData):
+    mod = ImportModule(os.path.join(MODULES_PATH, "Reports", moduleName))
+    ftm = mod.FlexToolsModule
+    reporter = FTReporter()
+    if runData:
+        reporter.runData = FTRunData(project)
+    else:
+        del reporter.runData
+    ftm.Run(project, reporter, False)
+    return [m[1] for m in reporter.messages]
+
+
+@pytest.mark.parametrize("moduleName", [
+    "Lexicon_Statistics.py",
+    "Lexeme_Usage_In_Corpus.py",
+    ])
+def test_run_data_is_optional(project, moduleName):
+    # Modules can be run by reporters that don't provide runData
+    # (e.g. FTReportProxy), and must give the same report.
+    assert RunReport(moduleName, project, False) == \
+           RunReport(moduleName, project, True)
@@ -0,0 +1,100 @@
+#
+#   test_RunCollection.py
+#
+#   A pytest suite for the project names, exit codes and worker
+#   processes of misc/RunCollection.py
+#
+
+import json
+import multiprocessing
+
+import pytest
+
+from flextoolslib.misc.RunCollection import (
+    EXIT_OK,
+    EXIT_ERRORS,
+    EXIT_FAILED,
+    STATUS_OK,
+    STATUS_FAILED,
+    STATUS_CRASHED,
+    ExitCode,
+    ExpandProjects,
+    ReportNames,
+    _RunProject,
+    )
+
+#-----------------------------------------------------------
+
+def test_report_names():
+    names = ReportNames(["Sena 3",
+                         r"C:\Projects\Test\Sena 3.fwdata".replace("\\", "/"),
+                         "sena_3",
+                         "Summary",
+                         "Kalaba"])
+    assert names == {"Sena 3"  : "Sena_3",
+                     "C:/Projects/Test/Sena 3.fwdata" : "Sena_3-2",
+                     "sena_3"  : "sena_3-3",
+                     "Summary" : "Summary-2",
+                     "Kalaba"  : "Kalaba"}
+
+
+ALL_PROJECTS = ["Sena 3", "Test-A", "Test-B", "test-c", "Kalaba"]
+
+def test_expand_projects():
+    assert ExpandProjects(["Test-*", "Kalaba"], lambda: ALL_PROJECTS) == \
+           ["Test-A", "Test-B", "test-c", "Kalaba"]
+    # No duplicates, in the order given
+    assert ExpandProjects(["Kalaba", "*a*", "Sena 3"], lambda: ALL_PROJECTS) == \
+           ["Kalaba", "Sena 3", "Test-A"]
+    assert ExpandProjects(["Test-[AB]"], lambda: ALL_PROJECTS) == \
+           ["Test-A", "Test-B"]
+    assert ExpandProjects(["None-*"], lambda: ALL_PROJECTS) == []
+
+
+def test_expand_projects_without_wildcards():
+    # The FieldWorks projects aren't listed if there are no wildcards.
+    def __NotCalled():
+        raise AssertionError("allProjectNames called")
+    assert ExpandProjects(["Unknown", "Sena 3", "Unknown"], __NotCalled) == \
+           ["Unknown", "Sena 3"]
+
+
+def Summary(*projects):
+    return {"projects" : [{"status"   : status,
+                           "errors"   : errors,
+                           "warnings" : warnings}
+                          for status, errors, warnings in projects]}
+
+@pytest.mark.parametrize("projects, failOnWarnings, expected", [
+    ([(STATUS_OK, 0, 0), (STATUS_OK, 0, 0)], False, EXIT_OK),
+    ([(STATUS_OK, 0, 3)], False, EXIT_OK),
+    ([(STATUS_OK, 0, 3)], True, EXIT_ERRORS),
+    ([(STATUS_OK, 0, 0), (STATUS_OK, 2, 0)], False, EXIT_ERRORS),
+    ([(STATUS_OK, 2, 0), (STATUS_FAILED, 0, 0)], False, EXIT_FAILED),
+    ([(STATUS_CRASHED, 0, 0)], False, EXIT_FAILED),
+    ([], False, EXIT_FAILED),
+    ])
+def test_exit_code(projects, failOnWarnings, expected):
+    assert ExitCode(Summary(*projects), failOnWarnings) == expected
+
+
+def test_worker_does_not_save_config(tmp_path, monkeypatch):
+    # A worker for a project that can't be run (FieldWorks isn't
+    # available here) still writes its summary, but not flextools.ini.
+    monkeypatch.chdir(tmp_path)
+    ini = tmp_path / "flextools.ini"
+    ini.write_text("[DEFAULT]\nuilanguage = 'en'\n")
+    before = ini.read_bytes()
+
+    context = multiprocessing.get_context("spawn")
+    process = context.Process(target=_RunProject,
+                              args=("Sena 3", "Sena_3", "Examples",
+                                    str(tmp_path), False, False, "en"))
+    process.start()
+    process.join(60)
+    assert process.exitcode == 0
+
+    summary = json.loads((tmp_path / "Sena_3.json").read_text())
+    assert summary["status"] == STATUS_FAILED
+    assert summary["report"] == "Sena_3"
+    assert ini.read_bytes() == before